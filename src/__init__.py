@@ -1,3 +1,7 @@
-from .libs import binance, read_df, plot
-from .generate import sideways
-from .rl import environments, models, libs
\ No newline at end of file
+from .lazy import attach
+
+# Plotting, sklearn and torch only load when their module is first used
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    submodules=['.generate', '.libs', '.rl', '.libs.binance', '.libs.read_df', '.libs.plot', '.generate.sideways', '.generate.market', '.rl.environments', '.rl.models'],
+)
@@ -0,0 +1,381 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List
+
+from .generate.sideways import generate_sideways_data
+from .rl.environments import TradingEnvironment
+from .rl.libs import ConfigManager
+
+localDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STRATEGY_FEATURES = {
+    'DUAL_MA': {
+        'indicators': ['SMA60', 'SMA5', 'SMA20'],
+        'derived_indicators': ['V3'],
+    },
+    'DONCHIAN_CHANNEL': {
+        'indicators': ['SMA5'],
+        'derived_indicators': ['DONCHIAN_CHANNEL_SMA'],
+    },
+}
+
+# Opens three orders, waits, then closes them all
+SCRIPTED_ACTIONS = [0, 2, 0, 2, 0, 2, 2, 1, 2, 2]
+ACTION_STREAMS = ['scripted', 'random']
+
+COMPONENTS = [
+    ('broker', 'executeAction'),
+    ('broker', 'updateState'),
+    (None, 'get_observation'),
+    (None, 'calculate_post_action_reward'),
+    (None, 'calculate_post_update_reward'),
+]
+
+# What a subprocess env worker imports, and the packages it must not pull in
+IMPORT_STATEMENT = 'from src.rl.environments import TradingEnvironment'
+HEAVY_MODULES = ['torch', 'stable_baselines3', 'matplotlib', 'sklearn', 'pandas_ta']
+
+
+class ComponentTimer:
+    """
+    Accumulates wall time of instance methods wrapped in place.
+    """
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.active = True
+
+    def wrap(self, owner: object, method_name: str, label: str):
+        func = getattr(owner, method_name)
+        self.totals[label] = 0.0
+        self.calls[label] = 0
+
+        def timed(*args, **kwargs):
+            if not self.active:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            self.totals[label] += perf_counter() - start
+            self.calls[label] += 1
+            return result
+
+        setattr(owner, method_name, timed)
+
+    def instrument(self, env: TradingEnvironment):
+        for owner_name, method_name in COMPONENTS:
+            owner = getattr(env, owner_name) if owner_name else env
+            label = f"{type(owner).__name__}.{method_name}"
+            self.wrap(owner, method_name, label)
+
+
+def get_reference_data(n_rows: int, seed: int) -> pd.DataFrame:
+    """
+    Random walk used as the volatility reference of the synthetic sideways data.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.002, n_rows) * rng.uniform(0.5, 1.5, n_rows)
+    index = pd.date_range('2024-01-01', periods=n_rows, freq='5min', name='datetime')
+    return pd.DataFrame({'close': 100 * np.exp(np.cumsum(returns))}, index=index)
+
+def write_benchmark_data(directory: str, n_rows: int, seed: int) -> str:
+    file_name = f"sideways_{n_rows}_{seed}.csv"
+    sideways_df = generate_sideways_data(get_reference_data(n_rows, seed), 100, seed)
+    sideways_df.to_csv(os.path.join(directory, file_name))
+    return file_name
+
+def get_action_stream(name: str, n_steps: int, seed: int) -> List[int]:
+    if name == 'scripted':
+        return np.resize(SCRIPTED_ACTIONS, n_steps).tolist()
+
+    if name == 'random':
+        return np.random.default_rng(seed).integers(0, 3, n_steps).tolist()
+
+    raise ValueError(f"Unknown action stream {name}. Available: {ACTION_STREAMS}")
+
+def get_env_config(base_config: Dict, strategy: str, prefetch: int = 0) -> Dict:
+    return {
+        **base_config,
+        **STRATEGY_FEATURES[strategy],
+        'strategy_type': strategy,
+        'action': 'default',
+        'is_random': True,
+        'is_cache_features': False,
+        'is_verbose': False,
+        'prefetch_episodes': prefetch,
+    }
+
+def get_latency_stats(durations: List[float]) -> Dict[str, float]:
+    durations = np.asarray(durations) * 1e6
+    return {
+        'count': len(durations),
+        'mean_us': float(durations.mean()),
+        'p50_us': float(np.percentile(durations, 50)),
+        'p99_us': float(np.percentile(durations, 99)),
+    }
+
+def run_steps(env: TradingEnvironment, actions: List[int]) -> float:
+    """
+    Step through the actions, resetting at episode end. Only step calls are timed.
+    """
+    elapsed = 0.0
+    env.reset()
+    for action in actions:
+        start = perf_counter()
+        _, _, terminated, truncated, _ = env.step(action)
+        elapsed += perf_counter() - start
+
+        if terminated or truncated:
+            env.reset()
+
+    return elapsed
+
+def run_resets(env: TradingEnvironment, n_resets: int) -> List[float]:
+    durations = []
+    for _ in range(n_resets):
+        start = perf_counter()
+        env.reset()
+        durations.append(perf_counter() - start)
+    return durations
+
+def benchmark_case(
+    file_name: str,
+    directory: str,
+    env_config: Dict,
+    stream: str,
+    n_steps: int,
+    n_resets: int,
+    seed: int,
+    repeats: int = 3,
+    ) -> Dict:
+    actions = get_action_stream(stream, n_steps, seed)
+    random.seed(seed)
+
+    env = TradingEnvironment(file_name, directory, env_config)
+
+    # Warm up caches and lazy allocations before timing
+    run_steps(env, actions[:min(1000, n_steps)])
+
+    # Best of several passes, the least disturbed one is the most comparable across runs
+    step_time = min(run_steps(env, actions) for _ in range(repeats))
+    reset_times = run_resets(env, n_resets)
+
+    # Second pass with the components wrapped, so timers do not skew steps/s
+    timer = ComponentTimer()
+    timer.instrument(env)
+    timer.active = False
+    env.reset()
+    timer.active = True
+    instrumented_time = 0.0
+    for action in actions:
+        start = perf_counter()
+        _, _, terminated, truncated, _ = env.step(action)
+        instrumented_time += perf_counter() - start
+
+        if terminated or truncated:
+            timer.active = False
+            env.reset()
+            timer.active = True
+
+    components = {}
+    for label, total in timer.totals.items():
+        calls = timer.calls[label]
+        components[label] = {
+            'calls': calls,
+            'total_s': total,
+            'mean_us': total / calls * 1e6 if calls else 0.0,
+            'share': total / instrumented_time,
+        }
+
+    env.close()
+
+    return {
+        'strategy': env_config['strategy_type'],
+        'actions': stream,
+        'steps': n_steps,
+        'repeats': repeats,
+        'steps_per_sec': n_steps / step_time,
+        'step_mean_us': step_time / n_steps * 1e6,
+        'reset': get_latency_stats(reset_times),
+        'components': components,
+    }
+
+def benchmark_import(statement: str = IMPORT_STATEMENT, repeats: int = 5) -> Dict:
+    """
+    Time a cold import in fresh interpreters, the way a subprocess env worker starts.
+
+    :return: best import time in seconds and the heavy modules the import loaded
+    """
+    code = (
+        "import json, sys\n"
+        "from time import perf_counter\n"
+        "start = perf_counter()\n"
+        f"{statement}\n"
+        "print(json.dumps({'seconds': perf_counter() - start, 'modules': list(sys.modules)}))\n"
+    )
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=localDir)
+        result = json.loads(output.decode().splitlines()[-1])
+        timings.append(result['seconds'])
+
+    modules = set(result['modules'])
+    return {
+        'statement': statement,
+        'repeats': repeats,
+        'seconds': min(timings),
+        'heavy_modules': [module for module in HEAVY_MODULES if module in modules],
+    }
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=localDir, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(
+    config_path: str,
+    strategies: List[str],
+    streams: List[str],
+    n_rows: int = 12000,
+    n_steps: int = 20000,
+    n_resets: int = 200,
+    seed: int = 42,
+    repeats: int = 3,
+    prefetch: int = 0,
+    import_repeats: int = 5,
+    ) -> Dict:
+    """
+    Time the cold import of the env package, then TradingEnvironment step/reset on fixed synthetic sideways data.
+
+    :return: JSON serializable report with the import timing and one entry per strategy and action stream
+    """
+    base_config = ConfigManager(config_path).config['env_config']
+    results = []
+
+    import_result = benchmark_import(repeats=import_repeats)
+    print(f"{'import':<25} {import_result['seconds'] * 1000:>10,.0f} ms, heavy modules: {import_result['heavy_modules']}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = write_benchmark_data(directory, n_rows, seed)
+
+        for strategy in strategies:
+            env_config = get_env_config(base_config, strategy, prefetch)
+            for stream in streams:
+                result = benchmark_case(file_name, directory, env_config, stream, n_steps, n_resets, seed, repeats)
+                results.append(result)
+                print(f"{strategy:<16} {stream:<8} {result['steps_per_sec']:>10,.0f} steps/s, reset {result['reset']['mean_us']:.1f} us")
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': get_git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'config': os.path.basename(config_path),
+            'rows': n_rows,
+            'steps': n_steps,
+            'resets': n_resets,
+            'seed': seed,
+            'repeats': repeats,
+            'prefetch': prefetch,
+        },
+        'import': import_result,
+        'results': results,
+    }
+
+def check_import(report: Dict) -> List[str]:
+    """
+    Importing the env package must never load the training or plotting stack.
+    """
+    return [f"import loads {module}" for module in report['import']['heavy_modules']]
+
+def compare_benchmark(report: Dict, baseline: Dict, tolerance: float, import_tolerance: float = 0.25) -> List[str]:
+    """
+    List the cases whose steps/s dropped more than `tolerance` below the baseline,
+    and the cold import if it got more than `import_tolerance` slower.
+    """
+    previous = {(r['strategy'], r['actions']): r for r in baseline['results']}
+    regressions = []
+
+    if 'import' in baseline:
+        ratio = report['import']['seconds'] / baseline['import']['seconds']
+        print(f"{'import':<25} {ratio:>6.2f}x baseline time")
+        if ratio > 1 + import_tolerance:
+            regressions.append(f"import: {ratio:.2f}x")
+
+    for result in report['results']:
+        key = (result['strategy'], result['actions'])
+        if key not in previous:
+            continue
+
+        ratio = result['steps_per_sec'] / previous[key]['steps_per_sec']
+        print(f"{key[0]:<16} {key[1]:<8} {ratio:>6.2f}x baseline")
+        if ratio < 1 - tolerance:
+            regressions.append(f"{key[0]}/{key[1]}: {ratio:.2f}x")
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trading environment hot path.")
+    parser.add_argument("--config", type=str, default="DQN_default.yaml", help="Name of the configuration file.")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGY_FEATURES), help="Strategies to run.")
+    parser.add_argument("--actions", nargs="+", default=ACTION_STREAMS, help="Action streams to run.")
+    parser.add_argument("--rows", type=int, default=12000, help="Rows of synthetic price data.")
+    parser.add_argument("--steps", type=int, default=20000, help="Steps per case.")
+    parser.add_argument("--resets", type=int, default=200, help="Resets timed per case.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes per case, the best one is kept.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the price data and actions.")
+    parser.add_argument("--prefetch", type=int, default=0, help="Episode windows prepared ahead of reset, 0 disables.")
+    parser.add_argument("--output", type=str, help="JSON report path. Defaults to logs/benchmarks/.")
+    parser.add_argument("--baseline", type=str, help="Previous JSON report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed steps/s drop against the baseline.")
+    parser.add_argument("--import-repeats", type=int, default=5, help="Cold imports timed, the fastest one is kept.")
+    parser.add_argument("--import-tolerance", type=float, default=0.25, help="Allowed import time growth against the baseline.")
+    parser.add_argument("--import-only", action="store_true", help="Only time the cold import of the env package.")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        os.path.join(localDir, f"configs/{args.config}"),
+        [] if args.import_only else args.strategies,
+        args.actions,
+        args.rows,
+        args.steps,
+        args.resets,
+        args.seed,
+        args.repeats,
+        args.prefetch,
+        args.import_repeats,
+    )
+
+    output = args.output
+    if output is None:
+        output = os.path.join(localDir, "logs/benchmarks", f"env-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Benchmark saved to {output}")
+
+    regressions = check_import(report)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions += compare_benchmark(report, json.load(file), args.tolerance, args.import_tolerance)
+    if regressions:
+        print(f"Regressions: {regressions}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
-from .sideways import *
\ No newline at end of file
+from .sideways import *
+from .market import *
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Tuple
+
+from src.rl.libs.feature_store import buildPathStore, hashFile
+
+# Paths are simulated in batches of this many, each batch is a (time, path) array
+PATH_BATCH_SIZE = 1024
+VOLATILITY_WINDOW = 40
+
+# reversion: pull toward the mean per step, vol_scale: multiplier of the
+# reference volatility, trend: largest log move of the mean over a path
+REGIMES = {
+    'sideways': {'reversion': 0.05, 'vol_scale': 1.0, 'trend': 0.0},
+    'trending': {'reversion': 0.05, 'vol_scale': 1.0, 'trend': 0.5},
+    'high_volatility': {'reversion': 0.05, 'vol_scale': 3.0, 'trend': 0.0},
+}
+# Prices stay within these ratios of the (moving) mean
+BOUND_RATIOS = (0.6, 1.4)
+
+
+def get_regime(regime: str) -> Dict[str, float]:
+    if regime not in REGIMES:
+        raise ValueError(f"Unknown regime {regime}. Available: {list(REGIMES)}")
+    return REGIMES[regime]
+
+def get_reference_volatility(reference_df: pd.DataFrame, window: int = VOLATILITY_WINDOW) -> np.ndarray:
+    """
+    Rolling volatility of the close returns of a reference frame, one value per return.
+    """
+    returns = reference_df['close'].pct_change().dropna()
+    return returns.rolling(window=window).std().bfill().to_numpy(dtype=np.float64)
+
+def get_path_seeds(seed: int, n_paths: int) -> np.ndarray:
+    """
+    One seed per path, so a path does not depend on the batch it is simulated in.
+    """
+    return np.random.SeedSequence(seed).generate_state(n_paths)
+
+def simulate_mean_reversion(
+    shocks: np.ndarray,
+    starts: np.ndarray,
+    means: np.ndarray,
+    reversion: float,
+    ) -> np.ndarray:
+    """
+    Bounded mean reverting paths, looping over time with arrays over paths.
+
+    Every step moves a price by its shock, pulls it toward its mean and
+    clips it to BOUND_RATIOS of that mean.
+
+    :param shocks: (time, path) relative moves, row 0 is unused
+    :param starts: (path,) first prices
+    :param means: (time, path) or (path,) mean of every step
+    :param reversion: fraction of the distance to the mean recovered per step
+    :return: (time, path) prices
+    """
+    n_steps, n_paths = shocks.shape
+    means = np.broadcast_to(means, (n_steps, n_paths))
+    growth = shocks + 1
+    lows = BOUND_RATIOS[0] * means
+    highs = BOUND_RATIOS[1] * means
+    prices = np.empty((n_steps, n_paths))
+    prices[0] = starts
+    step = np.empty(n_paths)
+    pull = np.empty(n_paths)
+
+    for t in range(1, n_steps):
+        previous = prices[t - 1]
+        np.multiply(previous, growth[t], out=step)
+        np.subtract(means[t], previous, out=pull)
+        np.multiply(pull, reversion, out=pull)
+        np.add(step, pull, out=step)
+        np.maximum(step, lows[t], out=step)
+        np.minimum(step, highs[t], out=prices[t])
+
+    return prices
+
+def simulate_paths(
+    volatility: np.ndarray,
+    seeds: np.ndarray,
+    n_steps: int,
+    price_starts: float = 100,
+    regime: str = 'sideways',
+    ) -> np.ndarray:
+    """
+    Simulate one batch of synthetic close paths of a regime.
+
+    Every path draws its noise, its window of the reference volatility and
+    its trend from its own seed.
+
+    :param volatility: reference volatility, see get_reference_volatility
+    :param seeds: one seed per path
+    :param n_steps: bars per path
+    :param price_starts: first and mean price of every path
+    :param regime: one of REGIMES
+    :return: (n_steps, len(seeds)) close prices
+    """
+    params = get_regime(regime)
+    max_offset = len(volatility) - (n_steps - 1)
+    if max_offset < 0:
+        raise ValueError(f"Reference volatility has {len(volatility)} values, {n_steps - 1} are needed per path")
+
+    # Drawn path-major, so every path writes contiguous memory
+    epsilon = np.empty((len(seeds), n_steps))
+    offsets = np.empty(len(seeds), dtype=np.int64)
+    drifts = np.empty(len(seeds))
+    for i, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        rng.standard_normal(out=epsilon[i])
+        offsets[i] = rng.integers(0, max_offset, endpoint=True)
+        drifts[i] = rng.uniform(-params['trend'], params['trend'])
+
+    # Step t moves by the volatility before it, like generate_sideways_data
+    windows = np.lib.stride_tricks.sliding_window_view(volatility, n_steps - 1)[offsets]
+    windows *= epsilon[:, 1:]
+    windows *= params['vol_scale']
+    del epsilon
+    shocks = np.zeros((n_steps, len(seeds)))
+    shocks[1:] = windows.T
+
+    starts = np.full(len(seeds), float(price_starts))
+    if params['trend']:
+        means = price_starts * np.exp(np.outer(np.linspace(0, 1, n_steps), drifts))
+    else:
+        means = starts
+
+    return simulate_mean_reversion(shocks, starts, means, params['reversion'])
+
+def generate_paths(
+    volatility: np.ndarray,
+    n_paths: int,
+    n_steps: int,
+    price_starts: float = 100,
+    regime: str = 'sideways',
+    seed: int = 0,
+    batch_size: int = PATH_BATCH_SIZE,
+    ) -> Iterator[np.ndarray]:
+    """
+    Yield (n_steps, batch) close arrays until n_paths are simulated.
+
+    The same seed gives the same paths whatever the batch size.
+    """
+    seeds = get_path_seeds(seed, n_paths)
+    for start in range(0, n_paths, batch_size):
+        yield simulate_paths(volatility, seeds[start:start + batch_size], n_steps, price_starts, regime)
+
+def build_synthetic_store(
+    reference_csv: str,
+    n_paths: int,
+    n_steps: int,
+    indicators: List[str],
+    derived_indicators: List[str],
+    cache_dir: str,
+    regime: str = 'sideways',
+    price_starts: float = 100,
+    seed: int = 0,
+    start_time: str = '2024-01-01',
+    freq: str = '5min',
+    batch_size: int = PATH_BATCH_SIZE,
+    is_verbose: bool = True,
+    dtypes: Dict[str, np.dtype] = None,
+    ) -> str:
+    """
+    Simulate synthetic paths and stream their features into a feature store.
+
+    Paths never go through a CSV or a plot. The store has the layout of a
+    corpus store, pass it as the `feature_store` of TradingEnvironment to
+    sample episodes across every path.
+
+    :param reference_csv: price CSV with a 'close' column, its rolling volatility drives the paths
+    :param n_paths: number of paths
+    :param n_steps: bars per path, before indicator warm-up rows are dropped
+    :param indicators: indicator names
+    :param derived_indicators: derived indicator names
+    :param cache_dir: feature cache root directory
+    :param regime: one of REGIMES
+    :param price_starts: first and mean price of every path
+    :param seed: seed of the whole set of paths
+    :param start_time: time of the first bar of every path
+    :param freq: bar interval
+    :param batch_size: paths simulated and written at once
+    :param is_verbose: print cache hits/misses
+    :param dtypes: columns to keep and their storage dtype, see get_feature_dtypes
+    :return: path of the store
+    """
+    get_regime(regime)
+    times = pd.date_range(start_time, periods=n_steps, freq=freq).to_numpy()
+    source = {
+        'generator': 'market',
+        'reference': hashFile(reference_csv),
+        'regime': regime,
+        'steps': n_steps,
+        'price_starts': price_starts,
+        'seed': seed,
+        'start_time': str(start_time),
+        'freq': freq,
+    }
+
+    def batches() -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        volatility = get_reference_volatility(pd.read_csv(reference_csv, usecols=['close']))
+        for closes in generate_paths(volatility, n_paths, n_steps, price_starts, regime, seed, batch_size):
+            # Column-major like pivotPanelColumns, every path is contiguous for the rolling kernels
+            yield times, {'close': np.asfortranarray(closes)}
+
+    return buildPathStore(batches(), n_paths, indicators, derived_indicators, cache_dir, source, is_verbose, dtypes)
@@ -1,54 +1,54 @@
-from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 
+from .market import BOUND_RATIOS, get_reference_volatility, simulate_mean_reversion
 
-def create_sideways_data(filename: str, reference_df: pd.DataFrame, price_starts: float, len_data: int):
-    # Load the original data
-    reference_df = reference_df[['datetime', 'close']]  # Select only time and close columns
-    reference_df.set_index('datetime', inplace=True)
 
-    # Select a random slice of 10000 rows
-    start_idx = np.random.randint(0, len(reference_df) - len_data)
-    df_slice = reference_df.iloc[start_idx:start_idx+len_data]
+def get_sideways_bounds(price_starts: float):
+    return BOUND_RATIOS[0] * price_starts, BOUND_RATIOS[1] * price_starts
+
+def generate_sideways_data(df_slice: pd.DataFrame, price_starts: float, seed: int = 42) -> pd.DataFrame:
+    """
+    Mean reverting, bounded close series that follows the rolling volatility of a reference slice.
 
-    # Calculate returns and rolling volatility
-    returns = df_slice['close'].pct_change().dropna()
-    rolling_volatility = returns.rolling(window=40).std().bfill()
+    :param df_slice: reference frame with a 'close' column, its index is reused
+    :param price_starts: starting and mean price of the generated series
+    :param seed: random seed, the same slice and seed always give the same series
+    :return: frame with a single 'close' column
+    """
+    rolling_volatility = get_reference_volatility(df_slice)
 
     # Generate more stationary price movement with upper and lower bounds
     n = len(df_slice)
-    np.random.seed(42)  # for reproducibility
-    epsilon = np.random.normal(0, 1, n)
-    sideways_series = np.zeros(n)
-    sideways_series[0] = 1 * price_starts # Start at 1
-
-    # Define upper and lower bounds
-    lower_bound = 0.6 * price_starts
-    upper_bound = 1.4 * price_starts
-
-    # Parameters for mean reversion
-    mean = 1 * price_starts
-    reversion_strength = 0.05
-
-    for t in range(1, n):
-        # Use current volatility instead of average
-        current_volatility = rolling_volatility.iloc[t-1]
-        
-        # Generate price movement
-        sideways_series[t] = sideways_series[t-1] * (1 + current_volatility * epsilon[t])
-        
-        # Apply mean reversion
-        sideways_series[t] += reversion_strength * (mean - sideways_series[t-1])
-        
-        # Enforce bounds
-        sideways_series[t] = np.clip(sideways_series[t], lower_bound, upper_bound)
+    # Same draws as np.random.seed(seed), without reseeding the global generator
+    epsilon = np.random.RandomState(seed).normal(0, 1, n)
+    shocks = np.zeros((n, 1))
+    shocks[1:, 0] = rolling_volatility[:n - 1] * epsilon[1:]
+
+    # Mean reversion toward the start price, within get_sideways_bounds
+    sideways_series = simulate_mean_reversion(shocks, np.array([price_starts]), np.array([price_starts]), 0.05)[:, 0]
 
     # Create a new DataFrame with the stationary data
     sideways_df = pd.DataFrame(index=df_slice.index, columns=['close'])
     sideways_df['close'] = sideways_series
 
+    return sideways_df
+
+def create_sideways_data(filename: str, reference_df: pd.DataFrame, price_starts: float, len_data: int):
+    from matplotlib import pyplot as plt
+    from sklearn.preprocessing import MinMaxScaler
+
+    # Load the original data
+    reference_df = reference_df[['datetime', 'close']]  # Select only time and close columns
+    reference_df.set_index('datetime', inplace=True)
+
+    # Select a random slice of 10000 rows
+    start_idx = np.random.randint(0, len(reference_df) - len_data)
+    df_slice = reference_df.iloc[start_idx:start_idx+len_data]
+
+    sideways_df = generate_sideways_data(df_slice, price_starts)
+    lower_bound, upper_bound = get_sideways_bounds(price_starts)
+
     mean_price = df_slice['close'].mean()
     min_pct = (df_slice['close'].min() - mean_price) / mean_price * price_starts
     max_pct = (df_slice['close'].max() - mean_price) / mean_price * price_starts
@@ -0,0 +1,49 @@
+import importlib
+import sys
+from typing import Dict, Iterable, List
+
+
+def attach(package_name: str, submodules: Iterable[str] = (), exports: Dict[str, List[str]] = {}, fallbacks: Iterable[str] = ()):
+    """
+    Lazy exports for a package __init__ (PEP 562).
+
+    Nothing is imported until an export is first read, then the value is
+    set on the package so later reads are plain attribute lookups. Used as
+    `__getattr__, __dir__, __all__ = attach(__name__, ...)`.
+
+    Args:
+        package_name (str): __name__ of the package
+        submodules (list): Relative modules exported under their last name, e.g. '.components.records' as records
+        exports (dict): Relative module to the names it exports
+        fallbacks (list): Relative modules searched in order for any other public name, like a star import.
+            Their names are not listed in __all__
+    """
+    modules = {module.rsplit('.', 1)[-1]: module for module in submodules}
+    origins = {name: module for module, names in exports.items() for name in names}
+    __all__ = list(modules) + list(origins)
+
+    def __getattr__(name: str):
+        if name in modules:
+            value = importlib.import_module(modules[name], package_name)
+        elif name in origins:
+            value = getattr(importlib.import_module(origins[name], package_name), name)
+        else:
+            # Private and dunder names are probed by tools like inspect, they must not import everything
+            if name.startswith('_'):
+                raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+            for module in fallbacks:
+                module = importlib.import_module(module, package_name)
+                if hasattr(module, name):
+                    value = getattr(module, name)
+                    break
+            else:
+                raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | set(__all__))
+
+    return __getattr__, __dir__, __all__
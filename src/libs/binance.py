@@ -1,7 +1,30 @@
 
+import hashlib
+import http.client
+import json
+import os
 import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List
 
-def download_klines(symbols=None, freqs=None, start_date=None, end_date=None, market_type='spot', skip_daily=1):
+from .read_df import get_klines_path
+
+BASE_URL = 'https://data.binance.vision'
+EXCHANGE_INFO_URLS = {
+    'spot': 'https://api.binance.com/api/v3/exchangeInfo',
+    'um': 'https://fapi.binance.com/fapi/v1/exchangeInfo',
+    'cm': 'https://dapi.binance.com/dapi/v1/exchangeInfo',
+}
+# First month of the Binance public data
+START_DATE = '2017-01-01'
+# Kline intervals of the monthly archives, in minutes
+FREQ_MINUTES = {'1m': 1, '3m': 3, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240, '1d': 1440}
+
+def download_klines_script(symbols=None, freqs=None, start_date=None, end_date=None, market_type='spot', skip_daily=1):
     """
     Download kline data using subprocess instead of Jupyter's shell command
     
@@ -32,4 +55,182 @@ def download_klines(symbols=None, freqs=None, start_date=None, end_date=None, ma
     base_cmd.extend(["-skip-daily", str(skip_daily)])
     
     # Execute the command
-    subprocess.run(base_cmd)
\ No newline at end of file
+    subprocess.run(base_cmd)
+
+def get_market_path(market_type: str) -> str:
+    return 'spot' if market_type == 'spot' else f'futures/{market_type}'
+
+def get_all_symbols(market_type='spot', timeout=30) -> List[str]:
+    with urllib.request.urlopen(EXCHANGE_INFO_URLS[market_type], timeout=timeout) as response:
+        return [item['symbol'] for item in json.load(response)['symbols']]
+
+def get_months(start_date: str, end_date: str) -> List[str]:
+    """
+    Months covered by the date range, as YYYY-MM.
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def get_kline_url(base_url: str, market_type: str, symbol: str, freq: str, month: str) -> str:
+    return f"{base_url}/data/{get_market_path(market_type)}/monthly/klines/{symbol}/{freq}/{symbol}-{freq}-{month}.zip"
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fetch_checksum(url: str, timeout=30):
+    """
+    SHA-256 published next to an archive, None when there is none.
+    """
+    try:
+        with urllib.request.urlopen(f"{url}.CHECKSUM", timeout=timeout) as response:
+            return response.read().decode().split()[0]
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+def fetch_to_part(url: str, part_path: str, timeout=30, chunk_size=1 << 16) -> bool:
+    """
+    Download into a .part file, resuming from its current size. Returns False on 404.
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request = urllib.request.Request(url, headers={'Range': f"bytes={offset}-"} if offset else {})
+
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return False
+        # The part already holds the whole file
+        if e.code == 416:
+            return True
+        raise
+
+    with response:
+        # A server ignoring the range sends the whole file again
+        mode = 'ab' if response.status == 206 else 'wb'
+        with open(part_path, mode) as f:
+            for chunk in iter(lambda: response.read(chunk_size), b''):
+                f.write(chunk)
+
+        expected = response.headers.get('Content-Length')
+        received = os.path.getsize(part_path) - (offset if mode == 'ab' else 0)
+        if expected is not None and received < int(expected):
+            raise ConnectionError(f"Incomplete download of {url}: {received}/{expected} bytes")
+
+    return True
+
+def download_file(url: str, path: str, timeout=30, retries=3, retry_wait=1.0) -> str:
+    """
+    Download one archive, skipping it when the file on disk matches its checksum.
+
+    Interrupted transfers are kept as <path>.part and resumed with an HTTP
+    range request, by the next attempt or the next run.
+
+    Returns:
+        str: 'skipped', 'downloaded' or 'missing' when the archive does not exist
+    """
+    checksum = fetch_checksum(url, timeout)
+    if os.path.exists(path):
+        if checksum is None or hash_file(path) == checksum:
+            return 'skipped'
+        os.remove(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part_path = f"{path}.part"
+    failures = 0
+    while failures <= retries:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        try:
+            if not fetch_to_part(url, part_path, timeout):
+                return 'missing'
+        except (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError):
+            # Attempts that got more bytes do not count against the retries
+            if os.path.exists(part_path) and os.path.getsize(part_path) > offset:
+                continue
+            failures += 1
+            if failures > retries:
+                raise
+            time.sleep(retry_wait * failures)
+            continue
+
+        if checksum is None or hash_file(part_path) == checksum:
+            os.replace(part_path, path)
+            return 'downloaded'
+
+        # Corrupted part, start over
+        os.remove(part_path)
+        failures += 1
+
+    raise ValueError(f"Checksum mismatch for {url}")
+
+def try_download_file(url: str, path: str, timeout=30):
+    """
+    download_file returning ('failed', error) instead of raising, so one archive never stops the others.
+    """
+    try:
+        return download_file(url, path, timeout=timeout), None
+    except Exception as e:
+        return 'failed', e
+
+def download_klines(symbols=None, freqs=None, start_date=None, end_date=None, market_type='spot', skip_daily=1, max_workers=8, base_url=BASE_URL, timeout=30):
+    """
+    Download monthly kline archives concurrently, in the layout read2df expects.
+
+    Archives already on disk with a matching checksum are skipped, partial
+    ones are resumed. Only monthly archives are fetched.
+
+    Args:
+        symbols (list): List of trading symbols. If None, downloads all available
+        freqs (dict): Dictionary of frequencies. If None, downloads every interval of FREQ_MINUTES
+        start_date (str): Start date for data download
+        end_date (str): End date for data download
+        market_type (str): Market type (default: 'spot')
+        skip_daily (int): Kept for compatibility with download_klines_script, daily archives are never downloaded
+        max_workers (int): Concurrent downloads
+        base_url (str): Archive host, e.g. a local kline_server
+        timeout (float): Socket timeout in seconds
+
+    Returns:
+        dict: Archive path to 'skipped', 'downloaded', 'missing' or 'failed'
+    """
+    if symbols is None:
+        symbols = get_all_symbols(market_type, timeout)
+    if freqs is None:
+        freqs = dict.fromkeys(FREQ_MINUTES)
+
+    # Same folder as download-kline.py: a date range subfolder only when both dates are set
+    folder = f"{start_date}_{end_date}" if start_date and end_date else ""
+    months = get_months(start_date or START_DATE, end_date or date.today().isoformat())
+
+    jobs = []
+    for symbol in symbols:
+        for freq in freqs.keys():
+            directory = get_klines_path(get_market_path(market_type), symbol, freq, folder)
+            for month in months:
+                url = get_kline_url(base_url, market_type, symbol, freq, month)
+                jobs.append((url, os.path.join(directory, os.path.basename(url))))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda job: try_download_file(*job, timeout=timeout), jobs))
+
+    statuses = [status for status, _ in results]
+    counts: Dict[str, int] = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+    print(f"Klines - {counts.get('downloaded', 0)} downloaded, {counts.get('skipped', 0)} up to date, {counts.get('missing', 0)} not available, {counts.get('failed', 0)} failed")
+    for (url, _), (_, error) in zip(jobs, results):
+        if error is not None:
+            print(f"Klines - Failed {url}: {error}")
+
+    return dict(zip((path for _, path in jobs), statuses))
@@ -0,0 +1,135 @@
+import argparse
+import hashlib
+import io
+import os
+import threading
+import zipfile
+import numpy as np
+
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from .binance import FREQ_MINUTES, get_market_path, get_months
+
+class KlineRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler with single-range requests, like data.binance.vision.
+
+    `max_bytes` cuts every response after that many bytes and drops the
+    connection, so clients have to resume to get a whole file.
+    """
+    max_bytes = None
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        range_header = self.headers.get('Range')
+        if range_header is None or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start, _, end = range_header.replace('bytes=', '').partition('-')
+        start = int(start)
+        end = int(end) if end else size - 1
+        if start >= size:
+            self.send_response(416)
+            self.send_header('Content-Range', f"bytes */{size}")
+            self.end_headers()
+            return None
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def copyfile(self, source, outputfile):
+        if self.max_bytes is None:
+            return super().copyfile(source, outputfile)
+
+        outputfile.write(source.read(self.max_bytes))
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_klines(directory: str, port: int = 0, max_bytes: int = None) -> ThreadingHTTPServer:
+    """
+    Serve a local kline tree on a background thread, as a stand-in for data.binance.vision.
+
+    Args:
+        directory (str): Root holding data/<market>/monthly/klines/...
+        port (int): Port to bind, 0 picks a free one (see server.server_address)
+        max_bytes (int): Truncate every response after this many bytes
+    """
+    handler = type('Handler', (KlineRequestHandler,), {'max_bytes': max_bytes})
+    server = ThreadingHTTPServer(('127.0.0.1', port), partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, name='kline-server', daemon=True).start()
+    return server
+
+def create_kline_archive(path: str, symbol: str, freq: str, month: str, seed: int = 0):
+    """
+    Write a synthetic monthly kline zip in the Binance CSV format, with its .CHECKSUM file.
+    """
+    rng = np.random.default_rng(seed)
+    step = FREQ_MINUTES[freq] * 60_000
+    start = np.datetime64(f"{month}-01", 'ms').astype(np.int64)
+    end = (np.datetime64(month, 'M') + 1).astype('datetime64[ms]').astype(np.int64)
+    open_time = np.arange(start, end, step)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, len(open_time))))
+    volume = rng.uniform(0, 100, len(open_time))
+
+    rows = [
+        f"{t},{c:.6f},{c * 1.001:.6f},{c * 0.999:.6f},{c:.6f},{v:.4f},{t + step - 1},{c * v:.4f},1,0,0,0"
+        for t, c, v in zip(open_time, close, volume)
+    ]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr(os.path.basename(path).replace('.zip', '.csv'), "\n".join(rows) + "\n")
+
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with open(f"{path}.CHECKSUM", 'w') as f:
+        f.write(f"{digest}  {os.path.basename(path)}\n")
+
+def create_kline_tree(directory: str, symbols: list, freqs: dict, start_date: str, end_date: str, market_type='spot'):
+    """
+    Populate a directory with synthetic archives laid out like data.binance.vision.
+    """
+    for i, symbol in enumerate(symbols):
+        for freq in freqs.keys():
+            for j, month in enumerate(get_months(start_date, end_date)):
+                path = os.path.join(
+                    directory, 'data', get_market_path(market_type), 'monthly', 'klines',
+                    symbol, freq, f"{symbol}-{freq}-{month}.zip"
+                )
+                create_kline_archive(path, symbol, freq, month, seed=i * 1000 + j)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Binance kline archives locally.")
+    parser.add_argument("--directory", type=str, required=True, help="Root of the served tree.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument("--symbols", nargs="+", help="Generate archives for these symbols first.")
+    parser.add_argument("--freqs", nargs="+", default=['5m'], help="Intervals of the generated archives.")
+    parser.add_argument("--start-date", type=str, default='2024-01-01', help="First generated month.")
+    parser.add_argument("--end-date", type=str, default='2024-03-31', help="Last generated month.")
+    parser.add_argument("--market-type", type=str, default='spot', help="spot, um or cm.")
+    parser.add_argument("--max-bytes", type=int, help="Truncate every response, to exercise resume.")
+    args = parser.parse_args()
+
+    if args.symbols:
+        create_kline_tree(args.directory, args.symbols, dict.fromkeys(args.freqs), args.start_date, args.end_date, args.market_type)
+
+    server = serve_klines(args.directory, args.port, args.max_bytes)
+    print(f"Serving {args.directory} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,87 +1,438 @@
+import hashlib
+import json
 import os
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 import zipfile
-import pandas as pd 
+import numpy as np
+import pandas as pd
 
-def read2df(symbols, freqs, market_type="spot", timestamp=""):
+KLINES_ROOT = './binance-public-data/python/data'
+KLINES_CACHE_DIR = '.kline_cache'
+
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+# Only the wanted columns are parsed, with fixed dtypes instead of inferred ones
+KLINE_USECOLS = [1, 2, 3, 4, 5, 6]
+KLINE_DTYPES = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+}
+PRICE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+# Intervals that can be resampled, all divide a day
+FREQ_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000,
+}
+
+def get_freq_ms(freq: str) -> int:
+    if freq not in FREQ_MS:
+        raise ValueError(f"Unsupported interval {freq}. Available: {list(FREQ_MS)}")
+    return FREQ_MS[freq]
+
+def get_klines_path(market_type: str, symbol: str = None, freq: str = None, timestamp: str = ""):
+    path = os.path.join(KLINES_ROOT, market_type, 'monthly', 'klines')
+    if symbol is not None:
+        path = os.path.join(path, symbol, freq, timestamp)
+    return os.path.abspath(path)
+
+def read_kline_zip(zip_file_path: str) -> pd.DataFrame:
+    """
+    Parse one monthly kline archive into time, open, high, low, close, volume.
+
+    Args:
+        zip_file_path (str): Path of the zip archive, holding a single CSV
+    """
+    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+        # only one CSV file in each zip archive
+        csv_file = zip_ref.namelist()[0]
+        with zip_ref.open(csv_file) as csv_fp:
+            # Newer archives start with a header row
+            has_header = not csv_fp.peek(1)[:1].isdigit()
+            temp_df = pd.read_csv(
+                csv_fp,
+                header=None,
+                skiprows=1 if has_header else 0,
+                usecols=KLINE_USECOLS,
+                names=KLINE_COLUMNS,
+                dtype=KLINE_DTYPES,
+                engine='c',
+            )
+
+    temp_df = temp_df.rename(columns={"close_time": "time"})
+    return temp_df[PRICE_COLUMNS]
+
+def resample_klines(rawdf: pd.DataFrame, base_freq: str, freq: str) -> pd.DataFrame:
+    """
+    Aggregate the klines of one symbol into a higher timeframe.
+
+    Bars are bucketed by open time, like Binance builds its own intervals:
+    first open, highest high, lowest low, last close and summed volume. The
+    time of a bucket is its close time, so buckets with missing base bars
+    keep their regular boundaries. Runs on the whole series rather than per
+    month, so buckets spanning two archives are not split.
+
+    Args:
+        rawdf (DataFrame): Klines of one symbol sorted by time, with PRICE_COLUMNS
+        base_freq (str): Interval of rawdf, e.g. '5m'
+        freq (str): Target interval, a multiple of base_freq of at most one day
+    """
+    base_ms, target_ms = get_freq_ms(base_freq), get_freq_ms(freq)
+    if target_ms % base_ms != 0:
+        raise ValueError(f"Cannot build {freq} klines from {base_freq} klines")
+
+    if len(rawdf) == 0:
+        return rawdf[PRICE_COLUMNS].copy()
+
+    bucket = (rawdf['time'].to_numpy() - base_ms + 1) // target_ms
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+
+    return pd.DataFrame({
+        'time': bucket[starts] * target_ms + target_ms - 1,
+        'open': rawdf['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(rawdf['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(rawdf['low'].to_numpy(), starts),
+        'close': rawdf['close'].to_numpy()[ends],
+        'volume': np.add.reduceat(rawdf['volume'].to_numpy(), starts),
+    })
+
+def write_partition(temp_df: pd.DataFrame, partition_path: str):
+    os.makedirs(os.path.dirname(partition_path), exist_ok=True)
+    tmp_path = f"{partition_path}.tmp-{os.getpid()}"
+    temp_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, partition_path)
+
+def ingest_month(zip_file_path: str, partition_path: str = None):
+    """
+    Parse a monthly archive, writing it once as a Parquet partition when a path is given.
+    """
+    temp_df = read_kline_zip(zip_file_path)
+    if partition_path is not None:
+        write_partition(temp_df, partition_path)
+
+    return temp_df
+
+def is_partition_fresh(zip_file_path: str, partition_path: str) -> bool:
+    return os.path.exists(partition_path) and os.path.getmtime(partition_path) >= os.path.getmtime(zip_file_path)
+
+def get_sources_key(file_paths: List[str]) -> str:
+    """
+    Hash of the names, sizes and modification times of a set of source files.
+
+    Any archive added, removed or replaced, even by an older copy, changes the key.
+    """
+    sources = []
+    for file_path in sorted(file_paths):
+        stat = os.stat(file_path)
+        sources.append((os.path.basename(file_path), stat.st_size, stat.st_mtime_ns))
+    return hashlib.blake2b(json.dumps(sources).encode(), digest_size=8).hexdigest()
+
+def intersect_sorted(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Values present in both sorted, unique arrays, by binary search instead of a groupby.
+    """
+    if len(left) == 0 or len(right) == 0:
+        return left[:0]
+
+    idx = np.minimum(np.searchsorted(right, left), len(right) - 1)
+    return left[right[idx] == left]
+
+def read_symbol(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    rawdf = pd.concat(frames, ignore_index=True)
+    # Months are parsed independently, restore time order and drop overlaps
+    rawdf = rawdf.sort_values('time', kind='stable', ignore_index=True)
+    return rawdf.drop_duplicates('time', ignore_index=True)
+
+def align_symbols(rawdfs: dict, freq: str) -> pd.DataFrame:
+    """
+    Keep only the times every symbol has and interleave them sorted by time, then symbol.
+    """
+    symbols = sorted(rawdfs)
+    common = rawdfs[symbols[0]]['time'].to_numpy()
+    for symbol in symbols[1:]:
+        common = intersect_sorted(common, rawdfs[symbol]['time'].to_numpy())
+
+    n_times, n_symbols = len(common), len(symbols)
+    columns = {'time': np.repeat(common, n_symbols)}
+    aligned = []
+    for symbol in symbols:
+        times = rawdfs[symbol]['time'].to_numpy()
+        aligned.append(rawdfs[symbol].iloc[np.searchsorted(times, common)])
+
+    # Row t * n_symbols + s holds symbol s at common time t
+    for column in PRICE_COLUMNS[1:]:
+        values = np.empty((n_times, n_symbols), dtype=np.float64)
+        for i, symbol_df in enumerate(aligned):
+            values[:, i] = symbol_df[column].to_numpy()
+        columns[column] = values.ravel()
+
+    df = pd.DataFrame(columns)
+    df['tic'] = np.tile(np.array(symbols, dtype=object), n_times)
+    df['itvl'] = freq
+    return df
+
+def read_symbols(symbols, freq, market_type, timestamp, cache_root=None, max_workers=None) -> Dict[str, pd.DataFrame]:
+    """
+    Read the monthly archives of one interval into one frame per symbol, sorted by time.
+    """
+    # Every month archive of every symbol, with its partition path when caching
+    months = {}
+    for symbol in symbols:
+        directory = get_klines_path(market_type, symbol, freq, timestamp)
+        months[symbol] = []
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith('.zip'):
+                continue
+
+            zip_file_path = os.path.join(directory, file_name)
+            partition_path = None
+            if cache_root is not None:
+                partition_path = os.path.join(cache_root, symbol, freq, file_name[:-len('.zip')] + '.parquet')
+            months[symbol].append((zip_file_path, partition_path))
+
+    pending = [
+        month for symbol_months in months.values() for month in symbol_months
+        if month[1] is None or not is_partition_fresh(*month)
+    ]
+    parsed = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(ingest_month, *zip(*pending), chunksize=max(1, len(pending) // 64))
+            parsed = dict(zip((zip_file_path for zip_file_path, _ in pending), results))
+
+    rawdfs = {}
+    for symbol, symbol_months in months.items():
+        frames = []
+        for zip_file_path, partition_path in symbol_months:
+            if zip_file_path in parsed:
+                frames.append(parsed[zip_file_path])
+            else:
+                frames.append(pd.read_parquet(partition_path))
+        rawdfs[symbol] = read_symbol(frames)
+
+    return rawdfs
+
+def read_resampled(rawdfs, base_freq, freq, market_type, timestamp, cache_root=None) -> Dict[str, pd.DataFrame]:
+    """
+    Build one higher interval for every symbol from its base klines.
+
+    With a cache root, each symbol is written once as a Parquet file next to
+    its base partitions. The file name carries the key of the base archives
+    (see get_sources_key), so adding, removing or replacing an archive
+    rebuilds it and drops the outdated file.
+    """
+    resampled = {}
+    for symbol, rawdf in rawdfs.items():
+        if cache_root is None:
+            resampled[symbol] = resample_klines(rawdf, base_freq, freq)
+            continue
+
+        directory = get_klines_path(market_type, symbol, base_freq, timestamp)
+        zip_file_paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.zip')]
+        partition_dir = os.path.join(cache_root, symbol, f"{freq}_from_{base_freq}")
+        prefix = f"{timestamp or 'all'}-"
+        partition_path = os.path.join(partition_dir, f"{prefix}{get_sources_key(zip_file_paths)}.parquet")
+        if os.path.exists(partition_path):
+            resampled[symbol] = pd.read_parquet(partition_path)
+            continue
+
+        resampled[symbol] = resample_klines(rawdf, base_freq, freq)
+        write_partition(resampled[symbol], partition_path)
+        for name in os.listdir(partition_dir):
+            if name.startswith(prefix) and name.endswith('.parquet') and name != os.path.basename(partition_path):
+                os.remove(os.path.join(partition_dir, name))
+
+    return resampled
+
+def read2df(symbols, freqs, market_type="spot", timestamp="", cache_dir=KLINES_CACHE_DIR, max_workers=None, resample=False):
+    """
+    Read monthly Binance klines of several symbols into one aligned DataFrame per frequency.
+
+    Archives are parsed in a process pool. With a cache directory, every
+    month is converted once into a Parquet partition and later calls only
+    parse archives that are new or changed.
+
+    Args:
+        symbols (list): Trading symbols. If None, reads every downloaded symbol
+        freqs (dict): Dictionary of frequencies
+        market_type (str): Market type (default: 'spot')
+        timestamp (str): Date range subdirectory of the download, if any
+        cache_dir (str): Partition cache directory, relative to the data root. None disables caching
+        max_workers (int): Parser processes, defaults to the CPU count
+        resample (bool): Only read the finest interval and build the others from it,
+            cached next to the base partitions
+    """
     # List to store individual DataFrames
     dfs = []
     if market_type != 'spot':
         market_type = f'futures/{market_type}'
 
     if symbols is None:
-        klines_path = os.path.abspath(f'./binance-public-data/python/data/{market_type}/monthly/klines/')
-        symbols = [folder for folder in os.listdir(klines_path)]
+        symbols = [folder for folder in os.listdir(get_klines_path(market_type))]
+
+    cache_root = None
+    if cache_dir is not None:
+        cache_root = os.path.abspath(os.path.join(KLINES_ROOT, cache_dir, market_type))
+
+    # Interval read from disk for each requested interval
+    if resample:
+        base_freq = min(freqs.keys(), key=get_freq_ms)
+        sources = {freq: base_freq for freq in freqs.keys()}
+    else:
+        sources = {freq: freq for freq in freqs.keys()}
+
+    rawdfs = {}
+    for freq, base_freq in sources.items():
+        if freq == base_freq:
+            rawdfs[freq] = read_symbols(symbols, freq, market_type, timestamp, cache_root, max_workers)
+    for freq, base_freq in sources.items():
+        if freq != base_freq:
+            rawdfs[freq] = read_resampled(rawdfs[base_freq], base_freq, freq, market_type, timestamp, cache_root)
 
     # Loop through each freq
     for freq in freqs.keys():
-        # Loop through each symbol
-        rawdfs = []
-        
-        for symbol in symbols:
-            if timestamp != "" :
-                time = timestamp
-                directory = os.path.abspath(f'./binance-public-data/python/data/{market_type}/monthly/klines/{symbol}/{freq}/{time}')
-            else:
-                directory = directory = os.path.abspath(f'./binance-public-data/python/data/{market_type}/monthly/klines/{symbol}/{freq}')
-            
-
-            # Loop through each zip file in the directory
-            for file_name in os.listdir(directory):
-                if file_name.endswith('.zip'):
-                    zip_file_path = os.path.join(directory, file_name)
-                    
-                    if os.path.exists(zip_file_path):
-                        with zipfile.ZipFile(os.path.join(directory, file_name), 'r') as zip_ref:
-                            # only one CSV file in each zip archive
-                            csv_file = zip_ref.namelist()[0]
-                            with zip_ref.open(csv_file) as csv_fp:
-                                # Read the CSV data into a DataFrame
-                                temp_df = pd.read_csv(csv_fp, header=None)
-                                temp_df.columns = [
-                                    'open_time', 'open', 'high', 'low', 'close', 'volume', 
-                                    'close_time', 'quote_asset_volume', 'number_of_trades', 
-                                    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-                                ]
-                                temp_df = temp_df.rename(columns={"close_time": "time"})
-                                temp_df['tic'] = symbol
-                                temp_df['itvl'] = freq
-
-                                rawdfs.append(temp_df[['time', 'open', 'high', 'low', 'close', 'volume', 'tic', 'itvl']])
-
-
-        # Concatenate all symbols into a single DataFrame
-        rawdf = pd.concat(rawdfs, ignore_index=True)
-        # Count the number of unique 'tic' values per date
-        tic_counts = rawdf.groupby('time')['tic'].nunique()
-
-        # Filter the DataFrame to keep only rows where all 'tic' values participate
-        df = rawdf[rawdf['time'].isin(tic_counts[tic_counts == len(rawdf['tic'].unique())].index)]
-        # Only wanted columns
-        df = df[['time', 'open', 'high', 'low', 'close', 'volume', 'tic', 'itvl']]
-        df = df[df['time']!='close_time']
-
+        df = align_symbols(rawdfs[freq], freq)
         df['datetime'] = pd.to_datetime(df['time'], unit='ms',  errors = 'coerce')
-        # Drop rows with NaT in datetime
-        df = df.dropna(subset=['datetime'])
-        numeric_columns = df.columns.difference(['datetime', 'tic', 'itvl'])
-        
-        df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce')
-
-        df = df.sort_values(['time', 'tic', 'itvl'],ignore_index=True,)
-        df = df.drop_duplicates()
-        df = df.dropna()
-        
+        # Drop rows with NaT in datetime or missing prices
+        df = df.dropna(ignore_index=True)
+
         dfs.append(df)
-    
+
     return dfs
 
+def align_timeframe(df: pd.DataFrame, higher_df: pd.DataFrame, freq: str, columns: List[str] = PRICE_COLUMNS[1:]) -> pd.DataFrame:
+    """
+    Add the last closed bar of a higher timeframe to every row of a read2df frame.
+
+    A row closing at t only sees higher bars that closed at or before t, so
+    the added columns never look ahead. Rows before the first closed higher
+    bar get NaN.
+
+    Args:
+        df (DataFrame): Base frame from read2df
+        higher_df (DataFrame): Higher timeframe frame from read2df, same symbols
+        freq (str): Interval of higher_df, used as column suffix, e.g. close_1h
+        columns (list): Columns of higher_df to add
+    """
+    higher = higher_df[['time', 'tic'] + list(columns)].rename(
+        columns={column: f"{column}_{freq}" for column in columns}
+    )
+    higher['time'] = higher['time'].astype(df['time'].dtype)
+    aligned = pd.merge_asof(
+        df.reset_index(drop=True),
+        higher,
+        on='time',
+        by='tic',
+        direction='backward',
+        allow_exact_matches=True,
+    )
+    return aligned
+
+def parse_date(value) -> pd.Timestamp:
+    try:
+        return pd.Timestamp(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Column 'datetime' does not hold dates: {value!r}") from e
+
+def search_dates(times: pd.Series, dates, side: str = 'left') -> np.ndarray:
+    """
+    Positions of dates in a sorted 'datetime' column, like Series.searchsorted.
+
+    Text dates (CSV frames) are not converted as a whole, the binary search
+    parses only the rows it probes, O(log n) per date.
+
+    Args:
+        times (pd.Series): Sorted 'datetime' column, datetime64 or text
+        dates: Dates to search, anything pd.Timestamp takes
+        side (str): 'left' or 'right', like searchsorted
+
+    Raises:
+        ValueError: If a probed row is not a date
+    """
+    dates = pd.to_datetime(np.atleast_1d(dates))
+    if pd.api.types.is_datetime64_any_dtype(times):
+        return times.searchsorted(dates, side=side)
+
+    values = times.array
+    positions = np.empty(len(dates), dtype=np.int64)
+    for i, date in enumerate(dates):
+        low, high = 0, len(values)
+        while low < high:
+            middle = (low + high) // 2
+            value = parse_date(values[middle])
+            if value < date or (side == 'right' and value == date):
+                low = middle + 1
+            else:
+                high = middle
+        positions[i] = low
+    return positions
+
+def date_slice(df: pd.DataFrame, start_date, end_date, include_start: bool = True) -> pd.DataFrame:
+    """
+    Rows of a frame sorted by 'datetime' with start_date <= datetime < end_date.
+
+    Bounds are found by binary search and the rows are taken as one slice,
+    instead of comparing every row against both dates. Text dates are
+    searched without converting the column, see search_dates.
+
+    Args:
+        df (pd.DataFrame): Frame sorted by its 'datetime' column
+        start_date: First date, None from the first row
+        end_date: First date excluded, None up to the last row
+        include_start (bool): Whether rows at exactly start_date are kept
+    """
+    times = df['datetime']
+    first = 0 if start_date is None else int(search_dates(times, start_date, 'left' if include_start else 'right')[0])
+    last = len(df) if end_date is None else int(search_dates(times, end_date)[0])
+    return df.iloc[first:max(first, last)].reset_index(drop=True)
+
 def split_into_train_test(dfs: List[pd.DataFrame], start_date: str, trade_date: str, end_date: str):
     trains, tests, combined = [], [], []
-    for i in range(len(dfs)):
-        trains.append(dfs[i][(dfs[i]['datetime'] > start_date) & (dfs[i]['datetime'] < trade_date)].reset_index(drop=True))
-        tests.append(dfs[i][(dfs[i]['datetime'] >= trade_date) & (dfs[i]['datetime'] < end_date)].reset_index(drop=True))
-        combined.append(dfs[i][(dfs[i]['datetime'] >= start_date) & (dfs[i]['datetime'] < end_date)].reset_index(drop=True))
+    for df in dfs:
+        trains.append(date_slice(df, start_date, trade_date, include_start=False))
+        tests.append(date_slice(df, trade_date, end_date))
+        combined.append(date_slice(df, start_date, end_date))
 
     return trains, tests, combined
-    
\ No newline at end of file
+
+def walk_forward_splits(df: pd.DataFrame, start_date, end_date, train_period, test_period, step=None) -> List[tuple]:
+    """
+    Rolling walk-forward (train, test) frames of a frame sorted by 'datetime'.
+
+    Fold k trains on [start_date + k * step, + train_period) and tests on the
+    following test_period. Folds whose test period passes end_date are left
+    out. Every bound comes from one binary search over the whole fold grid.
+    Text dates are searched without converting the column, see search_dates.
+
+    Args:
+        df (pd.DataFrame): Frame sorted by its 'datetime' column
+        start_date: Start of the first fold
+        end_date: End of the data used, excluded
+        train_period: Train length, anything pd.Timedelta takes, e.g. '90D'
+        test_period: Test length
+        step: Shift between folds, defaults to test_period
+
+    Returns:
+        list: (train, test) frame pairs, in time order
+    """
+    train_period = pd.Timedelta(train_period)
+    test_period = pd.Timedelta(test_period)
+    step = test_period if step is None else pd.Timedelta(step)
+
+    fold_starts = pd.date_range(pd.Timestamp(start_date), pd.Timestamp(end_date) - train_period - test_period, freq=step)
+    bounds = np.stack([fold_starts, fold_starts + train_period, fold_starts + train_period + test_period], axis=1)
+    rows = search_dates(df['datetime'], bounds.ravel()).reshape(bounds.shape)
+
+    return [
+        (df.iloc[first:middle].reset_index(drop=True), df.iloc[middle:last].reset_index(drop=True))
+        for first, middle, last in rows
+    ]
@@ -1,3 +1,7 @@
-from .environments import *
-from .libs import *
-from .models import *
\ No newline at end of file
+from src.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    submodules=['.environments', '.libs', '.models'],
+    fallbacks=['.environments', '.libs', '.models'],
+)
@@ -1,2 +1,21 @@
-from .components import account, broker, inventory_manager, observations, order, price_provider, records, rewards, PositionStatus
-from .trading_env import TradingEnvironment
\ No newline at end of file
+from src.lazy import attach
+
+# The vectorized env pulls in stable_baselines3 and torch, load it only when used
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    submodules=[
+        '.components.account',
+        '.components.broker',
+        '.components.inventory_manager',
+        '.components.observations',
+        '.components.order',
+        '.components.price_provider',
+        '.components.records',
+        '.components.rewards',
+    ],
+    exports={
+        '.components': ['PositionStatus'],
+        '.trading_env': ['TradingEnvironment', 'make_env'],
+        '.vec_trading_env': ['VecTradingEnvironment'],
+    },
+)
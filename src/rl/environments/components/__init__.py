@@ -1,9 +1,44 @@
-from .account import Account
-from .inventory_manager import InventoryManager
-from .order import Order
-from .price_provider import PriceProvider
-from .records import Records, PositionStatus
-from .broker import Broker
-from .action import *
-from .rewards import *
-from .observations import *
\ No newline at end of file
+from src.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    submodules=[
+        '.account',
+        '.action',
+        '.broker',
+        '.episode_prefetcher',
+        '.inventory_manager',
+        '.observations',
+        '.price_provider',
+        '.records',
+        '.rewards',
+    ],
+    exports={
+        '.account': ['Account'],
+        '.inventory_manager': ['InventoryManager', 'MARK_KEYS'],
+        '.price_provider': ['PriceProvider', 'PriceSlice', 'PriceRow'],
+        '.episode_prefetcher': ['EpisodePrefetcher', 'EpisodeWindow'],
+        '.records': ['Records', 'PositionStatus'],
+        '.broker': ['Broker'],
+        '.action': ['actions', 'checkActionName', 'getActionSpace', 'getActionFromBox'],
+        '.rewards': [
+            'RewardCounter',
+            'ParamsPostActionDualMA',
+            'ParamsPostUpdateDualMA',
+            'ParamsPostActionDonchian',
+            'ParamsPostUpdateDonchian',
+        ],
+        '.observations': [
+            'ObservationProvider',
+            'get_market_columns',
+            'ParamsObsDualMA',
+            'ParamsAccountObsDualMA',
+            'ParamsObsDonchian',
+            'ParamsAccountObsDonchian',
+            'get_donchian_obs_dict',
+            'DonchianObsDict',
+        ],
+    },
+    # Star exports of the rewards and observations packages, including their submodules
+    fallbacks=['.rewards', '.observations'],
+)
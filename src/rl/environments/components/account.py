@@ -1,6 +1,5 @@
 import math
-from typing import List
-from .order import Order
+from .inventory_manager import InventoryManager
 
 class Account:
     def __init__(self, balance: float):
@@ -26,15 +25,9 @@ class Account:
         self.local_high = self.balance_initial
         self.local_low = self.balance_initial
 
-    def updateMargin(self, price: float, orders: List[Order]):
-        marginUsed = 0.0
-        profits = 0.0
-        isAnyOrder = len(orders) != 0
-        if isAnyOrder:
-            for order in orders:
-                order.updateProfit(price)
-                marginUsed += order.marginUsed
-                profits += order.profit
+    def updateMargin(self, price: float, im: InventoryManager):
+        marginUsed, profits = im.markToMarket(price)
+        isAnyOrder = im.getOrderCount() != 0
 
         self.margin_position = marginUsed
         self.margin_available = self.balance - marginUsed
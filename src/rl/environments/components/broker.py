@@ -3,7 +3,8 @@ import numpy as np
 from typing import Dict, List
 
 from .account import Account
-from .inventory_manager import InventoryManager, OrderInfo
+from .inventory_manager import InventoryManager
+from src.rl.libs.utils import OrderEvent, OrderType, OrderReason
 from .records import Records
 
 class Broker:
@@ -31,7 +32,7 @@ class Broker:
             env_config['is_long_only'],
             env_config['starting_balance']
         )
-        self.re = Records(record_history)
+        self.re = Records(record_history, positionSource=self.im.getCurrentPosition)
         self.row_data: Dict[str, float] = {}
         self.n_step: int = 0
         self.n_step_idle: int = 0
@@ -60,7 +61,7 @@ class Broker:
         
         return info
 
-    def takeAction(self, action: int) -> OrderInfo:
+    def takeAction(self, action: int) -> OrderEvent:
 
         if action == 0:
             if self.im.inventory < 0:
@@ -75,9 +76,9 @@ class Broker:
             if not self.is_long_only:
                 return self.sell()
         
-        return OrderInfo(order="wait", reason="idle", size=0, price=0.0, profit=0.0)
+        return self.im.event.set(OrderType.WAIT, OrderReason.IDLE)
     
-    def buy(self) -> OrderInfo:
+    def buy(self) -> OrderEvent:
         close = self.row_data["close"]
         row_data = self.row_data
         info = self.im.buy(close, self.ac.balance, row_data)
@@ -85,7 +86,7 @@ class Broker:
         self.afterSales(close, info)
         return info
 
-    def sell(self) -> OrderInfo:
+    def sell(self) -> OrderEvent:
         close = self.row_data["close"]
         mark = self.row_data
         info = self.im.sell(close, self.ac.balance, mark)
@@ -93,43 +94,39 @@ class Broker:
         self.afterSales(close, info)
         return info
     
-    def closeAllOrders(self) -> OrderInfo:
+    def closeAllOrders(self) -> OrderEvent:
         closePrice = self.row_data["close"]
         info = self.im.closeAllOrders(closePrice)
 
         self.afterSales(closePrice, info)
         return info
     
-    def afterSales(self, close: float, info: OrderInfo):
-        if info["profit"] != 0:
-            self.ac.balance += info["profit"]
+    def afterSales(self, close: float, info: OrderEvent):
+        if info.profit != 0:
+            self.ac.balance += info.profit
 
-        self.ac.updateMargin(close, self.im.orders)
+        self.ac.updateMargin(close, self.im)
         self.ac.updateDrawdown()
 
     def afterAction(self, info):
         self.n_step += 1
 
         # Add idle count
-        if info['order'] == 'wait':
+        if info.order == OrderType.WAIT:
             self.n_step_idle += 1
         else:
             self.n_step_idle = 0
 
-        positionStatus = self.im.getCurrentPosition()
-
         self.re.recordStep(
             self.row_data["close"],
             self.ac.equity,
             self.im.inventory,
-            positionStatus,
             info,
-            self.row_data
         )
 
     def updateState(self, row: Dict[str, float]):
         self.row_data = row
-        self.ac.updateMargin(self.row_data["close"], self.im.orders)
+        self.ac.updateMargin(self.row_data["close"], self.im)
         self.ac.updateDrawdown()
         self.updateLowestPoint()
 
@@ -158,7 +155,7 @@ class Broker:
             self.lowest_point = 0
     
     def getDiffFromAvgPos(self, mark: float):
-        if len(self.im.orders) == 0:
+        if self.im.getOrderCount() == 0:
             return 0.0
         
         avgPos = self.im.getAveragePrice('SMA5')
@@ -166,7 +163,7 @@ class Broker:
         return currentDiff
     
     def getDiffFromLatest(self, mark: float):
-        if len(self.im.orders) == 0:
+        if self.im.getOrderCount() == 0:
             return 0.0
         
         lastPos = self.im.getLastEntry('SMA5')
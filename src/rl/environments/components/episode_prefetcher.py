@@ -0,0 +1,108 @@
+import queue
+import random
+import threading
+import numpy as np
+
+from .price_provider import PriceProvider, PriceSlice, PriceRow
+
+
+class EpisodeWindow:
+    """
+    Everything reset needs from a randomized episode, prepared ahead of time.
+    """
+    __slots__ = ('priceData', 'market', 'row')
+
+    def __init__(self, priceData: PriceSlice, market: np.ndarray, row: PriceRow):
+        self.priceData = priceData
+        self.market = market
+        self.row = row
+
+
+class EpisodePrefetcher:
+    """
+    Prepares the next randomized episode windows on a worker thread.
+
+    Each window holds the price slice, its block of precomputed market
+    observations and the first broker row, so reset only swaps one in.
+    Only the worker draws starts, in order, from a private RNG seeded from
+    `random`, so the sequence of episodes stays reproducible under
+    random.seed() whatever the thread timing. An exception of the worker is
+    raised by the next call to next().
+
+    When the price columns are memory-mapped, windows are copied into
+    memory on the worker. Page faults then happen off the reset path.
+
+    :param priceProvider: provider of the price columns
+    :param market: market observation block of the whole series
+    :param nSteps: episode length
+    :param depth: number of windows kept ready
+    :param isMaterialize: copy windows into memory, defaults to True for mapped columns
+    """
+    def __init__(self,
+        priceProvider: PriceProvider,
+        market: np.ndarray,
+        nSteps: int,
+        depth: int = 4,
+        isMaterialize: bool = None,
+        ):
+        if depth < 1:
+            raise ValueError("Prefetch depth must be at least 1")
+
+        self.priceProvider = priceProvider
+        self.market = market
+        self.nSteps = nSteps
+        self.isMaterialize = priceProvider.mmapMode is not None if isMaterialize is None else isMaterialize
+        self.rng = random.Random(random.getrandbits(64))
+        self.windows = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='episode-prefetcher', daemon=True)
+        self.thread.start()
+
+    def prepare(self) -> EpisodeWindow:
+        priceData = self.priceProvider.fetchDataSlice(self.nSteps, rng=self.rng)
+        market = self.market[priceData.start:priceData.start + len(priceData)]
+        if priceData.symbol is not None:
+            market = market[:, priceData.symbol]
+
+        if self.isMaterialize:
+            priceData = priceData.materialize()
+            market = np.array(market)
+
+        return EpisodeWindow(priceData, market, priceData[0])
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                window = self.prepare()
+                while not self.stopped.is_set():
+                    try:
+                        self.windows.put(window, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self.error = e
+
+    def next(self) -> EpisodeWindow:
+        """
+        Take the next window, waiting for the worker when none is ready.
+        """
+        while True:
+            try:
+                return self.windows.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+            if self.error is not None:
+                raise self.error
+            if self.thread is None:
+                raise RuntimeError("Episode prefetcher is closed")
+
+    def close(self):
+        if self.thread is None:
+            return
+
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
@@ -1,9 +1,10 @@
 import random
 import math
-from .order import Order
-from src.rl.libs.utils import OrderInfo, PositionStatus
+import numpy as np
+from src.rl.libs.utils import OrderEvent, OrderType, OrderReason, PositionStatus
 
 AVG_DOWN_TRES = 0.05
+MARK_KEYS = ('close', 'SMA5')
 
 
 class InventoryManager(): 
@@ -15,7 +16,8 @@ class InventoryManager():
         fundingFee: float, 
         isRandomInventory: bool, 
         isLongOnly: bool,
-        balance: float
+        balance: float,
+        markKeys: tuple[str] = MARK_KEYS
         ):
         self.isRandomizeInventory = isRandomInventory
         self.maxOrder = maxOrders
@@ -25,7 +27,6 @@ class InventoryManager():
         self.fundingFee = fundingFee
         self.isLongOnly = isLongOnly
         self.inventory: int = 0
-        self.orders: list[Order] = []
         self.ordersProfitable = 0
         self.initialSize = self.getSize(balance)
         self.tradeTotal = 0
@@ -37,9 +38,32 @@ class InventoryManager():
         self.shortTermProfits = 0
         self.sumHoldingTime = 0
         self.rowData = None
+        # Reused by every buy/sell/close so no event is allocated per step
+        self.event = OrderEvent()
+
+        # Open positions are stacked LIFO in fixed-capacity arrays, the only
+        # record of open orders. Slot i holds order i and the running sums of
+        # orders 0..i, so aggregates are O(1) reads and closing the last order
+        # only moves the count back. Open orders all share the inventory sign.
+        self.markKeys = {key: i for i, key in enumerate(markKeys)}
+        self.count = 0
+        self.entryMarks = np.zeros((maxOrders, len(markKeys)))
+        self.sizes = np.zeros(maxOrders)
+        self.entryPrices = np.zeros(maxOrders)
+        self.comissions = np.zeros(maxOrders)
+        self.fundingFees = np.zeros(maxOrders)
+        self.entryTicks = np.zeros(maxOrders, dtype=np.int64)
+        self.cumSize = np.zeros(maxOrders)
+        self.cumMarkSize = np.zeros((maxOrders, len(markKeys)))
+        self.cumMargin = np.zeros(maxOrders)
+        self.cumSizeOverEntry = np.zeros(maxOrders)
+        self.cumFees = np.zeros(maxOrders)
+        # Number of mark-to-market updates, holding times derive from it
+        self.clock = 0
         
     def reset(self, balance: float, rowData: dict):
-        self.orders = []
+        self.count = 0
+        self.clock = 0
         self.ordersProfitable = 0
         self.tradeTotal = 0
         self.initialSize = self.getSize(balance)
@@ -64,7 +88,7 @@ class InventoryManager():
             return 0
 
         # Determine the position (buy or sell) based on the sign of randomInventory
-        position = "buy" if randomInventory > 0 else "sell"
+        position = OrderType.BUY if randomInventory > 0 else OrderType.SELL
         numOrders = abs(randomInventory)
 
         for _ in range(numOrders):
@@ -74,84 +98,63 @@ class InventoryManager():
         # Update the inventory
         return randomInventory
 
-    def buy(self, price: float, balance: float, rowData: dict) -> OrderInfo:
-        position = "buy"
+    def buy(self, price: float, balance: float, rowData: dict) -> OrderEvent:
+        position = OrderType.BUY
 
         res = self.preOrderFunc(position, price)
-        if res != None:
+        if res is not None:
             return res
         
         profit = self.executeOrder(position, balance, rowData)
-        return OrderInfo(
-            order=position,
-            size=1,
-            price=price,
-            profit=profit
-        )
+        return self.event.set(position, size=1, price=price, profit=profit)
     
-    def sell(self, price: float, balance: float, rowData: dict) -> OrderInfo:
-        position = "sell"
+    def sell(self, price: float, balance: float, rowData: dict) -> OrderEvent:
+        position = OrderType.SELL
 
         res = self.preOrderFunc(position, price)
-        if res != None:
+        if res is not None:
             return res
         
-        profit = self.executeOrder(position, price, balance, rowData)
-        return OrderInfo(
-            order=position,
-            size=1,
-            price=price,
-            profit=profit
-        )
+        profit = self.executeOrder(position, balance, rowData)
+        return self.event.set(position, size=1, price=price, profit=profit)
     
     def closeAllOrders(self, closePrice: float):
         totalProfit = 0.0
-        countOrder = len(self.orders)
+        countOrder = self.count
 
         if self.inventory > 0:
-            label = "sell"
+            label = OrderType.SELL
         else:
-            label = "buy"
+            label = OrderType.BUY
             
         for _ in range(countOrder):
             profit = self.closeOrder(closePrice)
             totalProfit += profit
             
-        return OrderInfo(
-            order=label, 
-            size=countOrder,
-            price=closePrice, 
-            profit=totalProfit,
-            reason=""
-        )
+        return self.event.set(label, OrderReason.NONE, countOrder, closePrice, totalProfit)
     
     def applyFundingFee(self):
-        for order in self.orders:
-            order.addFundingFee(self.fundingFee)
+        # Every order pays size * fee, so slot i grows by fee * (size of orders 0..i)
+        self.fundingFees[:self.count] += self.sizes[:self.count] * self.fundingFee
+        self.cumFees[:self.count] += self.cumSize[:self.count] * self.fundingFee
     
-    def preOrderFunc(self, position: str, price: float):
-        if len(self.orders) >= self.maxOrder:
-            return OrderInfo(
-                order="wait",
-                reason="max inventory reached",
-                profit=0.0,
-                price=price
-            )
+    def preOrderFunc(self, position: OrderType, price: float):
+        if self.count >= self.maxOrder:
+            return self.event.set(OrderType.WAIT, OrderReason.MAX_INVENTORY, price=price, profit=0.0)
         
         return None
             
-    def createOrder(self, position: str, margin_used: float, mark: dict):
-        order = Order(position, margin_used, self.leverage, mark, self.tradeComission)
-        self.orders.append(order)
+    def createOrder(self, position: OrderType, margin_used: float, mark: dict):
+        self.pushEntry(margin_used, mark)
 
-        if order.position == "buy":
+        if position == OrderType.BUY:
             self.inventory += 1
         else:
             self.inventory -= 1
         
-    def executeOrder(self, position: float, balance: float, mark: dict ):
+    def executeOrder(self, position: OrderType, balance: float, mark: dict ):
         profit = 0.0
-        isBuyOrSell = self.inventory >= 0 if position == "buy" else self.inventory <= 0
+        isBuyOrSell = self.inventory >= 0 if position == OrderType.BUY else self.inventory <= 0
         
         if isBuyOrSell:
             marginSize = self.getSize(balance)
@@ -162,11 +165,24 @@ class InventoryManager():
         return profit
     
     def closeOrder(self, price: float) -> float:
-        if len(self.orders) == 0:
+        if self.count == 0:
             return 0.0
         
-        order = self.orders.pop()
-        profit, delta = order.closePosition(price)
+        self.count -= 1
+        slot = self.count
+        size = float(self.sizes[slot])
+        entryPrice = float(self.entryPrices[slot])
+        # Closing counts as one more tick
+        holdingTime = self.clock - int(self.entryTicks[slot]) + 1
+        isLong = self.inventory > 0
+
+        # Same arithmetic as the per-order profit of the list-based bookkeeping
+        if isLong:
+            profit = (price / entryPrice - 1) * size
+        else:
+            profit = (1 - price / entryPrice) * size
+        profit -= float(self.comissions[slot]) + float(self.fundingFees[slot])
+        delta = (size + profit) / size
         
         self.tradeTotal += 1
         self.totalProfit += profit
@@ -175,16 +191,16 @@ class InventoryManager():
         if profit > 0:
             self.ordersProfitable += 1
 
-        if order.position == "buy":
+        if isLong:
             self.inventory -= 1
             self.nLongs += 1
         else:
             self.inventory += 1
             self.nShorts += 1
 
-        self.sumHoldingTime += order.holdingTime
+        self.sumHoldingTime += holdingTime
 
-        if order.holdingTime < self.shortTermThershold:
+        if holdingTime < self.shortTermThershold:
             self.shortTermProfits += 1
 
         return profit
@@ -227,24 +243,77 @@ class InventoryManager():
         else:
             return 0, abs(self.inventory)
     
+    def pushEntry(self, marginUsed: float, mark: dict):
+        slot = self.count
+        if slot >= len(self.cumSize):
+            raise ValueError("Max inventory reached")
+
+        for key, i in self.markKeys.items():
+            self.entryMarks[slot, i] = mark[key]
+
+        size = marginUsed * self.leverage
+        entryPrice = mark['close']
+        self.sizes[slot] = size
+        self.entryPrices[slot] = entryPrice
+        self.comissions[slot] = size * self.tradeComission
+        self.fundingFees[slot] = 0.0
+        self.entryTicks[slot] = self.clock
+
+        fees = self.comissions[slot]
+        if slot == 0:
+            self.cumSize[slot] = size
+            self.cumMarkSize[slot] = self.entryMarks[slot] * size
+            self.cumMargin[slot] = marginUsed
+            self.cumSizeOverEntry[slot] = size / entryPrice
+            self.cumFees[slot] = fees
+        else:
+            self.cumSize[slot] = self.cumSize[slot - 1] + size
+            self.cumMarkSize[slot] = self.cumMarkSize[slot - 1] + self.entryMarks[slot] * size
+            self.cumMargin[slot] = self.cumMargin[slot - 1] + marginUsed
+            self.cumSizeOverEntry[slot] = self.cumSizeOverEntry[slot - 1] + size / entryPrice
+            self.cumFees[slot] = self.cumFees[slot - 1] + fees
+
+        self.count += 1
+
+    def markToMarket(self, price: float) -> tuple[float, float]:
+        """
+        Margin used and unrealized profit of all open orders at `price`, in O(1).
+
+        Open orders all share one direction and their PnL is linear in price:
+        sum((price / entry - 1) * size) = price * sum(size / entry) - sum(size).
+        Each call also advances the holding clock of the open orders.
+
+        :param price: mark price
+        :return: (margin used, unrealized profit net of fees)
+        """
+        self.clock += 1
+        if self.count == 0:
+            return 0.0, 0.0
+
+        last = self.count - 1
+        profit = price * self.cumSizeOverEntry[last] - self.cumSize[last]
+        if self.inventory < 0:
+            profit = -profit
+
+        return self.cumMargin[last], profit - self.cumFees[last]
+
+    def getMarkIndex(self, mark_key: str) -> int:
+        if mark_key not in self.markKeys:
+            raise ValueError(f"Mark key {mark_key} is not tracked. Available: {list(self.markKeys)}")
+        return self.markKeys[mark_key]
+
+    def getOrderCount(self) -> int:
+        return self.count
+
     def getAveragePrice(self, mark_key: str):
-        if len(self.orders) == 0:
+        if self.count == 0:
             return 0.0
 
-        totalPrice = 0.0
-        totalSize = 0.0
-        for order in self.orders:
-            totalPrice += order.markPoint[mark_key] * order.size
-            totalSize += order.size
-
-        return totalPrice / totalSize
+        last = self.count - 1
+        return self.cumMarkSize[last, self.getMarkIndex(mark_key)] / self.cumSize[last]
     
     def getLastEntry(self, mark_key: str):
-        if not self.orders:
+        if self.count == 0:
             return 0.0
         
-        lastMark = 0
-        for order in self.orders:
-            lastMark = order.markPoint[mark_key]
-        
-        return lastMark
+        return self.entryMarks[self.count - 1, self.getMarkIndex(mark_key)]
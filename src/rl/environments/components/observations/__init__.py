@@ -1,3 +1,3 @@
-from .observations import ObservationProvider
-from .observation_01 import ParamsObsDualMA
-from .observation_02 import ParamsObsDonchian, get_donchian_obs_dict, DonchianObsDict
\ No newline at end of file
+from .observations import ObservationProvider, get_market_columns
+from .observation_01 import ParamsObsDualMA, ParamsAccountObsDualMA
+from .observation_02 import ParamsObsDonchian, ParamsAccountObsDonchian, get_donchian_obs_dict, DonchianObsDict
\ No newline at end of file
@@ -2,6 +2,10 @@ from typing import TypedDict
 import numpy as np
 from src.rl.libs.utils import fitPercentage, get_distance_from_avg_pos, get_distance_from_lowest, get_distance_given_mark, getLogValue
 
+# Price columns read by the dual MA observation and rewards
+DUAL_MA_COLUMNS = ['V3']
+DUAL_MA_FLAG_COLUMNS = []
+
 def get_dual_ma_obs(
     row_data: dict,
     mark_price: float,
@@ -42,4 +46,40 @@ class ParamsObsDualMA(TypedDict):
     n_long: int
     n_short: int
     max_order: float
-    inventory: int
\ No newline at end of file
+    inventory: int
+
+class ParamsAccountObsDualMA(TypedDict):
+    mark_price: float
+    avg_position: float
+    lowest_position: float
+    n_long: int
+    n_short: int
+    max_order: float
+    inventory: int
+
+def get_dual_ma_market_obs(columns: dict) -> np.ndarray:
+    """
+    Market-only block of the dual MA observation for the whole price series.
+
+    :param columns: price provider columns
+    :return: float32 array of shape (n, 1) holding the shaped V3, (n, symbols, 1) for a panel
+    """
+    market = np.empty(columns['V3'].shape + (1,), dtype=np.float32)
+    market[..., 0] = np.minimum(np.maximum(0.5 + columns['V3'] / 50, 0), 1)
+    return market
+
+def fill_dual_ma_account_obs(
+    obs: np.ndarray,
+    mark_price: float,
+    avg_position: float,
+    lowest_position: float,
+    n_long: int,
+    n_short: int,
+    max_order: float,
+    inventory: int,
+):
+    log_multiplier = 2
+    obs[1] = get_distance_from_avg_pos(mark_price, avg_position, inventory, log_multiplier)
+    obs[2] = get_distance_from_lowest(mark_price, lowest_position, inventory, log_multiplier)
+    obs[3] = n_long / max_order
+    obs[4] = n_short / max_order
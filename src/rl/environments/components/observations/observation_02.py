@@ -6,6 +6,10 @@ from src.rl.libs.utils import (
     get_distance_from_last,
     )
 
+# Price columns read by the Donchian observation, the flags only hold 0 or 1
+DONCHIAN_COLUMNS = ['SMA5', 'DC_UPPER', 'DC_LOWER']
+DONCHIAN_FLAG_COLUMNS = ['DC_LOWER_CHANGES', 'DC_UPPER_CHANGES', 'DC_UPPER_CHANGES_5_ROW', 'DC_LOWER_CHANGES_5_ROW']
+
 class ParamsObsDonchian(TypedDict):
     mark_price: float
     avg_position: float
@@ -93,4 +97,49 @@ def get_donchian_obs_dict(obs_array: np.ndarray) -> DonchianObsDict:
         'inventory': obs_array[8]
     }
 
-    
\ No newline at end of file
+class ParamsAccountObsDonchian(TypedDict):
+    mark_price: float
+    avg_position: float
+    lowest_position: float
+    last_buy_position: float
+    inventory: int
+    max_inventory: int
+
+def get_donchian_market_obs(columns: dict) -> np.ndarray:
+    """
+    Market-only block of the Donchian observation for the whole price series.
+
+    :param columns: price provider columns
+    :return: float32 array of shape (n, 5), (n, symbols, 5) for a panel: position inside the channel and the four shift flags
+    """
+    upper = columns['DC_UPPER']
+    lower = columns['DC_LOWER']
+    channel_range = upper - lower
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position_inside_channel = np.minimum(np.maximum((columns['SMA5'] - lower) / channel_range, 0), 1)
+    # Default to middle if channel has no range
+    position_inside_channel = np.where(channel_range == 0, 0.5, position_inside_channel)
+
+    market = np.empty(upper.shape + (5,), dtype=np.float32)
+    market[..., 0] = position_inside_channel
+    market[..., 1] = columns['DC_LOWER_CHANGES']
+    market[..., 2] = columns['DC_UPPER_CHANGES']
+    market[..., 3] = columns['DC_UPPER_CHANGES_5_ROW']
+    market[..., 4] = columns['DC_LOWER_CHANGES_5_ROW']
+    return market
+
+def fill_donchian_account_obs(
+    obs: np.ndarray,
+    mark_price: float,
+    avg_position: float,
+    lowest_position: float,
+    last_buy_position: float,
+    inventory: int,
+    max_inventory: int,
+):
+    log_multiplier = 1
+    obs[5] = get_distance_from_avg_pos(mark_price, avg_position, inventory, log_multiplier)
+    obs[6] = get_distance_from_lowest(mark_price, lowest_position, inventory, log_multiplier)
+    obs[7] = get_distance_from_last(mark_price, last_buy_position, inventory, log_multiplier)
+    obs[8] = inventory / max_inventory
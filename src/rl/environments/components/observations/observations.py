@@ -1,22 +1,80 @@
 import numpy as np
 from gymnasium.spaces import Box
 from src.rl.libs.utils import available_strategy
-from .observation_01 import get_dual_ma_obs
-from .observation_02 import get_donchian_obs
+from .observation_01 import get_dual_ma_obs, get_dual_ma_market_obs, fill_dual_ma_account_obs, DUAL_MA_COLUMNS, DUAL_MA_FLAG_COLUMNS
+from .observation_02 import get_donchian_obs, get_donchian_market_obs, fill_donchian_account_obs, DONCHIAN_COLUMNS, DONCHIAN_FLAG_COLUMNS
 
 def validate_obs_name(observation_name: str):
     if observation_name in available_strategy:
-        print(observation_name)
         return
     
     raise ValueError("Wrong obs config name")
 
+def get_market_columns(observation_type: str) -> tuple[list[str], list[str]]:
+    """
+    Price columns an observation type reads, as (values, 0/1 flags).
+    """
+    if observation_type == available_strategy[0]:
+        return DUAL_MA_COLUMNS, DUAL_MA_FLAG_COLUMNS
+    if observation_type == available_strategy[1]:
+        return DONCHIAN_COLUMNS, DONCHIAN_FLAG_COLUMNS
+
+    raise ValueError("Cannot get observation type")
+
 class ObservationProvider():
-    def __init__(self, observation_type: str) -> None:
+    def __init__(self, observation_type: str, is_verbose: bool = True) -> None:
         validate_obs_name(observation_type)
+        if is_verbose:
+            print(observation_type)
         self.type = observation_type
-        
-    def get_observation(self, params: any):
+        self.market = None
+        self.episode_market = None
+        self.buffer = np.zeros(self.get_observation_space().shape, dtype=np.float32)
+
+    def set_market_data(self, columns: dict):
+        """
+        Precompute the market-only part of the observation for the whole price series.
+
+        Panel columns give a (time, symbol, entries) block.
+        """
+        if self.type == available_strategy[0]:
+            self.market = get_dual_ma_market_obs(columns)
+        elif self.type == available_strategy[1]:
+            self.market = get_donchian_market_obs(columns)
+        else:
+            raise ValueError("Cannot get observation type")
+
+        self.episode_market = self.market
+
+    def set_episode(self, start: int, end: int, symbol: int = None):
+        if symbol is None:
+            self.episode_market = self.market[start:end]
+        else:
+            self.episode_market = self.market[start:end, symbol]
+
+    def set_episode_market(self, episode_market: np.ndarray):
+        """
+        Use a market block sliced ahead of time, e.g. by the episode prefetcher.
+        """
+        self.episode_market = episode_market
+
+    def get_observation(self, step: int, params: any):
+        """
+        Copy the precomputed market row of `step` and fill the account-dependent entries.
+        """
+        market_row = self.episode_market[step]
+        self.buffer[:len(market_row)] = market_row
+
+        if self.type == available_strategy[0]:
+            fill_dual_ma_account_obs(self.buffer, **params)
+        elif self.type == available_strategy[1]:
+            fill_donchian_account_obs(self.buffer, **params)
+        else:
+            raise ValueError("Cannot get observation type")
+
+        return self.buffer.copy()
+
+    def get_observation_from_row(self, params: any):
         if self.type == available_strategy[0]:
             return get_dual_ma_obs(**params)
 
@@ -1,65 +1,366 @@
+import numpy as np
 import pandas as pd
 import os
 import random
 
-from src.rl.libs.mocks import createPriceDataFromCSV
+from typing import Dict
+from src.rl.libs.feature_store import (
+    TIME_COLUMN,
+    TIME_DTYPE,
+    getFeatureColumns,
+    loadFeatureColumns,
+    projectColumns,
+    getCorpusFiles,
+    buildCorpusStore,
+    loadCorpusIndex,
+)
+from src.rl.libs.panel import loadPanel
+
+
+class PriceRow:
+    """
+    Light, dict-like accessor over a single row of column arrays.
+
+    Values are read lazily from the underlying arrays, so creating a row
+    never copies data.
+    """
+    __slots__ = ('columns', 'index')
+
+    def __init__(self, columns: Dict[str, np.ndarray], index: int):
+        self.columns = columns
+        self.index = index
+
+    def __getitem__(self, key: str):
+        return self.columns[key][self.index]
+
+    def __contains__(self, key: str):
+        return key in self.columns
+
+    def get(self, key: str, default=None):
+        if key not in self.columns:
+            return default
+        return self.columns[key][self.index]
+
+    def keys(self):
+        return self.columns.keys()
+
+    def to_dict(self) -> dict:
+        return {key: values[self.index] for key, values in self.columns.items()}
+
+
+class PriceSlice:
+    """
+    Episode window over the provider data, stored as zero-copy column views.
+
+    Building a slice costs one view per column, independent of its length.
+    Columns stored in a narrower float, like float32 features or (time,
+    symbol) panel columns, are copied to float64 instead, so account maths
+    do not run in the storage precision.
+    """
+    __slots__ = ('columns', 'start', 'length', 'symbol')
+
+    def __init__(self, columns: Dict[str, np.ndarray], start: int, end: int, symbol: int = None):
+        window = slice(start, end) if symbol is None else (slice(start, end), symbol)
+        self.columns = {}
+        for key, values in columns.items():
+            values = values[window]
+            if values.dtype.kind == 'f' and values.dtype.itemsize < 8:
+                values = values.astype(np.float64)
+            self.columns[key] = values
+        self.start = start
+        self.length = end - start
+        self.symbol = symbol
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index: int) -> PriceRow:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("Index out of bounds")
+        return PriceRow(self.columns, index)
+
+    def column(self, key: str) -> np.ndarray:
+        return self.columns[key]
+
+    def materialize(self) -> 'PriceSlice':
+        """
+        Copy of the slice owning its columns, e.g. to read memory-mapped data ahead of use.
+        """
+        window = PriceSlice({key: np.array(values) for key, values in self.columns.items()}, 0, self.length)
+        window.start = self.start
+        window.symbol = self.symbol
+        return window
 
 
 class PriceProvider:
-    def __init__(self, 
+    def __init__(self,
         fileName='PEPEUSDT.csv',
         directory='',
         randomize=False,
         indicators=[],
         derivedIndicators=[],
+        cacheDir=None,
+        storePath=None,
+        isShared=False,
+        isVerbose=True,
+        panelPath=None,
+        dtypes=None,
+        corpus=None,
         ):
         self.indicators = indicators
         self.derivedIndicators = derivedIndicators
         self.dir = directory
-        self.fromRecords(fileName)
+        self.cacheDir = cacheDir
+        self.isVerbose = isVerbose
+        # Columns kept after the indicators are computed and their storage dtype, None keeps them all
+        self.dtypes = dtypes
+        # Shared mode maps the cached columns read-only instead of loading a private copy
+        self.mmapMode = 'r' if isShared else None
+        # Symbols of a multi-symbol panel, None for a single price series
+        self.symbols = None
+        # Files of a corpus and the row where each one starts, None for a single price series
+        self.files = None
+        self.offsets = None
+        # Cumulative episode starts per file, by episode length
+        self.corpusWindows = {}
+        # Row times for date lookups, None when the source has no time column
+        self.times = None
+        if panelPath is not None:
+            self.fromPanel(panelPath)
+        elif corpus is not None and storePath is None:
+            self.fromCorpus(corpus)
+        elif storePath is not None:
+            self.fromStore(storePath)
+        else:
+            self.fromRecords(fileName)
         self.randomize = randomize
+        # Rows [start, end) episodes are sampled from, see setDateRange
+        self.sampleRange = (0, self.length)
+
+    def __len__(self):
+        return self.length
 
     def getRow(self, index):
-        if 0 <= index < len(self.df):
-            return self.df.iloc[index]
+        if 0 <= index < self.length:
+            return PriceRow(self.columns, index)
         else:
             raise IndexError("Index out of bounds")
-        
+
     def fromRecords(self, fileName):
         priceHistoryDir = self.dir
         csvFiles = [f for f in os.listdir(priceHistoryDir) if f.endswith('.csv')]
-        
+
         if not csvFiles:
             raise FileNotFoundError("No CSV files found in ./price_history directory")
-        
+
+        if self.mmapMode is not None and self.cacheDir is None:
+            raise ValueError("Shared price data requires a feature cache directory")
+
         csvFilePath = os.path.join(priceHistoryDir, fileName)
-        data = createPriceDataFromCSV(
-            csvFilePath, 
-            self.indicators, 
-            self.derivedIndicators
+        columns = getFeatureColumns(
+            csvFilePath,
+            self.indicators,
+            self.derivedIndicators,
+            self.cacheDir,
+            self.mmapMode,
+            self.isVerbose,
+            self.dtypes
         )
-        print(data.head())
+        self.fromColumns(columns)
+        if self.isVerbose:
+            print(f"Price provider - Loaded {self.length} rows from {fileName}")
 
-        self.df = data.to_dict('records')
+    def fromStore(self, storePath: str):
+        self.fromColumns(loadFeatureColumns(storePath, self.mmapMode))
+        self.files, self.offsets = loadCorpusIndex(storePath)
 
-    def fetchDataSlice(self, 
-        nSteps = 8640, 
-        startingIndex=0, 
-        endIndex=None
-        ):
+    def fromCorpus(self, corpus: str):
+        """
+        Sample episodes across every price CSV of a directory or glob pattern.
+
+        Features are built once per file into one memory-mapped store, so the
+        corpus is paged in on demand rather than held in RAM. Relative
+        patterns are resolved against the provider directory.
+        """
+        if self.cacheDir is None:
+            raise ValueError("Corpus price data requires a feature cache directory")
+
+        files = getCorpusFiles(os.path.join(self.dir, corpus))
+        storePath = buildCorpusStore(
+            files,
+            self.indicators,
+            self.derivedIndicators,
+            self.cacheDir,
+            self.isVerbose,
+            self.dtypes
+        )
+        # Always mapped, a private copy would defeat the point of a corpus
+        self.fromColumns(loadFeatureColumns(storePath, 'r'))
+        self.files, self.offsets = loadCorpusIndex(storePath)
+        if self.isVerbose:
+            print(f"Price provider - Loaded {self.length} rows from {len(self.files)} files")
+
+    def fromPanel(self, panelPath: str):
+        """
+        Sample episodes across the symbols of a panel built by buildPanel.
+
+        Columns are (time, symbol) views of the memory-mapped panel, every
+        episode picks a symbol and a start.
+        """
+        panel = loadPanel(panelPath, 'r')
+        # Panel times are kept apart from the features
+        features = panel.features if self.dtypes is None else [name for name in self.dtypes if name != TIME_COLUMN]
+        missing = [name for name in list(self.indicators) + ['close'] + features if name not in panel.featureIndex]
+        if missing:
+            raise ValueError(f"Panel is missing features {missing}. Available: {panel.features}")
 
+        self.symbols = panel.symbols
+        # The panel keeps its own dtype, projecting only drops the views of unused features
+        self.columns = {feature: panel.column(feature) for feature in features}
+        self.times = panel.times.astype(TIME_DTYPE)
+        self.length = len(panel)
+        if self.isVerbose:
+            print(f"Price provider - Loaded {self.length} rows of {len(self.symbols)} symbols from {panelPath}")
+
+    def fromDataFrame(self, data: pd.DataFrame):
+        self.fromColumns({column: data[column].to_numpy() for column in data.columns})
+
+    def fromColumns(self, columns: Dict[str, np.ndarray]):
+        # Struct-of-arrays layout: one contiguous array per feature column
+        self.columns: Dict[str, np.ndarray] = {
+            column: np.ascontiguousarray(values) for column, values in projectColumns(columns, self.dtypes).items()
+        }
+        self.length = len(next(iter(self.columns.values()))) if self.columns else 0
+        if TIME_COLUMN in self.columns:
+            self.times = self.columns[TIME_COLUMN].astype(TIME_DTYPE, copy=False)
+
+    def fetchDataSlice(self,
+        nSteps = 8640,
+        startingIndex=0,
+        endIndex=None,
+        rng: random.Random = None
+        ) -> PriceSlice:
+
+        if self.offsets is not None:
+            return self.fetchCorpusSlice(nSteps, startingIndex, endIndex, rng)
+
+        start, end = self.sampleRange
         if self.randomize:
-            max_start = len(self.df) - nSteps
-            print("Starting index:",startingIndex)
-            startingIndex = random.randint(0, max_start)
+            max_start = end - nSteps
+            startingIndex = (rng or random).randint(start, max_start)
+        else:
+            startingIndex += start
         endIndex = startingIndex + nSteps if endIndex is None else endIndex
-        
-        if endIndex > len(self.df):
+
+        if endIndex > end:
             raise ValueError("End index exceeds data length")
-            
-        data_slice = pd.DataFrame(self.df[startingIndex:endIndex])
-        
-        # first_log_sma = data_slice['LOG_SMA'].iloc[0]
-        # data_slice['LOG_SMA'] = data_slice.apply(lambda row: row['LOG_SMA'] - first_log_sma, axis=1)
-            
-        return data_slice.to_dict('records')
\ No newline at end of file
+
+        if self.symbols is None:
+            return PriceSlice(self.columns, startingIndex, endIndex)
+
+        symbol = (rng or random).randrange(len(self.symbols)) if self.randomize else 0
+        return PriceSlice(self.columns, startingIndex, endIndex, symbol)
+
+    def getCorpusWindows(self, nSteps: int) -> np.ndarray:
+        if nSteps not in self.corpusWindows:
+            # Files shorter than an episode hold no start
+            starts = np.maximum(np.diff(self.offsets) - nSteps + 1, 0)
+            self.corpusWindows[nSteps] = np.cumsum(starts)
+        return self.corpusWindows[nSteps]
+
+    def fetchCorpusSlice(self,
+        nSteps: int,
+        startingIndex: int = 0,
+        endIndex: int = None,
+        rng: random.Random = None
+        ) -> PriceSlice:
+        """
+        Episode window inside a single corpus file.
+
+        Random starts are uniform over every window that fits in a file, so
+        files are picked in proportion to their length.
+        """
+        if self.randomize:
+            windows = self.getCorpusWindows(nSteps)
+            if windows[-1] == 0:
+                raise ValueError(f"No corpus file holds an episode of {nSteps} rows")
+
+            window = (rng or random).randrange(int(windows[-1]))
+            fileIndex = int(np.searchsorted(windows, window, side='right'))
+            previous = windows[fileIndex - 1] if fileIndex > 0 else 0
+            startingIndex = int(self.offsets[fileIndex] + window - previous)
+        else:
+            fileIndex = int(np.searchsorted(self.offsets, startingIndex, side='right')) - 1
+        endIndex = startingIndex + nSteps if endIndex is None else endIndex
+
+        if not 0 <= fileIndex < len(self.files) or endIndex > self.offsets[fileIndex + 1]:
+            raise ValueError(f"Episode {startingIndex}:{endIndex} does not fit in one corpus file")
+
+        return PriceSlice(self.columns, startingIndex, endIndex)
+
+    def getTimes(self) -> np.ndarray:
+        if self.times is None:
+            raise ValueError(f"Price data has no {TIME_COLUMN} column")
+        if self.offsets is not None:
+            raise ValueError("Date ranges need a single price series, corpus files are not ordered in time")
+        return self.times
+
+    def getDateRange(self, start=None, end=None) -> tuple[int, int]:
+        """
+        Rows [first, last) whose time is in [start, end), by binary search on the sorted row times.
+
+        :param start: first date included, e.g. '2024-01-01', None from the first row
+        :param end: first date excluded, None up to the last row
+        """
+        times = self.getTimes()
+        first = 0 if start is None else int(np.searchsorted(times, np.datetime64(start, 'ms'), side='left'))
+        last = len(times) if end is None else int(np.searchsorted(times, np.datetime64(end, 'ms'), side='left'))
+        return first, max(first, last)
+
+    def setDateRange(self, start=None, end=None):
+        """
+        Only sample episodes inside [start, end), e.g. the train or test part of a fold.
+
+        The columns are not copied, episodes stay views of the whole series.
+        """
+        self.sampleRange = self.getDateRange(start, end)
+
+    def fetchDateSlice(self, start=None, end=None, symbol: int = None) -> PriceSlice:
+        """
+        Window over every row in [start, end), e.g. to evaluate a test period in one pass.
+        """
+        first, last = self.getDateRange(start, end)
+        if self.symbols is not None and symbol is None:
+            symbol = 0
+        return PriceSlice(self.columns, first, last, symbol)
+
+    def getWalkForwardFolds(self, trainPeriod, testPeriod, step=None, start=None, end=None) -> np.ndarray:
+        """
+        Row boundaries of rolling walk-forward folds, all found with one binary search.
+
+        Fold k trains on [start + k * step, + trainPeriod) and tests on the
+        following testPeriod. Folds whose test period passes `end` are left out.
+
+        :param trainPeriod: train length, anything pandas.Timedelta takes, e.g. '90D'
+        :param testPeriod: test length
+        :param step: shift between folds, defaults to testPeriod
+        :param start: start of the first fold, None from the first row
+        :param end: end of the data used, None up to the last row
+        :return: int64 array of shape (folds, 3): train start, test start and test end rows
+        """
+        times = self.getTimes()
+        train = pd.Timedelta(trainPeriod).to_timedelta64().astype('timedelta64[ms]')
+        test = pd.Timedelta(testPeriod).to_timedelta64().astype('timedelta64[ms]')
+        step = test if step is None else pd.Timedelta(step).to_timedelta64().astype('timedelta64[ms]')
+        if len(times) == 0:
+            return np.empty((0, 3), dtype=np.int64)
+
+        first = times[0] if start is None else np.datetime64(start, 'ms')
+        # Exclusive end, one past the last row time
+        last = times[-1] + np.timedelta64(1, 'ms') if end is None else np.datetime64(end, 'ms')
+        foldStarts = np.arange(first, last - train - test + np.timedelta64(1, 'ms'), step)
+
+        boundaries = np.stack([foldStarts, foldStarts + train, foldStarts + train + test], axis=1)
+        return np.searchsorted(times, boundaries, side='left').astype(np.int64)
@@ -1,47 +1,96 @@
-import math
+import numpy as np
 
-from collections import deque
-from typing import TypedDict
-from src.rl.libs.utils import FixedSizeList, PositionStatus, OrderInfo
+from typing import Callable, Dict
+from src.rl.libs.utils import RingBuffer, PositionStatus, OrderEvent, OrderType
+
+STEP_FIELDS = [
+    ('close', np.float64),
+    ('equity', np.float64),
+    ('inventory', np.int32),
+]
+
+ORDER_FIELDS = [
+    ('step', np.int64),
+    ('order', np.int8),
+    ('reason', np.int8),
+    ('size', np.int32),
+    ('price', np.float64),
+    ('profit', np.float64),
+]
 
 class Records:
-    def __init__(self, recordHistory: bool):
+    def __init__(self,
+        recordHistory: bool,
+        historyLength: int = 100,
+        orderLength: int = 10,
+        curveLength: int = 86400,
+        positionSource: Callable[[], PositionStatus] = None,
+        ):
         self.recordHistory = recordHistory
-        self.positionStatus = PositionStatus("NEUTRAL", 0.0, 0.0)
-        self.inventoryPrevious = deque(maxlen=6)
-        self.historyInventory = deque(maxlen=100)
-        self.historyMarker = deque(maxlen=100)
-        self.historyPrice = deque(maxlen=100)
-        self.historyEquity = deque(maxlen=100)
-        self.historyOrder = FixedSizeList[OrderInfo](10)
-        self.equityForCurve = deque(maxlen=86400)
-            
+        self.historyLength = historyLength
+        # Position status is only built when read, not on every step
+        self.positionSource = positionSource
+        self.nStep = 0
+        # Price, equity and inventory share one cursor, the recent history is the tail of the curve
+        self.steps = RingBuffer(curveLength, STEP_FIELDS)
+        self.closes = self.steps.columns['close']
+        self.equities = self.steps.columns['equity']
+        self.inventories = self.steps.columns['inventory']
+        # Orders other than wait, with integer-coded order type and reason
+        self.orders = RingBuffer(orderLength, ORDER_FIELDS)
+
     def reset(self):
-        self.inventoryPrevious.clear()
-        self.historyInventory.clear()
-        self.historyMarker.clear()
-        self.historyPrice.clear()
-        self.historyEquity.clear()
-        self.historyOrder = FixedSizeList[OrderInfo](10)
-        self.equityForCurve.clear()
-        self.positionStatus = PositionStatus("NEUTRAL", 0.0, 0.0)
-            
-    def recordStep(self, 
-        close: float, 
-        equity: float, 
-        inventory: int, 
-        positionStatus: PositionStatus, 
-        info: OrderInfo,
-        mark: dict,
+        self.nStep = 0
+        self.steps.clear()
+        self.orders.clear()
+
+    def recordStep(self,
+        close: float,
+        equity: float,
+        inventory: int,
+        info: OrderEvent,
         ):
 
         if self.recordHistory:
-            self.historyEquity.append(equity)
-            self.positionStatus = positionStatus
-
-            if info["order"] != "wait":
-                self.historyOrder.append(info)
-            
-            self.historyInventory.append(inventory)
-            # self.historyMarker.append(mark)
-            self.historyPrice.append(close)
\ No newline at end of file
+            # Written inline rather than through append, this runs on every step
+            i = self.steps.advance()
+            j = i + self.steps.capacity
+            self.closes[i] = close
+            self.closes[j] = close
+            self.equities[i] = equity
+            self.equities[j] = equity
+            self.inventories[i] = inventory
+            self.inventories[j] = inventory
+
+            if info.order != OrderType.WAIT:
+                self.orders.append(self.nStep, int(info.order), int(info.reason), info.size, info.price, info.profit)
+
+        self.nStep += 1
+
+    @property
+    def positionStatus(self) -> PositionStatus:
+        if self.positionSource is None:
+            return PositionStatus("NEUTRAL", 0.0, 0.0)
+        return self.positionSource()
+
+    @property
+    def historyPrice(self) -> np.ndarray:
+        return self.steps.last('close', self.historyLength)
+
+    @property
+    def historyEquity(self) -> np.ndarray:
+        return self.steps.last('equity', self.historyLength)
+
+    @property
+    def historyInventory(self) -> np.ndarray:
+        return self.steps.last('inventory', self.historyLength)
+
+    @property
+    def historyOrder(self) -> Dict[str, np.ndarray]:
+        return self.orders.lastRows()
+
+    def getEquityCurve(self) -> np.ndarray:
+        """
+        Copy of the equity recorded this episode, up to curveLength steps.
+        """
+        return self.steps.last('equity').copy()
@@ -1,16 +1,16 @@
 import math
 from typing import TypedDict
-from src.rl.libs.utils import OrderInfo, get_distance_given_mark
+from src.rl.libs.utils import OrderEvent, OrderType, get_distance_given_mark
 
-def get_reward_on_entry(info: OrderInfo, v3: float):
+def get_reward_on_entry(info: OrderEvent, v3: float):
     reward = 0
-    if info['order'] == 'buy':
+    if info.order == OrderType.BUY:
         reward =  -v3
-        reward *= info['size']
+        reward *= info.size
 
-    elif info['order'] == 'sell':
+    elif info.order == OrderType.SELL:
         reward = v3
-        reward *= info['size']
+        reward *= info.size
 
     reward -= 0.1
 
@@ -18,22 +18,22 @@ def get_reward_on_entry(info: OrderInfo, v3: float):
     reward = math.log10(delta/100)
     return reward
 
-def get_reward_from_delta(info: OrderInfo, deltaFromEntry: float):
+def get_reward_from_delta(info: OrderEvent, deltaFromEntry: float):
     multiplier = 1
-    # if info['order'] == 'sell':
+    # if info.order == OrderType.SELL:
     #     multiplier = -1
     
     reward = (deltaFromEntry * multiplier)
     delta = 1 + reward - 0.01
-    deltaMa = math.log10(delta / 1)  * info['size']
+    deltaMa = math.log10(delta / 1)  * info.size
     return deltaMa
 
-def get_reward_on_reentry(info: OrderInfo, deltaSma: float):
+def get_reward_on_reentry(info: OrderEvent, deltaSma: float):
     # the delta should be negative for buying
-    if info['order'] == 'buy':
+    if info.order == OrderType.BUY:
         reward = -deltaSma 
 
-    elif info['order'] == 'sell':
+    elif info.order == OrderType.SELL:
         reward = deltaSma 
 
     delta = 1 + reward - 0.01
@@ -43,7 +43,7 @@ def get_reward_on_reentry(info: OrderInfo, deltaSma: float):
 
 class ParamsPostActionDualMA(TypedDict):
     action: int
-    info: OrderInfo
+    info: OrderEvent
     v3: float
     inventory: int
     mark_price: float
@@ -75,7 +75,7 @@ def get_post_update_reward(
 
 def get_post_action_reward(
         action: int,
-        info: OrderInfo, 
+        info: OrderEvent, 
         inventory: int, 
         v3: float, 
         mark_price: float,
@@ -94,13 +94,13 @@ def get_post_action_reward(
     distance_from_lowest = get_distance_given_mark(mark_price, lowest_position, inventory)
     distance_from_last = get_distance_given_mark(mark_price, last_buy_position, inventory)
 
-    if info['order'] == 'buy' or info['order'] == 'sell':    
-        reward += math.log10((100 - comission)/100) * info['size'] 
+    if info.order == OrderType.BUY or info.order == OrderType.SELL:    
+        reward += math.log10((100 - comission)/100) * info.size 
         inventory  = abs(inventory)
 
         # if entry
         if inventory == 1:
-            # if info['order'] == 'buy':
+            # if info.order == OrderType.BUY:
             reward += get_reward_on_entry(info, v3)
 
         # if selling
@@ -124,7 +124,7 @@ def get_post_action_reward(
     else:
         reward = int(0)
 
-    if (action==1 or action==0) and info['order'] == 'wait':
+    if (action==1 or action==0) and info.order == OrderType.WAIT:
         reward += math.log10((100 - comission)/100)     
 
     return reward
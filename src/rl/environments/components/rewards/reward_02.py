@@ -1,39 +1,39 @@
 import math
 
 from typing import TypedDict
-from src.rl.libs.utils import OrderInfo
+from src.rl.libs.utils import OrderEvent, OrderType
 from .reward_01 import get_reward_on_reentry, get_distance_given_mark
 from ..observations import get_donchian_obs_dict, DonchianObsDict
 
-def get_comission_cost(info: OrderInfo):
-    return math.log10(1 - 0.003) * info['size']
+def get_comission_cost(info: OrderEvent):
+    return math.log10(1 - 0.003) * info.size
 
-def get_reward_entry(info: OrderInfo, pos: float):
+def get_reward_entry(info: OrderEvent, pos: float):
     reward = 0
 
-    if info['order'] == 'buy':
+    if info.order == OrderType.BUY:
         reward = 0.3 - pos
 
-    if info['order'] == 'sell':
+    if info.order == OrderType.SELL:
         reward = pos - 0.5
 
-    return reward * info['size'] * 0.01
+    return reward * info.size * 0.01
 
-def get_reward_from_delta(info: OrderInfo, delta: float):
+def get_reward_from_delta(info: OrderEvent, delta: float):
     # multiplier = 1
     # reward = (delta * multiplier)
     # delta = 1 + reward 
-    # deltaMa = math.log10(delta / 1)  * info['size']
-    return delta * info['size']
+    # deltaMa = math.log10(delta / 1)  * info.size
+    return delta * info.size
 
-def get_reward_on_reentry(info: OrderInfo, deltaSma: float):
+def get_reward_on_reentry(info: OrderEvent, deltaSma: float):
     # the delta should be negative for buying
  
     return -deltaSma
 
 class ParamsPostActionDonchian(TypedDict):
     action: int
-    info: OrderInfo 
+    info: OrderEvent 
     inventory: int 
     obs: DonchianObsDict
     # pos_in_donchian: float
@@ -68,7 +68,7 @@ def get_post_update_reward(
 
 def get_post_action_reward(
         action: int,
-        info: OrderInfo, 
+        info: OrderEvent, 
         inventory: int, 
         obs: DonchianObsDict,
         # pos_in_donchian: float,
@@ -90,7 +90,7 @@ def get_post_action_reward(
     penalty = 0.001
 
     # get distance from average position
-    if info['order'] == 'buy' or info['order'] == 'sell':    
+    if info.order == OrderType.BUY or info.order == OrderType.SELL:    
         reward += get_comission_cost(info)
         inventory  = abs(inventory)
         
@@ -138,7 +138,7 @@ def get_post_action_reward(
 
     # print(action, info['order'])
     # get penalty as choosing wrong move
-    if (action==1 or action==0) and info['order'] == 'wait':
+    if (action==1 or action==0) and info.order == OrderType.WAIT:
         # print("Get penalized")
         reward -= penalty    
 
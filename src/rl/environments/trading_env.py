@@ -1,5 +1,7 @@
+import os
 import numpy as np
 
+from functools import partial
 from typing import Any, SupportsFloat
 from gymnasium import Env
 from gymnasium.core import ObsType, ActType
@@ -7,18 +9,102 @@ from gymnasium.spaces import Dict
 from .components import (
     Broker, 
     PriceProvider, 
+    EpisodePrefetcher,
     getActionSpace,  
     RewardCounter,
     ObservationProvider,
-    ParamsObsDualMA,
-    ParamsObsDonchian,
+    get_market_columns,
+    MARK_KEYS,
+    ParamsAccountObsDualMA,
+    ParamsAccountObsDonchian,
     ParamsPostActionDonchian,
     ParamsPostUpdateDonchian,
     ParamsPostActionDualMA,
     ParamsPostUpdateDualMA,
     get_donchian_obs_dict
     )
-from src.rl.libs.utils import OrderInfo, available_strategy
+from src.rl.libs.utils import OrderEvent, available_strategy
+from src.rl.libs.feature_store import (
+    FEATURE_CACHE_DIR,
+    TIME_COLUMN,
+    TIME_DTYPE,
+    buildFeatureStore,
+    buildCorpusStore,
+    getCorpusFiles,
+)
+from src.rl.libs.telemetry import EpisodeStatsSink
+
+EPISODE_LENGTH = 4000
+
+def get_feature_cache_dir(directory: str, env_config: Dict):
+    if env_config.get('is_cache_features', True) or env_config.get('is_shared_features', False):
+        return os.path.join(directory, FEATURE_CACHE_DIR)
+
+    return None
+
+def get_feature_dtypes(env_config: Dict) -> dict:
+    """
+    Columns the broker, observation and rewards of the strategy read, with their storage dtype.
+
+    Every other indicator column is dropped once computed. Prices are kept
+    in `feature_dtype` (float32 by default), 0/1 flags in uint8 and the row
+    time in datetime64[ms] for date ranges.
+    """
+    dtype = np.dtype(env_config.get('feature_dtype', 'float32'))
+    values, flags = get_market_columns(env_config['strategy_type'])
+
+    dtypes = {TIME_COLUMN: TIME_DTYPE}
+    dtypes.update({column: dtype for column in list(MARK_KEYS) + values})
+    dtypes.update({column: np.dtype(np.uint8) for column in flags})
+    return dtypes
+
+def make_env(
+    file_name: str,
+    directory: str,
+    env_config: Dict,
+    record_history = False,
+    env_id: int = 0,
+    ):
+    """
+    Build the price features once and return an env factory for vectorized training.
+
+    The factory is picklable, so it can be passed to SubprocVecEnv. Every
+    worker maps the same feature store read-only instead of reloading the CSV
+    and recomputing the indicators, which keeps memory flat as n_envs grows.
+    With a `corpus` in the config, the store holds every file of the corpus.
+
+    Envs of one process need distinct ids to keep their telemetry apart,
+    e.g. `[partial(factory, env_id=i) for i in range(n_envs)]`.
+    """
+    env_config = {**env_config, 'is_shared_features': True}
+    if env_config.get('corpus') is not None:
+        feature_store = buildCorpusStore(
+            getCorpusFiles(os.path.join(directory, env_config['corpus'])),
+            env_config['indicators'],
+            env_config['derived_indicators'],
+            get_feature_cache_dir(directory, env_config),
+            env_config.get('is_verbose', True),
+            get_feature_dtypes(env_config)
+        )
+    else:
+        feature_store = buildFeatureStore(
+            os.path.join(directory, file_name),
+            env_config['indicators'],
+            env_config['derived_indicators'],
+            get_feature_cache_dir(directory, env_config),
+            env_config.get('is_verbose', True),
+            get_feature_dtypes(env_config)
+        )
+
+    return partial(
+        TradingEnvironment,
+        file_name,
+        directory,
+        env_config,
+        record_history,
+        feature_store,
+        env_id=env_id
+    )
 
 class TradingEnvironment(Env):
     def __init__(
@@ -27,12 +113,27 @@ class TradingEnvironment(Env):
         directory: str,
         env_config: Dict,
         record_history = False,
-
+        feature_store: str = None,
+        telemetry: EpisodeStatsSink = None,
+        env_id: int = 0,
         ):
         super(TradingEnvironment, self).__init__()
+        self.is_verbose = env_config.get('is_verbose', True)
+        self.env_id = env_id
+        self.telemetry = telemetry
+        # Only a sink built here is closed with the env, an injected one belongs to the caller
+        self.is_own_telemetry = False
+        if self.telemetry is None and env_config.get('telemetry_dir') is not None:
+            self.telemetry = EpisodeStatsSink(
+                env_config['telemetry_dir'],
+                fileFormat=env_config.get('telemetry_format', 'csv'),
+                fileName=f"episodes-{os.getpid()}-{env_id}"
+            )
+            self.is_own_telemetry = True
+
         self.action_space = getActionSpace(env_config['action'])  # Buy, Sell, Hold
         self.reward_counter = RewardCounter(env_config['strategy_type'])
-        self.observation_provider = ObservationProvider(env_config['strategy_type'])
+        self.observation_provider = ObservationProvider(env_config['strategy_type'], self.is_verbose)
         self.observation_space = self.observation_provider.get_observation_space()
         self.action_type = env_config['action']
         self.terminated = False
@@ -48,17 +149,48 @@ class TradingEnvironment(Env):
             directory,
             env_config['is_random'],
             env_config['indicators'],
-            env_config['derived_indicators']
+            env_config['derived_indicators'],
+            get_feature_cache_dir(directory, env_config),
+            feature_store,
+            env_config.get('is_shared_features', False),
+            self.is_verbose,
+            env_config.get('panel_path'),
+            get_feature_dtypes(env_config),
+            env_config.get('corpus')
         )
+        if env_config.get('date_range') is not None:
+            self.price_provider.setDateRange(*env_config['date_range'])
+        self.observation_provider.set_market_data(self.price_provider.columns)
         self.current_step = 0
 
+        # Optional worker thread preparing the next episode windows ahead of reset
+        self.prefetcher = None
+        if env_config.get('prefetch_episodes', 0) > 0:
+            self.prefetcher = EpisodePrefetcher(
+                self.price_provider,
+                self.observation_provider.market,
+                EPISODE_LENGTH,
+                env_config['prefetch_episodes']
+            )
+
     def reset(self, seed= 1, options={}) -> tuple[ObsType, dict[str, Any]]:
         self.current_step = 0
         self.reward_counter.reset()
         self.context = {}
-        self.price_data = self.price_provider.fetchDataSlice(4000)
+        if self.prefetcher is not None:
+            window = self.prefetcher.next()
+            self.price_data = window.priceData
+            self.observation_provider.set_episode_market(window.market)
+            row_data = window.row
+        else:
+            self.price_data = self.price_provider.fetchDataSlice(EPISODE_LENGTH)
+            self.observation_provider.set_episode(
+                self.price_data.start,
+                self.price_data.start + len(self.price_data),
+                self.price_data.symbol
+            )
+            row_data = self.price_data[self.current_step]
 
-        row_data = self.price_data[self.current_step]
         self.broker.reset(row_data)
         self.truncated = False
         self.terminated = False
@@ -181,7 +313,7 @@ class TradingEnvironment(Env):
         pass
       
 
-    def post_action_context_update(self, info: OrderInfo, action: int):
+    def post_action_context_update(self, info: OrderEvent, action: int):
         self.context.update({
             "action": int(action),
             "info": info
@@ -192,8 +324,7 @@ class TradingEnvironment(Env):
 
         if self.observation_provider.type == available_strategy[0]:
             n_long, n_short = self.broker.im.getInventoryCount()
-            params = ParamsObsDualMA(
-                row_data=self.broker.row_data,
+            params = ParamsAccountObsDualMA(
                 mark_price=self.broker.row_data['SMA5'],
                 avg_position=self.broker.im.getAveragePrice('SMA5'),
                 lowest_position=self.broker.lowest_point,
@@ -204,24 +335,41 @@ class TradingEnvironment(Env):
             )
 
         if self.observation_provider.type == available_strategy[1]:
-            params = ParamsObsDonchian(
+            params = ParamsAccountObsDonchian(
                 mark_price=self.broker.row_data['SMA5'],
                 avg_position=self.broker.im.getAveragePrice('SMA5'),
                 lowest_position=self.broker.lowest_point,
                 last_buy_position=self.broker.im.getLastEntry('SMA5'),
                 inventory=self.broker.im.inventory,
                 max_inventory=self.broker.im.maxOrder,
-                upper_channel=self.broker.row_data['DC_UPPER'],
-                lower_channel=self.broker.row_data['DC_LOWER'],
-                upper_channel_shift=self.broker.row_data['DC_UPPER_CHANGES'],
-                lower_channel_shift=self.broker.row_data['DC_LOWER_CHANGES'],
-                lower_shift_5=self.broker.row_data['DC_LOWER_CHANGES_5_ROW'],
-                upper_shift_5=self.broker.row_data['DC_UPPER_CHANGES_5_ROW']
             )
 
-        return self.observation_provider.get_observation(params)
+        # Market entries come precomputed, only the account-dependent ones are filled here
+        return self.observation_provider.get_observation(self.current_step, params)
 
     def check_if_terminated(self):
-        if self.terminated:
-            priceChange = (self.broker.row_data['SMA5'] /  self.initial_price) * 100
+        if not self.terminated:
+            return
+
+        priceChange = (self.broker.row_data['SMA5'] /  self.initial_price) * 100
+        if self.telemetry is not None:
+            self.telemetry.record(
+                self.env_id,
+                self.broker.ac.balance,
+                self.current_step,
+                self.broker.im.tradeTotal,
+                self.broker.reward_cum,
+                priceChange,
+                self.broker.getMaxDD()
+            )
+
+        if self.is_verbose:
             print(f"An eps end, final balance: {int(self.broker.ac.balance)}, steps: {self.current_step}, trades: {self.broker.im.tradeTotal}, reward: {self.broker.reward_cum:.4f}, price change: {priceChange:.2f}%")
+
+    def close(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
+        if self.telemetry is not None and self.is_own_telemetry:
+            self.telemetry.close()
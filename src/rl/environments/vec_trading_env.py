@@ -0,0 +1,462 @@
+import math
+import numpy as np
+
+from typing import Any, Dict, List, Optional
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvObs, VecEnvStepReturn
+from .components import PriceProvider, ObservationProvider, getActionSpace
+from .trading_env import get_feature_cache_dir, get_feature_dtypes
+from src.rl.libs.utils import available_strategy
+from src.rl.libs.telemetry import EpisodeStatsSink
+
+MINIMUM_SIZE = 10
+DRAWDOWN_LIMIT = 0.5
+
+def get_distance_from_mark(mark: np.ndarray, entry: np.ndarray, inventory: np.ndarray) -> np.ndarray:
+    """
+    Vectorized get_distance_given_mark: 0 without orders or entry.
+    """
+    valid = (inventory != 0) & (entry != 0)
+    return np.where(valid, mark / np.where(valid, entry, 1.0) - 1, 0.0)
+
+def fit_distance(distance: np.ndarray, log_multiplier: float) -> np.ndarray:
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.minimum(np.maximum(0.5 + np.log10(1 + distance * log_multiplier), 0), 1)
+
+class VecTradingEnvironment(VecEnv):
+    """
+    TradingEnvironment for N episodes at once, with the state held in NumPy arrays.
+
+    Every step applies the actions, fees, rewards, drawdown termination and
+    auto-reset of all episodes with array operations, so the Python cost is
+    paid once per batch instead of once per env. Episodes follow the scalar
+    env step for step; only the long-only setup without random inventory
+    is supported.
+
+    :param file_name: price file name
+    :param directory: price file directory
+    :param env_config: same env config as TradingEnvironment
+    :param num_envs: number of episodes stepped together
+    :param episode_length: rows per episode, like fetchDataSlice in the scalar env
+    :param feature_store: optional prebuilt feature store path
+    :param telemetry: optional episode stats sink, built from `telemetry_dir` in the config otherwise
+    """
+    def __init__(
+        self,
+        file_name: str,
+        directory: str,
+        env_config: Dict,
+        num_envs: int = 256,
+        episode_length: int = 4000,
+        feature_store: str = None,
+        telemetry: EpisodeStatsSink = None,
+        ):
+        if env_config['action'] != 'default':
+            raise ValueError("Vectorized env only supports the default action space")
+        if not env_config['is_long_only']:
+            raise ValueError("Vectorized env only supports long only trading")
+        if env_config['is_random_inventory']:
+            raise ValueError("Vectorized env does not support random inventory")
+        if env_config.get('panel_path') is not None:
+            raise ValueError("Vectorized env does not support multi-symbol panels")
+        if env_config.get('corpus') is not None:
+            raise ValueError("Vectorized env does not support multi-file corpora")
+
+        self.render_mode = None
+        self.is_verbose = env_config.get('is_verbose', True)
+        self.telemetry = telemetry
+        # Only a sink built here is closed with the env, an injected one belongs to the caller
+        self.is_own_telemetry = False
+        if self.telemetry is None and env_config.get('telemetry_dir') is not None:
+            self.telemetry = EpisodeStatsSink(
+                env_config['telemetry_dir'],
+                fileFormat=env_config.get('telemetry_format', 'csv')
+            )
+            self.is_own_telemetry = True
+
+        self.strategy_type = env_config['strategy_type']
+        self.observation_provider = ObservationProvider(self.strategy_type, self.is_verbose)
+        super(VecTradingEnvironment, self).__init__(
+            num_envs,
+            self.observation_provider.get_observation_space(),
+            getActionSpace(env_config['action'])
+        )
+
+        self.price_provider = PriceProvider(
+            file_name,
+            directory,
+            env_config['is_random'],
+            env_config['indicators'],
+            env_config['derived_indicators'],
+            get_feature_cache_dir(directory, env_config),
+            feature_store,
+            env_config.get('is_shared_features', False),
+            self.is_verbose,
+            None,
+            get_feature_dtypes(env_config)
+        )
+        if env_config.get('date_range') is not None:
+            self.price_provider.setDateRange(*env_config['date_range'])
+        self.observation_provider.set_market_data(self.price_provider.columns)
+        self.market = self.observation_provider.market
+        self.n_market = self.market.shape[1]
+        self.close_price = np.asarray(self.price_provider.columns['close'], dtype=np.float64)
+        self.mark_price = np.asarray(self.price_provider.columns['SMA5'], dtype=np.float64)
+        self.v3 = self.price_provider.columns.get('V3')
+
+        self.episode_length = episode_length
+        self.min_start, end = self.price_provider.sampleRange
+        self.max_start = end - episode_length
+        if self.max_start < self.min_start:
+            raise ValueError("End index exceeds data length")
+        self.is_random = env_config['is_random']
+        self.rng = np.random.default_rng()
+
+        self.balance_initial = float(env_config['starting_balance'])
+        self.max_order = env_config['max_order']
+        self.leverage = env_config['leverage']
+        self.comission = env_config['comission_trade']
+
+        n, m = num_envs, self.max_order
+        self.rows = np.arange(n)
+        self.actions = np.zeros(n, dtype=np.int64)
+
+        # Episode and account state
+        self.start = np.zeros(n, dtype=np.int64)
+        self.current_step = np.zeros(n, dtype=np.int64)
+        self.balance = np.zeros(n)
+        self.equity = np.zeros(n)
+        self.equity_highest = np.zeros(n)
+        self.drawdown = np.zeros(n)
+        self.max_drawdown = np.zeros(n)
+        self.lowest_point = np.zeros(n)
+        self.initial_size = np.zeros(n)
+        self.reward_cum = np.zeros(n)
+        self.trade_total = np.zeros(n, dtype=np.int64)
+
+        # Open orders, LIFO slots with running sums like InventoryManager
+        self.count = np.zeros(n, dtype=np.int64)
+        self.entry_price = np.ones((n, m))
+        self.entry_mark = np.zeros((n, m))
+        self.size = np.zeros((n, m))
+        self.fees = np.zeros((n, m))
+        self.cum_size = np.zeros((n, m))
+        self.cum_mark_size = np.zeros((n, m))
+        self.cum_margin = np.zeros((n, m))
+        self.cum_size_over_entry = np.zeros((n, m))
+        self.cum_fees = np.zeros((n, m))
+
+        # Observation at the end of the previous step, the Donchian reward reads it
+        self.last_obs = np.zeros((n,) + self.observation_space.shape, dtype=np.float32)
+
+    # VecEnv interface
+    def reset(self) -> VecEnvObs:
+        if self._seeds[0] is not None:
+            self.rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+
+        self.reset_envs(np.ones(self.num_envs, dtype=bool))
+        obs = self.get_observation()
+        self.last_obs[:] = obs
+        return obs
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        actions = self.actions
+        index = self.start + self.current_step
+        close = self.close_price[index]
+        mark = self.mark_price[index]
+
+        # t-0 Execute action
+        count_before = self.count.copy()
+        is_buy = actions == 0
+        is_wait_max = is_buy & (count_before >= self.max_order)
+        is_buy = is_buy & ~is_wait_max
+        is_sell = (actions == 1) & (count_before > 0)
+
+        if is_buy.any():
+            self.open_orders(np.flatnonzero(is_buy), close, mark)
+        if is_sell.any():
+            self.close_orders(is_sell, close)
+
+        # Max inventory waits still go through the broker after sales update
+        self.update_account(close, is_buy | is_sell | is_wait_max)
+
+        # t-0 Evaluate before passing to the next state
+        is_traded = is_buy | is_sell
+        order_size = np.where(is_buy, 1, np.where(is_sell, count_before, 0))
+        is_wrong_move = ~is_traded & ((actions == 0) | (actions == 1))
+        if self.strategy_type == available_strategy[0]:
+            rewards = self.get_dual_ma_post_action_reward(index, mark, is_buy, is_traded, order_size, is_wrong_move)
+        else:
+            rewards = self.get_donchian_post_action_reward(is_buy, is_traded, order_size, is_wrong_move)
+
+        # t+1 Update to next row and data
+        self.current_step += 1
+        next_index = index + 1
+        next_mark = self.mark_price[next_index]
+        self.update_account(self.close_price[next_index])
+        self.update_lowest_point(next_mark)
+
+        # t+1 Record observation before limit and hazard evaluation
+        obs = self.get_observation()
+        self.last_obs[:] = obs
+
+        # t+1 Check for limitation and hazard
+        dones = (self.current_step >= self.episode_length - 1) | (self.max_drawdown > DRAWDOWN_LIMIT)
+        is_closing = dones & (self.count > 0)
+        if is_closing.any():
+            self.close_orders(is_closing, self.close_price[next_index])
+            self.update_account(self.close_price[next_index], is_closing)
+
+        # t+1 Rewards calculation
+        multiplier = 1 if self.strategy_type == available_strategy[0] else 2
+        post_update = np.log10(next_mark / mark) * self.count * multiplier
+        rewards += np.where(self.count != 0, post_update, 0.0)
+        self.reward_cum += rewards
+
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            done_envs = np.flatnonzero(dones)
+            price_change = next_mark / self.mark_price[self.start] * 100
+            for i in done_envs:
+                if self.telemetry is not None:
+                    self.telemetry.record(
+                        i,
+                        self.balance[i],
+                        self.current_step[i],
+                        self.trade_total[i],
+                        self.reward_cum[i],
+                        price_change[i],
+                        self.max_drawdown[i]
+                    )
+
+                infos[i] = {
+                    'terminal_observation': obs[i].copy(),
+                    'TimeLimit.truncated': False,
+                    'episode': {
+                        'r': float(self.reward_cum[i]),
+                        'l': int(self.current_step[i]),
+                        'balance': float(self.balance[i]),
+                        'trades': int(self.trade_total[i]),
+                    }
+                }
+
+            self.reset_envs(dones)
+            obs[done_envs] = self.get_observation()[done_envs]
+            self.last_obs[done_envs] = obs[done_envs]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self) -> None:
+        if self.telemetry is not None and self.is_own_telemetry:
+            self.telemetry.close()
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class: type, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    # Episode state
+    def sample_starts(self, n: int) -> np.ndarray:
+        if not self.is_random:
+            return np.full(n, self.min_start, dtype=np.int64)
+        return self.rng.integers(self.min_start, self.max_start, size=n, endpoint=True)
+
+    def reset_envs(self, mask: np.ndarray):
+        envs = np.flatnonzero(mask)
+        self.start[envs] = self.sample_starts(len(envs))
+        self.current_step[envs] = 0
+        self.count[envs] = 0
+        self.balance[envs] = self.balance_initial
+        self.equity[envs] = self.balance_initial
+        self.equity_highest[envs] = self.balance_initial
+        self.drawdown[envs] = 0.0
+        self.max_drawdown[envs] = 0.0
+        self.lowest_point[envs] = 0.0
+        self.reward_cum[envs] = 0.0
+        self.trade_total[envs] = 0
+
+    def open_orders(self, envs: np.ndarray, close: np.ndarray, mark: np.ndarray):
+        slot = self.count[envs]
+        is_first = slot == 0
+        previous = np.maximum(slot - 1, 0)
+
+        # Margin is fixed by the balance when the first order opens, see InventoryManager.getSize
+        first_size = np.round((self.balance[envs] / float(self.max_order)) * 100) / 100
+        self.initial_size[envs] = np.where(is_first, first_size, self.initial_size[envs])
+        margin = np.maximum(self.initial_size[envs], MINIMUM_SIZE)
+        size = margin * self.leverage
+        fees = size * self.comission
+        entry_price = close[envs]
+        entry_mark = mark[envs]
+
+        def cumulate(cum: np.ndarray, value: np.ndarray):
+            cum[envs, slot] = np.where(is_first, 0.0, cum[envs, previous]) + value
+
+        self.entry_price[envs, slot] = entry_price
+        self.entry_mark[envs, slot] = entry_mark
+        self.size[envs, slot] = size
+        self.fees[envs, slot] = fees
+        cumulate(self.cum_size, size)
+        cumulate(self.cum_mark_size, entry_mark * size)
+        cumulate(self.cum_margin, margin)
+        cumulate(self.cum_size_over_entry, size / entry_price)
+        cumulate(self.cum_fees, fees)
+        self.count[envs] += 1
+
+    def close_orders(self, mask: np.ndarray, close: np.ndarray):
+        # Realize the orders last in, first out, like InventoryManager.closeAllOrders
+        total_profit = np.zeros(self.num_envs)
+        for slot in reversed(range(self.max_order)):
+            profit = (close / self.entry_price[:, slot] - 1) * self.size[:, slot]
+            profit -= self.fees[:, slot]
+            total_profit += np.where(mask & (slot < self.count), profit, 0.0)
+
+        self.balance += total_profit
+        self.trade_total += np.where(mask, self.count, 0)
+        self.count[mask] = 0
+
+    def update_account(self, close: np.ndarray, mask: Optional[np.ndarray] = None):
+        """
+        Mark open orders to market, then update equity and drawdown, see Account.
+        """
+        is_open = self.count > 0
+        last = np.maximum(self.count - 1, 0)
+        margin = np.where(is_open, self.cum_margin[self.rows, last], 0.0)
+        profit = close * self.cum_size_over_entry[self.rows, last] - self.cum_size[self.rows, last]
+        profit = np.where(is_open, profit - self.cum_fees[self.rows, last], 0.0)
+        equity = (self.balance - margin) + margin + profit
+
+        is_positive = equity > 0
+        equity_highest = np.where(is_positive, np.maximum(self.equity_highest, equity), self.equity_highest)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            drawdown = np.where(is_positive, (equity_highest - equity) / equity_highest, 1.0)
+        max_drawdown = np.where(is_positive, np.maximum(self.max_drawdown, drawdown), self.max_drawdown)
+
+        if mask is None:
+            mask = True
+        np.copyto(self.equity, equity, where=mask)
+        np.copyto(self.equity_highest, equity_highest, where=mask)
+        np.copyto(self.drawdown, drawdown, where=mask)
+        np.copyto(self.max_drawdown, max_drawdown, where=mask)
+
+    def update_lowest_point(self, mark: np.ndarray):
+        is_lower = (self.lowest_point == 0) | (self.lowest_point > mark)
+        lowest_point = np.where(is_lower, mark, self.lowest_point)
+        self.lowest_point = np.where(self.count != 0, lowest_point, 0.0)
+
+    def get_average_mark(self) -> np.ndarray:
+        last = np.maximum(self.count - 1, 0)
+        cum_size = self.cum_size[self.rows, last]
+        average = self.cum_mark_size[self.rows, last] / np.where(self.count > 0, cum_size, 1.0)
+        return np.where(self.count > 0, average, 0.0)
+
+    def get_last_mark(self) -> np.ndarray:
+        last = np.maximum(self.count - 1, 0)
+        return np.where(self.count > 0, self.entry_mark[self.rows, last], 0.0)
+
+    # Observations
+    def get_observation(self) -> np.ndarray:
+        index = self.start + self.current_step
+        mark = self.mark_price[index]
+        obs = np.empty((self.num_envs,) + self.observation_space.shape, dtype=np.float32)
+        obs[:, :self.n_market] = self.market[index]
+
+        inventory = self.count
+        log_multiplier = 2 if self.strategy_type == available_strategy[0] else 1
+        distance_from_avg_pos = fit_distance(get_distance_from_mark(mark, self.get_average_mark(), inventory), log_multiplier)
+        distance_from_lowest = fit_distance(get_distance_from_mark(mark, self.lowest_point, inventory), log_multiplier)
+        distance_from_lowest = np.where(self.lowest_point != 0, distance_from_lowest, 0.5)
+
+        if self.strategy_type == available_strategy[0]:
+            obs[:, 1] = distance_from_avg_pos
+            obs[:, 2] = distance_from_lowest
+            obs[:, 3] = inventory / self.max_order
+            obs[:, 4] = 0.0
+        else:
+            obs[:, 5] = distance_from_avg_pos
+            obs[:, 6] = distance_from_lowest
+            obs[:, 7] = fit_distance(get_distance_from_mark(mark, self.get_last_mark(), inventory), log_multiplier)
+            obs[:, 8] = inventory / self.max_order
+
+        return obs
+
+    # Rewards, vectorized reward_01 and reward_02 post action rewards
+    def get_dual_ma_post_action_reward(
+        self,
+        index: np.ndarray,
+        mark: np.ndarray,
+        is_buy: np.ndarray,
+        is_traded: np.ndarray,
+        order_size: np.ndarray,
+        is_wrong_move: np.ndarray,
+        ) -> np.ndarray:
+        comission_cost = math.log10((100 - 0.03) / 100)
+        inventory = self.count
+        v3 = self.v3[index]
+
+        entry = np.where(is_buy, -v3 * order_size, v3 * order_size) - 0.1
+        entry = np.log10((100 + entry) / 100)
+
+        # Distances are 0 once every order is closed, as in get_distance_given_mark
+        distance_from_avg_pos = get_distance_from_mark(mark, self.get_average_mark(), inventory)
+        distance_from_lowest = get_distance_from_mark(mark, self.lowest_point, inventory)
+        distance_from_last = get_distance_from_mark(mark, self.get_last_mark(), inventory)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            from_avg_pos = np.log10(1 + distance_from_avg_pos - 0.01) * order_size
+            from_lowest = np.log10(1 + distance_from_lowest - 0.01) * order_size
+            reentry = np.log10(1 + np.where(is_buy, -distance_from_last, distance_from_last) - 0.01)
+
+        # Terms are added in the order of reward_01 so both envs round alike
+        is_entry, is_exit, is_reentry = inventory == 1, inventory == 0, inventory > 1
+        reward = comission_cost * order_size
+        reward += np.where(is_entry, entry, 0.0)
+        reward += np.where(is_exit, entry * 0.2, 0.0)
+        reward += np.where(is_exit, from_avg_pos * 1, 0.0)
+        reward += np.where(is_exit, from_lowest * 0.8, 0.0)
+        reward += np.where(is_reentry, reentry, 0.0)
+        reward = np.where(is_traded, reward, 0.0)
+        reward += np.where(is_wrong_move, comission_cost, 0.0)
+        return reward
+
+    def get_donchian_post_action_reward(
+        self,
+        is_buy: np.ndarray,
+        is_traded: np.ndarray,
+        order_size: np.ndarray,
+        is_wrong_move: np.ndarray,
+        ) -> np.ndarray:
+        penalty = 0.001
+        inventory = self.count
+        obs = self.last_obs.astype(np.float64)
+        position_inside_channel = obs[:, 0]
+        top_shift = obs[:, 3] == 1
+        bottom_shift = obs[:, 4] == 1
+
+        entry = np.where(is_buy, 0.3 - position_inside_channel, position_inside_channel - 0.5) * order_size * 0.01
+        is_entry, is_exit, is_reentry = inventory == 1, inventory == 0, inventory > 1
+
+        reward = math.log10(1 - 0.003) * order_size
+        reward += np.where(is_entry, entry, 0.0)
+        reward += np.where(is_reentry, -(obs[:, 7] - 0.5), 0.0)
+        reward -= np.where((inventory >= 1) & bottom_shift, penalty, 0.0)
+        reward += np.where(is_exit, entry, 0.0)
+        reward += np.where(is_exit, (obs[:, 5] - 0.5) * order_size * 1, 0.0)
+        reward += np.where(is_exit, (obs[:, 6] - 0.5) * order_size * 1, 0.0)
+        reward -= np.where(is_exit & (top_shift | bottom_shift), penalty, 0.0)
+        reward = np.where(is_traded, reward, 0.0)
+        reward -= np.where(is_wrong_move, penalty, 0.0)
+        return reward
@@ -1,6 +1,77 @@
-from .indicators import *
-from .mocks import *
-from .utils import *
-from .textstore import *
-from .config_manager import *
-from .indicator import *
\ No newline at end of file
+from src.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    submodules=[
+        '.config_manager',
+        '.feature_store',
+        '.indicator',
+        '.indicators',
+        '.mocks',
+        '.panel',
+        '.telemetry',
+        '.textstore',
+        '.utils',
+    ],
+    exports={
+        '.indicators': ['calculate_indicators', 'calculate_derived_indicators'],
+        '.mocks': ['createPriceDataFromCSV'],
+        '.feature_store': [
+            'FEATURE_CACHE_VERSION',
+            'FEATURE_CACHE_DIR',
+            'CORPUS_DIR',
+            'TIME_COLUMN',
+            'TIME_DTYPE',
+            'hashFile',
+            'getFeatureKey',
+            'getSourceCacheDir',
+            'getFeatureCachePath',
+            'saveFeatureColumns',
+            'loadFeatureColumns',
+            'removeStaleEntries',
+            'dataFrameToColumns',
+            'projectColumns',
+            'buildFeatureStore',
+            'getFeatureColumns',
+            'getCorpusFiles',
+            'buildCorpusStore',
+            'buildPathStore',
+            'loadCorpusIndex',
+        ],
+        '.telemetry': ['FILE_FORMATS', 'EPISODE_STATS_DTYPE', 'TENSORBOARD_FIELDS', 'EpisodeStatsSink'],
+        '.utils': [
+            'available_strategy',
+            'OrderType',
+            'OrderReason',
+            'reason_labels',
+            'OrderInfo',
+            'TrainingConfig',
+            'getLastEpisode',
+            'doesCheckpointExist',
+            'FixedSizeList',
+            'RingBuffer',
+            'sigmoid',
+            'exponential',
+            'fitPercentage',
+            'fetchDataSlice',
+            'to_float_list',
+            'int_to_one_hot',
+            'getConfigAtIndex',
+            'OrderEvent',
+            'PositionStatus',
+            'getCrossover',
+            'calculateCrossoverReward',
+            'volBandsEntryReward',
+            'get_distance_given_mark',
+            'getLogValue',
+            'get_distance_from_avg_pos',
+            'get_distance_from_lowest',
+            'get_distance_from_last',
+        ],
+        '.textstore': ['saveFloatData', 'readFloatData'],
+        '.config_manager': ['ConfigManager'],
+        '.panel': ['PANEL_FEATURES', 'PANEL_FILE', 'TIMES_FILE', 'PANEL_WRITE_ROWS', 'Panel', 'pivotPanelColumns', 'buildPanel', 'loadPanel'],
+    },
+    # Indicator kernels, as many names as the indicator package exports
+    fallbacks=['.indicator'],
+)
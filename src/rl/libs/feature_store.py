@@ -0,0 +1,451 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Tuple
+
+from src.rl.libs.indicator.registry import computeFeatureColumns
+from src.rl.libs.mocks import createPriceDataFromCSV
+
+# Bump whenever indicator outputs change so old cache entries stop matching
+FEATURE_CACHE_VERSION = 2
+FEATURE_CACHE_DIR = '.feature_cache'
+# Subdirectory of the feature cache holding the multi-file stores
+CORPUS_DIR = '.corpus'
+# Row time of the price files, kept as datetime64[ms] for date lookups
+TIME_COLUMN = 'datetime'
+TIME_DTYPE = np.dtype('datetime64[ms]')
+
+
+def hashFile(filePath: str, chunkSize: int = 1 << 20) -> str:
+    """
+    Hash the content of a file.
+
+    :param filePath: path of the file to hash
+    :param chunkSize: number of bytes read per chunk
+    :return: hex digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filePath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunkSize), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def getFeatureKey(indicators: list[str], derivedIndicators: list[str], dtypes: Dict[str, np.dtype] = None) -> str:
+    """
+    Build the cache key of an indicator configuration.
+
+    :param indicators: indicator names passed to calculate_indicators
+    :param derivedIndicators: derived indicator names passed to calculate_derived_indicators
+    :param dtypes: projected columns and their dtypes, None when every column is kept
+    :return: hex digest identifying the configuration
+    """
+    config = {
+        'version': FEATURE_CACHE_VERSION,
+        'indicators': list(indicators),
+        'derived_indicators': list(derivedIndicators),
+    }
+    if dtypes is not None:
+        config['columns'] = {name: np.dtype(dtype).str for name, dtype in dtypes.items()}
+
+    payload = json.dumps(config)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def getSourceCacheDir(csvFilePath: str, cacheDir: str) -> str:
+    """
+    Cache directory of one source file.
+
+    Named after the file and a hash of its absolute path, so files with the
+    same name in different directories never share or evict entries.
+    """
+    absolutePath = os.path.abspath(csvFilePath)
+    pathHash = hashlib.blake2b(absolutePath.encode(), digest_size=8).hexdigest()
+    return os.path.join(cacheDir, f"{os.path.basename(absolutePath)}-{pathHash}")
+
+def getFeatureCachePath(
+    csvFilePath: str,
+    indicators: list[str],
+    derivedIndicators: list[str],
+    cacheDir: str,
+    sourceHash: str = None,
+    dtypes: Dict[str, np.dtype] = None
+    ) -> str:
+    if sourceHash is None:
+        sourceHash = hashFile(csvFilePath)
+
+    return os.path.join(getSourceCacheDir(csvFilePath, cacheDir), sourceHash, getFeatureKey(indicators, derivedIndicators, dtypes))
+
+def saveFeatureColumns(columns: Dict[str, np.ndarray], path: str, meta: dict = {}):
+    """
+    Write feature columns as one .npy file per column plus a meta.json index.
+
+    The entry is written to a temporary directory and moved in place, so a
+    reader never sees a partially written entry.
+    """
+    tmpPath = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmpPath, ignore_errors=True)
+    os.makedirs(tmpPath)
+
+    names = list(columns.keys())
+    for i, name in enumerate(names):
+        values = columns[name]
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(tmpPath, f"{i}.npy"), values, allow_pickle=False)
+
+    with open(os.path.join(tmpPath, 'meta.json'), 'w') as f:
+        json.dump({**meta, 'columns': names, 'length': len(columns[names[0]]) if names else 0}, f)
+
+    try:
+        os.rename(tmpPath, path)
+    except OSError:
+        # Another process published the same entry first
+        shutil.rmtree(tmpPath, ignore_errors=True)
+
+def loadFeatureColumns(path: str, mmapMode: str = None) -> Dict[str, np.ndarray]:
+    """
+    Load the feature columns of a cache entry.
+
+    :param path: cache entry directory
+    :param mmapMode: numpy mmap mode, 'r' maps the columns read-only so every
+        process attached to the entry shares the same page cache
+    :return: mapping of column name to array
+    """
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+
+    return {
+        name: np.load(os.path.join(path, f"{i}.npy"), mmap_mode=mmapMode, allow_pickle=False)
+        for i, name in enumerate(meta['columns'])
+    }
+
+def removeStaleEntries(csvFilePath: str, sourceHash: str, cacheDir: str):
+    """
+    Drop cached features built from older contents of the same source file.
+    """
+    sourceDir = getSourceCacheDir(csvFilePath, cacheDir)
+    if not os.path.isdir(sourceDir):
+        return
+
+    for entry in os.listdir(sourceDir):
+        if entry != sourceHash:
+            shutil.rmtree(os.path.join(sourceDir, entry), ignore_errors=True)
+
+def dataFrameToColumns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    return {column: np.ascontiguousarray(df[column].to_numpy()) for column in df.columns}
+
+def projectColumns(columns: Dict[str, np.ndarray], dtypes: Dict[str, np.dtype] = None) -> Dict[str, np.ndarray]:
+    """
+    Keep only the columns a consumer reads, stored in compact dtypes.
+
+    Columns already in their target dtype are not copied, so projecting
+    memory-mapped columns keeps them shared.
+
+    :param columns: mapping of column name to array
+    :param dtypes: column name to storage dtype, None keeps every column unchanged
+    :return: mapping of column name to contiguous array
+    """
+    if dtypes is None:
+        return columns
+
+    missing = [name for name in dtypes if name not in columns]
+    if missing:
+        raise ValueError(f"Missing feature columns {missing}. Available: {list(columns)}")
+
+    projected = {}
+    for name, dtype in dtypes.items():
+        with np.errstate(invalid='ignore'):
+            values = np.ascontiguousarray(columns[name], dtype=dtype)
+        # Integer storage is meant for flags, refuse anything it would not hold exactly
+        if np.issubdtype(values.dtype, np.integer) and not np.array_equal(values, columns[name]):
+            raise ValueError(f"Column {name} does not fit in {values.dtype}")
+        projected[name] = values
+
+    return projected
+
+def buildFeatureStore(
+    csvFilePath: str,
+    indicators: list[str],
+    derivedIndicators: list[str],
+    cacheDir: str,
+    isVerbose: bool = True,
+    dtypes: Dict[str, np.dtype] = None
+    ) -> str:
+    """
+    Make sure the features of a price CSV exist in the cache and return the entry path.
+
+    Call it once in the parent process, then let workers attach to the path
+    with loadFeatureColumns(path, 'r') instead of rebuilding the indicators.
+    With dtypes, the entry only holds those columns in those dtypes.
+    """
+    sourceHash = hashFile(csvFilePath)
+    path = getFeatureCachePath(csvFilePath, indicators, derivedIndicators, cacheDir, sourceHash, dtypes)
+
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        if isVerbose:
+            print(f"Feature cache - Hit: {path}")
+        return path
+
+    if isVerbose:
+        print(f"Feature cache - Miss: {path}")
+    removeStaleEntries(csvFilePath, sourceHash, cacheDir)
+
+    df = createPriceDataFromCSV(csvFilePath, indicators, derivedIndicators, isVerbose=isVerbose)
+    saveFeatureColumns(projectColumns(dataFrameToColumns(df), dtypes), path, {
+        'source': os.path.basename(csvFilePath),
+        'indicators': list(indicators),
+        'derived_indicators': list(derivedIndicators),
+    })
+
+    return path
+
+def getFeatureColumns(
+    csvFilePath: str,
+    indicators: list[str],
+    derivedIndicators: list[str] = [],
+    cacheDir: str = None,
+    mmapMode: str = None,
+    isVerbose: bool = True,
+    dtypes: Dict[str, np.dtype] = None
+    ) -> Dict[str, np.ndarray]:
+    """
+    Load the feature columns of a price CSV, computing them only on a cache miss.
+
+    Entries are keyed by the content hash of the CSV and the exact indicator
+    lists, so editing the file or the config never serves stale features.
+
+    :param csvFilePath: path of the price CSV
+    :param indicators: indicator names passed to calculate_indicators
+    :param derivedIndicators: derived indicator names passed to calculate_derived_indicators
+    :param cacheDir: cache root directory, None disables caching
+    :param mmapMode: numpy mmap mode used to load the cache entry
+    :param isVerbose: print cache hits/misses and processing steps
+    :param dtypes: columns to keep and their storage dtype, None keeps every computed column
+    :return: mapping of column name to contiguous array
+    """
+    if cacheDir is None:
+        df = createPriceDataFromCSV(csvFilePath, indicators, derivedIndicators, isVerbose=isVerbose)
+        return projectColumns(dataFrameToColumns(df), dtypes)
+
+    path = buildFeatureStore(csvFilePath, indicators, derivedIndicators, cacheDir, isVerbose, dtypes)
+    return loadFeatureColumns(path, mmapMode)
+
+def getCorpusFiles(pattern: str) -> list[str]:
+    """
+    Price CSVs of a corpus, given as a directory or a glob pattern, sorted by path.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+
+    files = sorted(glob.glob(pattern))
+    if not files:
+        raise FileNotFoundError(f"No price files match {pattern}")
+    return files
+
+def buildCorpusStore(
+    csvFilePaths: list[str],
+    indicators: list[str],
+    derivedIndicators: list[str],
+    cacheDir: str,
+    isVerbose: bool = True,
+    dtypes: Dict[str, np.dtype] = None
+    ) -> str:
+    """
+    Build the features of several price CSVs into one store and return its path.
+
+    Every file gets its own cache entry first, so indicator warm-up rows are
+    dropped per file and adding a file only computes that file. The entries
+    are then appended one at a time into memory-mapped columns, never
+    holding the whole corpus in RAM. The store has the layout of a feature
+    cache entry, with the file of every row range in its meta.json.
+
+    :param csvFilePaths: price CSVs, in the order their rows are stored
+    :param indicators: indicator names passed to calculate_indicators
+    :param derivedIndicators: derived indicator names passed to calculate_derived_indicators
+    :param cacheDir: cache root directory
+    :param isVerbose: print cache hits/misses and processing steps
+    :param dtypes: columns to keep and their storage dtype, None keeps every computed column
+    :return: path of the store, read it with loadFeatureColumns and loadCorpusIndex
+    """
+    entries = [
+        buildFeatureStore(csvFilePath, indicators, derivedIndicators, cacheDir, isVerbose, dtypes)
+        for csvFilePath in csvFilePaths
+    ]
+    # Entry paths already hash the file contents and the configuration
+    key = hashlib.blake2b(json.dumps(entries).encode(), digest_size=16).hexdigest()
+    path = os.path.join(cacheDir, CORPUS_DIR, key)
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        if isVerbose:
+            print(f"Corpus cache - Hit: {path}")
+        return path
+
+    if isVerbose:
+        print(f"Corpus cache - Miss: {path}")
+
+    metas = []
+    for entry in entries:
+        with open(os.path.join(entry, 'meta.json'), 'r') as f:
+            metas.append(json.load(f))
+
+    names = metas[0]['columns']
+    for csvFilePath, meta in zip(csvFilePaths, metas):
+        missing = [name for name in names if name not in meta['columns']]
+        if missing:
+            raise ValueError(f"{csvFilePath} is missing feature columns {missing}")
+
+    offsets = np.concatenate([[0], np.cumsum([meta['length'] for meta in metas])])
+    tmpPath = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmpPath, ignore_errors=True)
+    os.makedirs(tmpPath)
+
+    for i, name in enumerate(names):
+        parts = [
+            np.load(os.path.join(entry, f"{meta['columns'].index(name)}.npy"), mmap_mode='r', allow_pickle=False)
+            for entry, meta in zip(entries, metas)
+        ]
+        values = np.lib.format.open_memmap(
+            os.path.join(tmpPath, f"{i}.npy"), mode='w+', dtype=np.result_type(*parts), shape=(int(offsets[-1]),)
+        )
+        for part, start, end in zip(parts, offsets[:-1], offsets[1:]):
+            values[start:end] = part
+        values.flush()
+        del values
+
+    with open(os.path.join(tmpPath, 'meta.json'), 'w') as f:
+        json.dump({
+            'sources': [os.path.basename(csvFilePath) for csvFilePath in csvFilePaths],
+            'offsets': offsets.tolist(),
+            'indicators': list(indicators),
+            'derived_indicators': list(derivedIndicators),
+            'columns': names,
+            'length': int(offsets[-1]),
+        }, f)
+
+    try:
+        os.rename(tmpPath, path)
+    except OSError:
+        # Another process published the same store first
+        shutil.rmtree(tmpPath, ignore_errors=True)
+
+    return path
+
+def buildPathStore(
+    batches: Iterable[Tuple[np.ndarray, Dict[str, np.ndarray]]],
+    nPaths: int,
+    indicators: list[str],
+    derivedIndicators: list[str],
+    cacheDir: str,
+    source: dict,
+    isVerbose: bool = True,
+    dtypes: Dict[str, np.dtype] = None
+    ) -> str:
+    """
+    Stream batches of price paths into one store and return its path.
+
+    Every batch holds (time, path) arrays sharing the same times, like a
+    panel, so its indicators are computed in one vectorized pass and
+    written straight into memory-mapped columns without a CSV round trip.
+    Paths are stored one after the other with the layout of a corpus
+    store, so episodes never span two paths.
+
+    :param batches: (times, columns) pairs, columns map names to (time, path) arrays
+    :param nPaths: total number of paths over all batches
+    :param indicators: indicator names passed to calculate_indicators
+    :param derivedIndicators: derived indicator names passed to calculate_derived_indicators
+    :param cacheDir: cache root directory
+    :param source: JSON description of how the paths are made, part of the cache key
+    :param isVerbose: print cache hits/misses
+    :param dtypes: columns to keep and their storage dtype, None keeps every computed column
+    :return: path of the store, read it with loadFeatureColumns and loadCorpusIndex
+    """
+    payload = json.dumps({
+        'source': source,
+        'paths': nPaths,
+        'features': getFeatureKey(indicators, derivedIndicators, dtypes),
+    }, sort_keys=True)
+    key = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    path = os.path.join(cacheDir, CORPUS_DIR, key)
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        if isVerbose:
+            print(f"Path cache - Hit: {path}")
+        return path
+
+    if isVerbose:
+        print(f"Path cache - Miss: {path}")
+
+    tmpPath = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmpPath, ignore_errors=True)
+    os.makedirs(tmpPath)
+
+    try:
+        names, stores, length, first = None, [], 0, 0
+        for times, columns in batches:
+            columns, times = computeFeatureColumns(columns, times, indicators, derivedIndicators)
+            # Row times are the panel index, stored as a column like in the price files
+            batchSize = next(iter(columns.values())).shape[1]
+            columns[TIME_COLUMN] = np.broadcast_to(np.asarray(times)[:, None], (len(times), batchSize))
+            columns = projectColumns(columns, dtypes)
+
+            if names is None:
+                names, length = list(columns), len(times)
+                for i, name in enumerate(names):
+                    values = np.lib.format.open_memmap(
+                        os.path.join(tmpPath, f"{i}.npy"), mode='w+', dtype=columns[name].dtype, shape=(nPaths * length,)
+                    )
+                    stores.append(values)
+            elif len(times) != length:
+                raise ValueError(f"Every batch must keep {length} rows after warm-up, got {len(times)}")
+
+            if first + batchSize > nPaths:
+                raise ValueError(f"Batches hold more than {nPaths} paths")
+            # Path-major, every path is contiguous
+            for name, values in zip(names, stores):
+                values.reshape(nPaths, length)[first:first + batchSize] = columns[name].T
+            first += batchSize
+
+        if first != nPaths:
+            raise ValueError(f"Batches hold {first} paths, expected {nPaths}")
+
+        for values in stores:
+            values.flush()
+        del stores
+
+        offsets = np.arange(nPaths + 1, dtype=np.int64) * length
+        with open(os.path.join(tmpPath, 'meta.json'), 'w') as f:
+            json.dump({
+                'sources': [f"path-{i}" for i in range(nPaths)],
+                'offsets': offsets.tolist(),
+                'source': source,
+                'indicators': list(indicators),
+                'derived_indicators': list(derivedIndicators),
+                'columns': names,
+                'length': int(offsets[-1]),
+            }, f)
+    except BaseException:
+        # Never leave a partial store behind, e.g. when a batch raises
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        raise
+
+    try:
+        os.rename(tmpPath, path)
+    except OSError:
+        # Another process published the same store first
+        shutil.rmtree(tmpPath, ignore_errors=True)
+
+    return path
+
+def loadCorpusIndex(path: str):
+    """
+    File names and row offsets of a store built by buildCorpusStore.
+
+    :return: (file names, offsets with one more entry than files), (None, None) for a single-file entry
+    """
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+
+    if 'offsets' not in meta:
+        return None, None
+    return meta['sources'], np.asarray(meta['offsets'], dtype=np.int64)
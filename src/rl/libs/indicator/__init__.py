@@ -1 +1,4 @@
-from .derived import *
\ No newline at end of file
+from .derived import *
+from .extrema import *
+from .streaming import *
+from .registry import *
\ No newline at end of file
@@ -1,5 +1,9 @@
 import pandas as pd
 import numpy as np
+from typing import Dict
+from .extrema import getDonchianKernel, getShift
+
+Columns = Dict[str, np.ndarray]
 
 def check_prerequisites(prerequisites: list[str], all_columns: list[str]) -> bool:
     """
@@ -14,111 +18,161 @@ def check_prerequisites(prerequisites: list[str], all_columns: list[str]) -> boo
         raise ValueError(f"Missing prerequisites: {missing}. Available columns: {all_columns}")
     return True
 
+def getFrame(values: np.ndarray):
+    """
+    Series for one symbol, DataFrame with one column per symbol for a (time, symbol) panel.
+    """
+    return pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+
 def getDeltaEmaClose(ema: float, close: float):
     return ((close - ema) / ema) * 100
 
+def getColumns(result_df: pd.DataFrame, names: list[str]) -> Columns:
+    return {name: result_df[name].to_numpy() for name in names}
+
+def assignColumns(result_df: pd.DataFrame, columns: Columns):
+    for name, values in columns.items():
+        result_df[name] = values
+
+def getLogChange(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    Log10 change of each value against the previous row, 0 on the row labelled 0.
+    """
+    change = np.log10(values / getShift(values))
+    change[index == 0] = 0.0
+    return change
+
+def computeLogSMA(columns: Columns, index: np.ndarray) -> Columns:
+    # pandas cumsum keeps NaN in place and carries on past it
+    return {'LOG_SMA': getFrame(getLogChange(columns['SMA5'], index)).cumsum().to_numpy()}
+
+def computeV2(columns: Columns, index: np.ndarray) -> Columns:
+    return {'V2': getDeltaEmaClose(columns['EMA5'], columns['close'])}
+
+def computeV3(columns: Columns, index: np.ndarray) -> Columns:
+    return {'V3': getDeltaEmaClose(columns['SMA60'], columns['SMA5'])}
+
+def computePriceChange(columns: Columns, index: np.ndarray) -> Columns:
+    return {'PRICE_CHANGE': getLogChange(columns['close'], index)}
+
+def computeRSISMA(columns: Columns, index: np.ndarray) -> Columns:
+    return {'RSI_SMA': getFrame(columns['RSI14']).rolling(window=7).mean().to_numpy()}
+
+def getStreak(values: np.ndarray) -> np.ndarray:
+    """
+    Signed length of the current run of positive or negative values.
+
+    A run grows by one per row while the sign holds and restarts at +1/-1 when
+    it changes. Zero or NaN values always restart at -1. The first row is 0.
+    Runs are counted along the first axis, so a (time, symbol) panel gets one
+    streak per symbol.
+
+    :param values: input values
+    :return: int64 array of streak values
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(values.shape, dtype=np.int64)
+
+    positive = values > 0
+    negative = values < 0
+    direction = np.where(positive, 1, -1)
+
+    # A row continues the run of the previous row only if both share a sign
+    restart = np.ones(values.shape, dtype=bool)
+    restart[1:] = ~((positive[1:] & positive[:-1]) | (negative[1:] & negative[:-1]))
+
+    base = direction.copy()
+    base[0] = 0
+
+    index = np.arange(n).reshape((n,) + (1,) * (values.ndim - 1))
+    runStart = np.maximum.accumulate(np.where(restart, index, 0), axis=0)
+    return np.take_along_axis(base, runStart, axis=0) + (index - runStart) * direction
+
+def computeV3Streak(columns: Columns, index: np.ndarray) -> Columns:
+    return {'V3_STREAK': getStreak(columns['V3'])}
+
+def computeV3StreakSignal(columns: Columns, index: np.ndarray) -> Columns:
+    streak = columns['V3_STREAK']
+    return {'V3_STREAK_SIGNAL': np.where(streak > 64, 1.0, np.where(streak < -64, 0.0, 0.5))}
+
+def computeVolatilityBand(columns: Columns, index: np.ndarray, multiplier: float = 3) -> Columns:
+    # Calculate daily returns (close to close percentage change)
+    returns = columns['close'] / getShift(columns['close']) - 1
+
+    # Calculate CPV (standard deviation of returns) over 200 periods
+    cpv = getFrame(returns).rolling(window=200).std().to_numpy() * 100
+
+    # Smooth CPV with 5-period SMA
+    smoothedCpv = getFrame(cpv).rolling(window=5).mean().to_numpy()
+
+    # Calculate bands using SMA100 as base
+    return {
+        'returns': returns,
+        'cpv': cpv,
+        'smoothed_cpv': smoothedCpv,
+        'VOL_BAND_UPPER': columns['SMA100'] * (100 + (smoothedCpv * multiplier)) / 100,
+        'VOL_BAND_LOWER': columns['SMA100'] * (100 - (smoothedCpv * multiplier)) / 100,
+    }
+
+def computeDonchianChannels(columns: Columns, index: np.ndarray, period: int = 20) -> Columns:
+    # Calculate upper and lower bands based on highest high and lowest low over period
+    channels = getDonchianKernel(columns['close'], [period])[period]
+    return {
+        column: channels[column]
+        for column in ['DC_UPPER', 'DC_LOWER', 'DC_MIDDLE', 'PREVIOUS_DC_UPPER', 'PREVIOUS_DC_LOWER']
+    }
+
+def computeDonchianChannelsSMA(columns: Columns, index: np.ndarray, period: int = 40, window: int = 5) -> Columns:
+    # Calculate bands, shift flags and 5 row shift flags in one pass over SMA5
+    return getDonchianKernel(columns['SMA5'], [period], window)[period]
+
 def getLogSMAIndicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['SMA5']
     check_prerequisites(prerequisites, all_columns)
-    result_df['LOG_SMA'] = result_df.apply(
-        lambda row: np.log10(row['SMA5'] / result_df['SMA5'].shift(1).loc[row.name]) if row.name > 0 else 0, 
-        axis=1
-    ).cumsum()
+    assignColumns(result_df, computeLogSMA(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getV2Indicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['EMA5']
     check_prerequisites(prerequisites, all_columns)
-    result_df['V2'] = result_df.apply(lambda row: getDeltaEmaClose(row['EMA5'], row['close']), axis=1)
+    assignColumns(result_df, computeV2(getColumns(result_df, prerequisites + ['close']), result_df.index.to_numpy()))
 
 def getV3Indicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['SMA60', 'SMA5']
     check_prerequisites(prerequisites, all_columns)
-    result_df['V3'] = result_df.apply(lambda row: getDeltaEmaClose(row['SMA60'], row['SMA5']), axis=1)
+    assignColumns(result_df, computeV3(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getPriceChangeIndicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['close']
     check_prerequisites(prerequisites, all_columns)
-    result_df['PRICE_CHANGE'] = result_df.apply(lambda row: np.log10(row['close'] / result_df['close'].shift(1).loc[row.name]) if row.name > 0 else 0, axis=1)
+    assignColumns(result_df, computePriceChange(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getRSISMAIndicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['RSI14']
     check_prerequisites(prerequisites, all_columns)
-    result_df['RSI_SMA'] = result_df['RSI14'].rolling(window=7).mean()
+    assignColumns(result_df, computeRSISMA(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getV3StreakIndicator(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['V3']
     check_prerequisites(prerequisites, all_columns)
-    result_df['V3_STREAK'] = 0
-    # Calculate streaks
-    for i in range(1, len(result_df)):
-        curr_v3 = result_df['V3'].iloc[i]
-        prev_v3 = result_df['V3'].iloc[i-1]
-        prev_streak = result_df['V3_STREAK'].iloc[i-1]
-        
-        # If both current and previous V3 are positive
-        if curr_v3 > 0 and prev_v3 > 0:
-            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = prev_streak + 1
-        # If both current and previous V3 are negative  
-        elif curr_v3 < 0 and prev_v3 < 0:
-            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = prev_streak - 1
-        # If sign changes, reset streak to +1/-1 based on current V3
-        else:
-            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = 1 if curr_v3 > 0 else -1
-
+    assignColumns(result_df, computeV3Streak(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getV3StreakSignal(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['V3', 'V3_STREAK']
     check_prerequisites(prerequisites, all_columns)
-    result_df['V3_STREAK_SIGNAL'] = result_df['V3_STREAK'].apply(
-        lambda x: 1 if x > 64 else (0 if x < -64 else 0.5)
-    )
+    assignColumns(result_df, computeV3StreakSignal(getColumns(result_df, prerequisites), result_df.index.to_numpy()))
 
 def getVolatilityBand(result_df: pd.DataFrame, all_columns: list[str]):
     prerequisites = ['SMA100', 'SMA5']
-    multiplier = 3
-    
     check_prerequisites(prerequisites, all_columns)
-
-    # Calculate daily returns (close to close percentage change)
-    result_df['returns'] = result_df['close'].pct_change()
-
-    # Calculate CPV (standard deviation of returns) over 200 periods
-    result_df['cpv'] = result_df['returns'].rolling(window=200).std() * 100
-
-    # Smooth CPV with 50-period SMA
-    result_df['smoothed_cpv'] = result_df['cpv'].rolling(window=5).mean()
-
-    # Calculate bands using SMA60 as base
-    result_df['VOL_BAND_UPPER'] = result_df['SMA100'] * (100 + (result_df['smoothed_cpv'] * multiplier)) / 100
-    result_df['VOL_BAND_LOWER'] = result_df['SMA100'] * (100 - (result_df['smoothed_cpv'] * multiplier)) / 100
-
+    assignColumns(result_df, computeVolatilityBand(getColumns(result_df, ['close', 'SMA100']), result_df.index.to_numpy()))
 
 def getDonchianChannels(result_df: pd.DataFrame, all_columns: list[str], period: int = 20):
     prerequisites = ['close']
-    
     check_prerequisites(prerequisites, all_columns)
-    # Calculate upper and lower bands based on highest high and lowest low over period
-    result_df['DC_UPPER'] = result_df['close'].rolling(window=period).max()
-    result_df['DC_LOWER'] = result_df['close'].rolling(window=period).min()
-    result_df['DC_MIDDLE'] = (result_df['DC_UPPER'] + result_df['DC_LOWER']) / 2
-    # Get previous DC value
-    result_df['PREVIOUS_DC_UPPER'] = result_df['DC_UPPER'].shift(1)
-    result_df['PREVIOUS_DC_LOWER'] = result_df['DC_LOWER'].shift(1)
+    assignColumns(result_df, computeDonchianChannels(getColumns(result_df, prerequisites), result_df.index.to_numpy(), period))
 
 def getDonchianChannelsSMA(result_df: pd.DataFrame, all_columns: list[str], period: int = 20, window=5):
     prerequisites = ['SMA5']
-    
     check_prerequisites(prerequisites, all_columns)
-    # Calculate upper and lower bands based on highest high and lowest low over period
-    result_df['DC_UPPER'] = result_df['SMA5'].rolling(window=period).max()
-    result_df['DC_LOWER'] = result_df['SMA5'].rolling(window=period).min()
-    result_df['DC_MIDDLE'] = (result_df['DC_UPPER'] + result_df['DC_LOWER']) / 2
-    # Get previous DC value
-    result_df['PREVIOUS_DC_UPPER'] = result_df['DC_UPPER'].shift(1)
-    result_df['PREVIOUS_DC_LOWER'] = result_df['DC_LOWER'].shift(1)
-    # Check if any previous DC previous
-    result_df['DC_UPPER_CHANGES'] = (result_df['DC_UPPER'] - result_df['PREVIOUS_DC_UPPER']).apply(lambda x: 0 if x >= 0 else 1)
-    result_df['DC_LOWER_CHANGES'] = (result_df['DC_LOWER'] - result_df['PREVIOUS_DC_LOWER']).apply(lambda x: 0 if x <= 0 else 1)
-    # Check if each previous 5 row DC_UPPER_CHANGES and DC_UPPER_CHANGES has 1 value
-    result_df['DC_UPPER_CHANGES_5_ROW'] = result_df['DC_UPPER_CHANGES'].rolling(window=window).sum().apply(lambda x: 1 if x > 0 else 0)
-    result_df['DC_LOWER_CHANGES_5_ROW'] = result_df['DC_LOWER_CHANGES'].rolling(window=window).sum().apply(lambda x: 1 if x > 0 else 0)
\ No newline at end of file
+    assignColumns(result_df, computeDonchianChannelsSMA(getColumns(result_df, prerequisites), result_df.index.to_numpy(), period, window))
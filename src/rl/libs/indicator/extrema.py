@@ -0,0 +1,93 @@
+import numpy as np
+from typing import Dict
+
+
+def getRollingExtrema(values: np.ndarray, period: int, func: np.ufunc = np.maximum) -> np.ndarray:
+    """
+    Rolling max or min over a trailing window in O(n) (van Herk/Gil-Werman).
+
+    The series is cut into blocks of `period` rows. Every window spans at most
+    two blocks, so its extreme is the suffix extreme of the first block
+    combined with the prefix extreme of the second one. Matches
+    pandas `rolling(period).max()/min()`, including NaN for the first
+    period - 1 rows and for windows that contain a NaN. Windows run along the
+    first axis, so a (time, symbol) panel is rolled per symbol.
+
+    :param values: input values
+    :param period: window length
+    :param func: np.maximum for a rolling max, np.minimum for a rolling min
+    :return: float64 array of rolling extremes
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    result = np.full(values.shape, np.nan)
+    if period < 1:
+        raise ValueError("Period must be positive")
+    if n < period:
+        return result
+
+    # Roll along a contiguous last axis, one row per symbol for a panel
+    series = np.ascontiguousarray(np.moveaxis(values, 0, -1))
+
+    # Pad with the identity of func so the last block does not leak into real windows
+    identity = -np.inf if func is np.maximum else np.inf
+    padded = np.concatenate([series, np.full(series.shape[:-1] + (-n % period,), identity)], axis=-1)
+    blocks = padded.reshape(series.shape[:-1] + (-1, period))
+
+    prefix = func.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = func.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+
+    extremes = func(suffix[..., :n - period + 1], prefix[..., period - 1:n])
+    result[period - 1:] = np.moveaxis(extremes, -1, 0)
+    return result
+
+def getRollingMax(values: np.ndarray, period: int) -> np.ndarray:
+    return getRollingExtrema(values, period, np.maximum)
+
+def getRollingMin(values: np.ndarray, period: int) -> np.ndarray:
+    return getRollingExtrema(values, period, np.minimum)
+
+def getShift(values: np.ndarray) -> np.ndarray:
+    shifted = np.empty_like(values, dtype=np.float64)
+    shifted[:1] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+def getDonchianKernel(values: np.ndarray, periods: list[int], window: int = 5) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    Donchian channels and their shift flags for several periods at once.
+
+    Each period costs O(n) array passes with no per-row Python callbacks,
+    which keeps period sweeps cheap.
+
+    :param values: source series, usually SMA5 or close
+    :param periods: channel periods to compute
+    :param window: number of rows the *_CHANGES_5_ROW flags look back
+    :return: mapping of period to the DC_* columns for that period
+    """
+    values = np.asarray(values, dtype=np.float64)
+    channels = {}
+
+    for period in periods:
+        upper = getRollingMax(values, period)
+        lower = getRollingMin(values, period)
+        previousUpper = getShift(upper)
+        previousLower = getShift(lower)
+
+        # NaN differences count as a shift, like the original comparisons did
+        upperChanges = np.where(upper - previousUpper >= 0, 0, 1)
+        lowerChanges = np.where(lower - previousLower <= 0, 0, 1)
+
+        channels[period] = {
+            'DC_UPPER': upper,
+            'DC_LOWER': lower,
+            'DC_MIDDLE': (upper + lower) / 2,
+            'PREVIOUS_DC_UPPER': previousUpper,
+            'PREVIOUS_DC_LOWER': previousLower,
+            'DC_UPPER_CHANGES': upperChanges,
+            'DC_LOWER_CHANGES': lowerChanges,
+            'DC_UPPER_CHANGES_5_ROW': np.where(getRollingMax(upperChanges, window) > 0, 1, 0),
+            'DC_LOWER_CHANGES_5_ROW': np.where(getRollingMax(lowerChanges, window) > 0, 1, 0),
+        }
+
+    return channels
@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List
+
+from .derived import (
+    Columns,
+    computeLogSMA,
+    computeV2,
+    computeV3,
+    computePriceChange,
+    computeRSISMA,
+    computeV3Streak,
+    computeV3StreakSignal,
+    computeVolatilityBand,
+    computeDonchianChannels,
+    computeDonchianChannelsSMA,
+)
+
+
+class IndicatorSpec:
+    """
+    Declarative description of one indicator.
+
+    :param name: name used in the indicators/derived_indicators config lists
+    :param prerequisites: columns the indicator reads
+    :param outputs: columns kept in the result
+    :param compute: kernel mapping (columns, index) to the output and intermediate arrays
+    :param intermediates: columns the kernel produces that are dropped unless requested
+    """
+    def __init__(self,
+        name: str,
+        prerequisites: List[str],
+        outputs: List[str],
+        compute: Callable[[Columns, np.ndarray], Columns],
+        intermediates: List[str] = [],
+        ):
+        self.name = name
+        self.prerequisites = prerequisites
+        self.outputs = outputs
+        self.compute = compute
+        self.intermediates = intermediates
+
+
+def getFrameSMA(close: pd.DataFrame, length: int) -> pd.DataFrame:
+    return close.rolling(length, min_periods=length).mean()
+
+def getFrameEMA(close: pd.DataFrame, length: int) -> pd.DataFrame:
+    # pandas_ta seeds the EMA with the SMA of the first `length` values
+    close = close.copy()
+    seed = close.iloc[:length].sum() / length
+    close.iloc[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+def getFrameRMA(values: pd.DataFrame, length: int) -> pd.DataFrame:
+    return values.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+def getFrameRSI(close: pd.DataFrame, length: int) -> pd.DataFrame:
+    negative = close.diff(1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positiveAvg = getFrameRMA(positive, length)
+    negativeAvg = getFrameRMA(negative, length)
+    return 100 * positiveAvg / (positiveAvg + negativeAvg.abs())
+
+def getBaseSpec(indicator: str):
+    # Imported here, processes that only load cached features never pay for pandas_ta
+    import pandas_ta as ta
+
+    # pandas_ta only takes a Series, the frame versions apply the same formulas to every symbol column at once
+    if indicator.startswith('EMA'):
+        func, frameFunc = ta.ema, getFrameEMA
+    elif indicator.startswith('SMA'):
+        func, frameFunc = ta.sma, getFrameSMA
+    elif indicator.startswith('RSI'):
+        func, frameFunc = ta.rsi, getFrameRSI
+    else:
+        return None
+
+    length = int(indicator[3:])
+
+    def compute(columns: Columns, index: np.ndarray) -> Columns:
+        close = columns['close']
+        if close.ndim == 2:
+            return {indicator: frameFunc(pd.DataFrame(close), length).to_numpy()}
+        return {indicator: func(pd.Series(close), length=length).to_numpy()}
+
+    return IndicatorSpec(indicator, ['close'], [indicator], compute)
+
+derived_specs: Dict[str, IndicatorSpec] = {
+    spec.name: spec for spec in [
+        IndicatorSpec('LOG_SMA', ['SMA5'], ['LOG_SMA'], computeLogSMA),
+        IndicatorSpec('V2', ['EMA5', 'close'], ['V2'], computeV2),
+        IndicatorSpec('V3', ['SMA60', 'SMA5'], ['V3'], computeV3),
+        IndicatorSpec('PRICE_CHANGE', ['close'], ['PRICE_CHANGE'], computePriceChange),
+        IndicatorSpec('RSI_SMA', ['RSI14'], ['RSI_SMA'], computeRSISMA),
+        IndicatorSpec('V3_STREAK', ['V3'], ['V3_STREAK'], computeV3Streak),
+        IndicatorSpec('V3_STREAK_SIGNAL', ['V3', 'V3_STREAK'], ['V3_STREAK_SIGNAL'], computeV3StreakSignal),
+        IndicatorSpec(
+            'VOLATILITY_BAND',
+            ['close', 'SMA100', 'SMA5'],
+            ['VOL_BAND_UPPER', 'VOL_BAND_LOWER'],
+            computeVolatilityBand,
+            ['returns', 'cpv', 'smoothed_cpv']
+        ),
+        IndicatorSpec(
+            'DONCHIAN_CHANNEL',
+            ['close'],
+            ['DC_UPPER', 'DC_LOWER', 'DC_MIDDLE'],
+            computeDonchianChannels,
+            ['PREVIOUS_DC_UPPER', 'PREVIOUS_DC_LOWER']
+        ),
+        IndicatorSpec(
+            'DONCHIAN_CHANNEL_SMA',
+            ['SMA5'],
+            [
+                'DC_UPPER', 'DC_LOWER', 'DC_MIDDLE',
+                'DC_UPPER_CHANGES', 'DC_LOWER_CHANGES',
+                'DC_UPPER_CHANGES_5_ROW', 'DC_LOWER_CHANGES_5_ROW'
+            ],
+            computeDonchianChannelsSMA,
+            ['PREVIOUS_DC_UPPER', 'PREVIOUS_DC_LOWER']
+        ),
+    ]
+}
+
+# Output column -> derived indicator producing it, the first registered producer wins
+derived_producers: Dict[str, str] = {}
+for spec in derived_specs.values():
+    for output in spec.outputs:
+        derived_producers.setdefault(output, spec.name)
+
+
+def unique(names: List[str]) -> List[str]:
+    return list(dict.fromkeys(names))
+
+def resolveIndicators(columns: List[str], indicators: List[str], derived_indicators: List[str]):
+    """
+    Resolve requested indicators into an ordered, deduplicated execution plan.
+
+    Derived indicators are ordered so every prerequisite is computed first,
+    whatever the order of the config list. Base indicators needed only as
+    prerequisites are added to the base stage and dropped from the result.
+
+    :param columns: columns available in the input frame
+    :param indicators: requested base indicator names
+    :param derived_indicators: requested derived indicator names
+    :return: (base specs, derived specs, intermediate columns to drop)
+    """
+    baseNames = unique(indicators)
+    baseSpecs = {}
+    for name in baseNames:
+        spec = getBaseSpec(name)
+        if spec is None:
+            print(f"Warning: Unsupported indicator {name}")
+            continue
+        baseSpecs[name] = spec
+
+    requested = unique(derived_indicators)
+    for name in requested:
+        if name not in derived_specs:
+            raise ValueError(f"Unsupported derived indicator {name}")
+
+    ordered: List[str] = []
+    intermediates: List[str] = []
+    visiting = set()
+
+    def visit(name: str, path: List[str]):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"Circular indicator dependency: {path + [name]}")
+        visiting.add(name)
+
+        for prerequisite in derived_specs[name].prerequisites:
+            if prerequisite in columns or prerequisite in baseSpecs:
+                continue
+            if prerequisite in derived_producers:
+                producer = derived_producers[prerequisite]
+                if producer not in requested:
+                    intermediates.extend(derived_specs[producer].outputs)
+                visit(producer, path + [name])
+                continue
+
+            spec = getBaseSpec(prerequisite)
+            if spec is None:
+                raise ValueError(f"Missing prerequisites: {[prerequisite]}. Available columns: {columns}")
+            baseSpecs[prerequisite] = spec
+            intermediates.append(prerequisite)
+
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in requested:
+        visit(name, [])
+
+    for spec in [derived_specs[name] for name in ordered]:
+        intermediates.extend(spec.intermediates)
+
+    # Columns that were asked for explicitly are never dropped
+    kept = set(columns) | set(baseNames)
+    for name in requested:
+        kept.update(derived_specs[name].outputs)
+    intermediates = [column for column in unique(intermediates) if column not in kept]
+
+    return list(baseSpecs.values()), [derived_specs[name] for name in ordered], intermediates
+
+def getValidRows(columns: Columns) -> np.ndarray:
+    valid = np.ones(len(next(iter(columns.values()))), dtype=bool)
+    for values in columns.values():
+        if values.dtype.kind == 'f':
+            isValid = ~np.isnan(values)
+        elif values.dtype.kind == 'O':
+            isValid = ~pd.isna(values)
+        else:
+            continue
+
+        # A panel row is kept only when every symbol has a value
+        if isValid.ndim > 1:
+            isValid = isValid.reshape(len(isValid), -1).all(axis=1)
+        valid &= isValid
+    return valid
+
+def runStage(columns: Columns, index: np.ndarray, specs: List[IndicatorSpec]):
+    """
+    Run a stage of kernels and keep only the rows without NaN, like DataFrame.dropna.
+    """
+    for spec in specs:
+        columns.update(spec.compute(columns, index))
+
+    if not columns or len(index) == 0:
+        return columns, index
+
+    valid = getValidRows(columns)
+    if valid.all():
+        return columns, index
+
+    # Warm-up rows usually form a prefix, slicing then avoids copying every column
+    rows = np.flatnonzero(valid)
+    if len(rows) > 0 and rows[-1] - rows[0] + 1 == len(rows):
+        valid = slice(rows[0], rows[-1] + 1)
+
+    return {name: values[valid] for name, values in columns.items()}, index[valid]
+
+def computeFeatures(df: pd.DataFrame, indicators: List[str], derived_indicators: List[str] = []) -> pd.DataFrame:
+    """
+    Compute base and derived indicators through the registry.
+
+    Equivalent to calculate_derived_indicators(calculate_indicators(df, ...), ...),
+    but each column is computed once as an array, the frame is assembled once
+    at the end and intermediate columns are dropped.
+
+    :param df: price frame with at least a 'close' column
+    :param indicators: base indicator names (SMA*, EMA*, RSI*)
+    :param derived_indicators: derived indicator names
+    :return: frame with the input columns and the requested indicators, NaN rows removed
+    """
+    columns, index = computeFeatureColumns(
+        {name: df[name].to_numpy() for name in df.columns},
+        df.index.to_numpy(),
+        indicators,
+        derived_indicators
+    )
+    return pd.DataFrame(columns, index=pd.Index(index, name=df.index.name), copy=False)
+
+def computeFeatureColumns(columns: Columns, index: np.ndarray, indicators: List[str], derived_indicators: List[str] = []):
+    """
+    Array counterpart of computeFeatures.
+
+    Columns are either 1D, or 2D (time, symbol) panels whose symbols are all
+    computed in the same kernel calls. Panel rows are dropped when any symbol
+    has a NaN.
+
+    :param columns: input columns, with at least 'close'
+    :param index: row labels, kept aligned with the surviving rows
+    :return: (columns with the requested indicators, index)
+    """
+    baseSpecs, derivedSpecs, intermediates = resolveIndicators(list(columns), indicators, derived_indicators)
+
+    columns = dict(columns)
+    columns, index = runStage(columns, index, baseSpecs)
+    if derivedSpecs:
+        columns, index = runStage(columns, index, derivedSpecs)
+
+    for name in intermediates:
+        columns.pop(name, None)
+
+    return columns, index
+
+def unionIndicators(env_configs: List[dict]):
+    """
+    Deduplicated union of the indicator lists of several env configs.
+    """
+    indicators = unique([name for config in env_configs for name in config['indicators']])
+    derived = unique([name for config in env_configs for name in config['derived_indicators']])
+    return indicators, derived
@@ -0,0 +1,435 @@
+import math
+import pandas as pd
+from collections import deque
+from typing import Optional
+
+from .derived import getDeltaEmaClose
+from .registry import resolveIndicators
+
+NAN = float('nan')
+
+
+def isMissing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class RollingMean:
+    """
+    Trailing mean over `window` values, NaN until the window is full or while it holds a NaN.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.compensation = 0.0
+        self.nMissing = 0
+
+    def add(self, value: float):
+        # Kahan summation keeps the running sum from drifting on long streams
+        y = value - self.compensation
+        t = self.total + y
+        self.compensation = (t - self.total) - y
+        self.total = t
+
+    def update(self, value: float) -> float:
+        self.values.append(value)
+        if math.isnan(value):
+            self.nMissing += 1
+        else:
+            self.add(value)
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nMissing -= 1
+            else:
+                self.add(-old)
+
+        if len(self.values) < self.window or self.nMissing > 0:
+            return NAN
+        return self.total / self.window
+
+
+class RollingStd:
+    """
+    Trailing sample standard deviation with online add/remove updates.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nObs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+
+    def update(self, value: float) -> float:
+        self.values.append(value)
+        if not math.isnan(value):
+            self.nObs += 1
+            delta = value - self.mean
+            self.mean += delta / self.nObs
+            self.ssqdm += delta * (value - self.mean)
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nObs -= 1
+                if self.nObs > 0:
+                    delta = old - self.mean
+                    self.mean -= delta / self.nObs
+                    self.ssqdm -= delta * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+
+        if self.nObs < self.window:
+            return NAN
+        return math.sqrt(max(self.ssqdm, 0.0) / (self.nObs - 1))
+
+
+class RollingExtremum:
+    """
+    Trailing max (or min) over `period` values with a monotonic deque, O(1) amortized.
+    """
+    def __init__(self, period: int, isMax: bool = True):
+        self.period = period
+        self.isMax = isMax
+        self.candidates = deque()
+        self.index = -1
+
+    def update(self, value: float) -> float:
+        self.index += 1
+        candidates = self.candidates
+        if self.isMax:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((self.index, value))
+
+        if candidates[0][0] <= self.index - self.period:
+            candidates.popleft()
+
+        if self.index < self.period - 1:
+            return NAN
+        return candidates[0][1]
+
+
+class RollingAny:
+    """
+    1 if any of the last `window` flags is set, 0 until the window is full.
+    """
+    def __init__(self, window: int):
+        self.window = window
+        self.flags = deque()
+        self.nSet = 0
+
+    def update(self, flag: int) -> int:
+        self.flags.append(flag)
+        self.nSet += flag
+        if len(self.flags) > self.window:
+            self.nSet -= self.flags.popleft()
+
+        if len(self.flags) < self.window:
+            return 0
+        return 1 if self.nSet > 0 else 0
+
+
+class StreamingSMA:
+    def __init__(self, name: str, length: int):
+        self.name = name
+        self.mean = RollingMean(length)
+
+    def update(self, row: dict):
+        row[self.name] = self.mean.update(row['close'])
+
+
+class StreamingEMA:
+    """
+    pandas_ta EMA: seeded with the SMA of the first `length` values, then ewm(adjust=False).
+    """
+    def __init__(self, name: str, length: int):
+        self.name = name
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.seed = []
+        self.value = NAN
+
+    def update(self, row: dict):
+        close = row['close']
+        if len(self.seed) < self.length:
+            self.seed.append(close)
+            if len(self.seed) == self.length:
+                self.value = sum(self.seed) / self.length
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * close
+        row[self.name] = self.value
+
+
+class StreamingRMA:
+    """
+    pandas ewm(alpha=1/length, min_periods=length).mean() with adjust=True.
+    """
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.nObs = 0
+
+    def update(self, value: float) -> float:
+        if not math.isnan(value):
+            self.numerator = value + self.decay * self.numerator
+            self.denominator = 1 + self.decay * self.denominator
+            self.nObs += 1
+        elif self.nObs > 0:
+            self.numerator *= self.decay
+            self.denominator *= self.decay
+
+        if self.nObs < self.length:
+            return NAN
+        return self.numerator / self.denominator
+
+
+class StreamingRSI:
+    def __init__(self, name: str, length: int):
+        self.name = name
+        self.positive = StreamingRMA(length)
+        self.negative = StreamingRMA(length)
+        self.previous = NAN
+
+    def update(self, row: dict):
+        close = row['close']
+        change = close - self.previous
+        self.previous = close
+
+        positive = self.positive.update(max(change, 0.0) if not math.isnan(change) else NAN)
+        negative = self.negative.update(min(change, 0.0) if not math.isnan(change) else NAN)
+        total = positive + abs(negative)
+        row[self.name] = 100 * positive / total if total != 0 else NAN
+
+
+class StreamingLogChange:
+    """
+    Log10 change against the previous row, optionally accumulated (LOG_SMA) or not (PRICE_CHANGE).
+    """
+    def __init__(self, name: str, source: str, isCumulative: bool):
+        self.name = name
+        self.source = source
+        self.isCumulative = isCumulative
+        self.previous = None
+        self.total = 0.0
+
+    def update(self, row: dict):
+        value = row[self.source]
+        if row['index'] == 0:
+            change = 0.0
+        elif self.previous is None:
+            change = NAN
+        else:
+            change = math.log10(value / self.previous)
+        self.previous = value
+
+        if self.isCumulative and not math.isnan(change):
+            self.total += change
+            change = self.total
+        row[self.name] = change
+
+
+class StreamingDelta:
+    def __init__(self, name: str, base: str, source: str):
+        self.name = name
+        self.base = base
+        self.source = source
+
+    def update(self, row: dict):
+        row[self.name] = getDeltaEmaClose(row[self.base], row[self.source])
+
+
+class StreamingRSISMA:
+    def __init__(self):
+        self.mean = RollingMean(7)
+
+    def update(self, row: dict):
+        row['RSI_SMA'] = self.mean.update(row['RSI14'])
+
+
+class StreamingV3Streak:
+    def __init__(self):
+        self.previous = None
+        self.streak = 0
+
+    def update(self, row: dict):
+        current = row['V3']
+        if self.previous is None:
+            self.streak = 0
+        elif current > 0 and self.previous > 0:
+            self.streak += 1
+        elif current < 0 and self.previous < 0:
+            self.streak -= 1
+        else:
+            self.streak = 1 if current > 0 else -1
+        self.previous = current
+        row['V3_STREAK'] = self.streak
+
+
+class StreamingV3StreakSignal:
+    def update(self, row: dict):
+        streak = row['V3_STREAK']
+        row['V3_STREAK_SIGNAL'] = 1.0 if streak > 64 else (0.0 if streak < -64 else 0.5)
+
+
+class StreamingVolatilityBand:
+    def __init__(self, multiplier: float = 3):
+        self.multiplier = multiplier
+        self.previous = NAN
+        self.std = RollingStd(200)
+        self.smooth = RollingMean(5)
+
+    def update(self, row: dict):
+        close = row['close']
+        returns = close / self.previous - 1
+        self.previous = close
+
+        cpv = self.std.update(returns) * 100
+        smoothedCpv = self.smooth.update(cpv)
+        row['returns'] = returns
+        row['cpv'] = cpv
+        row['smoothed_cpv'] = smoothedCpv
+        row['VOL_BAND_UPPER'] = row['SMA100'] * (100 + (smoothedCpv * self.multiplier)) / 100
+        row['VOL_BAND_LOWER'] = row['SMA100'] * (100 - (smoothedCpv * self.multiplier)) / 100
+
+
+class StreamingDonchian:
+    def __init__(self, source: str, period: int, window: int = 5, isFlagged: bool = True):
+        self.source = source
+        self.isFlagged = isFlagged
+        self.upper = RollingExtremum(period, True)
+        self.lower = RollingExtremum(period, False)
+        self.upperAny = RollingAny(window)
+        self.lowerAny = RollingAny(window)
+        self.previousUpper = NAN
+        self.previousLower = NAN
+
+    def update(self, row: dict):
+        value = row[self.source]
+        upper = self.upper.update(value)
+        lower = self.lower.update(value)
+
+        row['DC_UPPER'] = upper
+        row['DC_LOWER'] = lower
+        row['DC_MIDDLE'] = (upper + lower) / 2
+        row['PREVIOUS_DC_UPPER'] = self.previousUpper
+        row['PREVIOUS_DC_LOWER'] = self.previousLower
+
+        if self.isFlagged:
+            upperChanges = 0 if upper - self.previousUpper >= 0 else 1
+            lowerChanges = 0 if lower - self.previousLower <= 0 else 1
+            row['DC_UPPER_CHANGES'] = upperChanges
+            row['DC_LOWER_CHANGES'] = lowerChanges
+            row['DC_UPPER_CHANGES_5_ROW'] = self.upperAny.update(upperChanges)
+            row['DC_LOWER_CHANGES_5_ROW'] = self.lowerAny.update(lowerChanges)
+
+        self.previousUpper = upper
+        self.previousLower = lower
+
+
+def getStreamingIndicator(indicator: str):
+    period = indicator[3:]
+    if indicator.startswith('EMA'):
+        return StreamingEMA(indicator, int(period))
+    if indicator.startswith('SMA'):
+        return StreamingSMA(indicator, int(period))
+    if indicator.startswith('RSI'):
+        return StreamingRSI(indicator, int(period))
+
+    print(f"Warning: Unsupported indicator {indicator}")
+    return None
+
+# Derived indicator name -> updater factory, prerequisites and outputs come from the registry specs
+streaming_derived = {
+    'LOG_SMA': lambda: StreamingLogChange('LOG_SMA', 'SMA5', True),
+    'V2': lambda: StreamingDelta('V2', 'EMA5', 'close'),
+    'V3': lambda: StreamingDelta('V3', 'SMA60', 'SMA5'),
+    'PRICE_CHANGE': lambda: StreamingLogChange('PRICE_CHANGE', 'close', False),
+    'RSI_SMA': StreamingRSISMA,
+    'V3_STREAK': StreamingV3Streak,
+    'V3_STREAK_SIGNAL': StreamingV3StreakSignal,
+    'VOLATILITY_BAND': StreamingVolatilityBand,
+    'DONCHIAN_CHANNEL': lambda: StreamingDonchian('close', 20, isFlagged=False),
+    'DONCHIAN_CHANNEL_SMA': lambda: StreamingDonchian('SMA5', 40),
+}
+
+
+class StreamingIndicators:
+    """
+    Incremental counterpart of calculate_indicators + calculate_derived_indicators.
+
+    Every bar is processed in O(1). Base indicators see every bar, derived
+    indicators only see bars that would survive the dropna after the base
+    stage, so the emitted rows match the batch output row for row.
+    """
+    def __init__(self, indicators: list[str], derived_indicators: list[str] = [], columns: list[str] = ['close']):
+        # Same plan as the batch path: prerequisites are added, ordered, and dropped from the rows
+        baseSpecs, derivedSpecs, self.intermediates = resolveIndicators(list(columns), indicators, derived_indicators)
+        self.indicators = [getStreamingIndicator(spec.name) for spec in baseSpecs]
+
+        self.derived = []
+        for spec in derivedSpecs:
+            if spec.name not in streaming_derived:
+                raise ValueError(f"Unsupported streaming indicator {spec.name}")
+            self.derived.append(streaming_derived[spec.name]())
+        self.nBars = 0
+
+    def update(self, bar: dict) -> Optional[dict]:
+        """
+        Feed one bar and get its feature row.
+
+        :param bar: raw bar with at least a 'close' value
+        :return: bar values plus indicator columns, or None while warming up
+        """
+        row = dict(bar)
+        row['index'] = self.nBars
+        self.nBars += 1
+
+        for updater in self.indicators:
+            updater.update(row)
+        if any(isMissing(value) for value in row.values()):
+            return None
+
+        for updater in self.derived:
+            updater.update(row)
+        if any(isMissing(value) for value in row.values()):
+            return None
+
+        del row['index']
+        for name in self.intermediates:
+            row.pop(name, None)
+        return row
+
+    def seed(self, df: pd.DataFrame) -> Optional[dict]:
+        """
+        Warm the state up from history and return the feature row of the last bar.
+        """
+        row = None
+        for bar in df.to_dict('records'):
+            row = self.update(bar)
+        return row
+
+
+def getStreamingFrame(df: pd.DataFrame, indicators: list[str], derived_indicators: list[str] = []) -> pd.DataFrame:
+    """
+    Replay a frame bar by bar through StreamingIndicators.
+
+    The result is indexed like the batch output, so it can be compared with
+    calculate_derived_indicators(calculate_indicators(df, ...), ...).
+    """
+    engine = StreamingIndicators(indicators, derived_indicators, df.columns.tolist())
+    rows, index = [], []
+    for label, bar in zip(df.index, df.to_dict('records')):
+        row = engine.update(bar)
+        if row is not None:
+            rows.append(row)
+            index.append(label)
+
+    return pd.DataFrame(rows, index=index)
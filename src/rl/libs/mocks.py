@@ -1,16 +1,16 @@
 from typing import List
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
 
-from src.rl.libs.indicators import calculate_indicators, calculate_derived_indicators
+from src.rl.libs.indicator.registry import computeFeatures
 
 
 def createPriceDataFromCSV(
     csvFilePath: str, 
     indicators: list[str], 
     derivedIndicator=[], 
-    startIndex = 0
+    startIndex = 0,
+    isVerbose = True
     ):
     # Read the CSV file
     df = pd.read_csv(csvFilePath, sep=',')
@@ -27,15 +27,15 @@ def createPriceDataFromCSV(
     # Select nSteps consecutive rows
     selectedDf = df.iloc[startIndex:startIndex + nSteps].reset_index(drop=True)
     
-    print(f"Before processing: {len(selectedDf)} rows")
+    if isVerbose:
+        print(f"Before processing: {len(selectedDf)} rows")
+        print(f"Processing indicator: {indicators}, derived indicator: {derivedIndicator}")
     
-    selectedDf = calculate_indicators(selectedDf, indicators)
+    selectedDf = computeFeatures(selectedDf, indicators, derivedIndicator)
 
-    if len(derivedIndicator) != 0:
-        selectedDf = calculate_derived_indicators(selectedDf, derivedIndicator)
 
-
-    print(f"Price provider - After processing: {len(selectedDf)} rows")
+    if isVerbose:
+        print(f"Price provider - After processing: {len(selectedDf)} rows")
 
     return selectedDf
 
@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from src.rl.libs.indicator.registry import computeFeatureColumns
+
+PANEL_FEATURES = ['open', 'high', 'low', 'close', 'volume']
+PANEL_FILE = 'panel.npy'
+TIMES_FILE = 'times.npy'
+PANEL_WRITE_ROWS = 4096
+
+
+class Panel:
+    """
+    Dense (time, symbol, feature) array with its time and symbol indexes.
+
+    :param values: array of shape (len(times), len(symbols), len(features))
+    :param times: close time of every row, in ms
+    :param symbols: symbol of every second-axis entry
+    :param features: feature of every last-axis entry
+    """
+    def __init__(self, values: np.ndarray, times: np.ndarray, symbols: List[str], features: List[str]):
+        self.values = values
+        self.times = times
+        self.symbols = list(symbols)
+        self.features = list(features)
+        self.featureIndex = {feature: i for i, feature in enumerate(self.features)}
+
+    def __len__(self):
+        return len(self.times)
+
+    def column(self, feature: str) -> np.ndarray:
+        """
+        Zero-copy (time, symbol) view of one feature.
+        """
+        return self.values[:, :, self.featureIndex[feature]]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {feature: self.column(feature) for feature in self.features}
+
+    def symbolFrame(self, symbol: str) -> pd.DataFrame:
+        i = self.symbols.index(symbol)
+        return pd.DataFrame(self.values[:, i, :], columns=self.features, index=pd.Index(self.times, name='time'))
+
+
+def pivotPanelColumns(df: pd.DataFrame, features: List[str] = PANEL_FEATURES):
+    """
+    Pivot an aligned long frame (one row per time x tic, like read2df) into (time, symbol) arrays.
+
+    :param df: long frame with 'time', 'tic' and the feature columns
+    :param features: feature columns to pivot
+    :return: (times, symbols, mapping of feature to float64 (time, symbol) array)
+    """
+    # Hash-based factorize, sorting millions of symbol strings is the slow part of np.unique
+    timeCodes, times = pd.factorize(df['time'], sort=True)
+    symbolCodes, symbols = pd.factorize(df['tic'], sort=True)
+    times = np.asarray(times)
+    symbols = np.asarray(symbols, dtype=str)
+
+    if len(df) != len(times) * len(symbols):
+        raise ValueError(f"Frame is not aligned: {len(df)} rows for {len(times)} times x {len(symbols)} symbols")
+
+    columns = {}
+    for feature in features:
+        # Column-major, every symbol series is contiguous for the rolling kernels
+        values = np.full((len(times), len(symbols)), np.nan, order='F')
+        values[timeCodes, symbolCodes] = df[feature].to_numpy(dtype=np.float64)
+        columns[feature] = values
+
+    return times, symbols.tolist(), columns
+
+def buildPanel(
+    df: pd.DataFrame,
+    indicators: List[str],
+    derivedIndicators: List[str] = [],
+    path: str = None,
+    features: List[str] = PANEL_FEATURES,
+    dtype=np.float32,
+    ) -> Panel:
+    """
+    Pivot a read2df frame and compute the indicators of every symbol in one vectorized pass.
+
+    Kernels run on (time, symbol) arrays, so the cost does not grow with a
+    Python loop over symbols. Warm-up rows are dropped for all symbols at
+    once. With a path, the panel is written as a .npy file and returned
+    memory-mapped read-only.
+
+    :param df: aligned long frame with 'time', 'tic' and the feature columns
+    :param indicators: base indicator names (SMA*, EMA*, RSI*)
+    :param derivedIndicators: derived indicator names
+    :param path: directory to persist the panel to, None keeps it in memory
+    :param features: raw columns carried into the panel
+    :param dtype: dtype of the stored panel
+    :return: panel holding the raw features followed by the indicators
+    """
+    times, symbols, columns = pivotPanelColumns(df, features)
+    columns, times = computeFeatureColumns(columns, times, indicators, derivedIndicators)
+    names = list(columns)
+
+    if path is None:
+        values = np.empty((len(times), len(symbols), len(names)), dtype=dtype)
+    else:
+        tmpPath = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        os.makedirs(tmpPath)
+        values = np.lib.format.open_memmap(
+            os.path.join(tmpPath, PANEL_FILE), mode='w+', dtype=dtype, shape=(len(times), len(symbols), len(names))
+        )
+
+    # Interleave the features a block of rows at a time, so the sources stay in cache
+    for start in range(0, len(times), PANEL_WRITE_ROWS):
+        end = start + PANEL_WRITE_ROWS
+        np.stack([columns[name][start:end] for name in names], axis=-1, out=values[start:end], casting='same_kind')
+
+    if path is None:
+        return Panel(values, times, symbols, names)
+
+    values.flush()
+    del values
+    np.save(os.path.join(tmpPath, TIMES_FILE), times, allow_pickle=False)
+    with open(os.path.join(tmpPath, 'meta.json'), 'w') as f:
+        json.dump({
+            'symbols': symbols,
+            'features': names,
+            'length': len(times),
+            'indicators': list(indicators),
+            'derived_indicators': list(derivedIndicators),
+        }, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmpPath, path)
+    return loadPanel(path)
+
+def loadPanel(path: str, mmapMode: str = 'r') -> Panel:
+    """
+    Attach to a panel written by buildPanel.
+
+    :param path: panel directory
+    :param mmapMode: numpy mmap mode, 'r' shares the pages between processes
+    """
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+
+    return Panel(
+        np.load(os.path.join(path, PANEL_FILE), mmap_mode=mmapMode, allow_pickle=False),
+        np.load(os.path.join(path, TIMES_FILE), allow_pickle=False),
+        meta['symbols'],
+        meta['features'],
+    )
@@ -0,0 +1,212 @@
+import atexit
+import glob
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+FILE_FORMATS = ['csv', 'parquet']
+
+EPISODE_STATS_DTYPE = np.dtype([
+    ('time', np.float64),
+    ('env_id', np.int32),
+    ('episode', np.int64),
+    ('final_balance', np.float64),
+    ('steps', np.int64),
+    ('trades', np.int64),
+    ('reward', np.float64),
+    ('price_change', np.float64),
+    ('max_drawdown', np.float64),
+])
+
+# Fields written to TensorBoard as episode/<field>
+TENSORBOARD_FIELDS = ['final_balance', 'steps', 'trades', 'reward', 'price_change', 'max_drawdown']
+TENSORBOARD_DIR = 'tensorboard'
+
+# Episode files written by the open sinks of this process
+openFiles = set()
+openFilesLock = threading.Lock()
+
+
+class EpisodeStatsSink:
+    """
+    Episode statistics collected in a preallocated ring buffer.
+
+    Recording an episode is one row assignment under a lock. When a log
+    directory is set, a background thread drains the buffer in batches to
+    CSV or Parquet and to TensorBoard, so envs never block on I/O. If the
+    writer falls behind by more than `capacity` episodes, the oldest
+    unflushed rows are overwritten and counted in `dropped`.
+
+    One sink can be shared by the envs of a process, rows carry the env id.
+    Sinks hold a thread and are not picklable: create them inside each
+    worker process, e.g. through the env config `telemetry_dir`. Two open
+    sinks of a process cannot write the same file, give each its own
+    `fileName`. TensorBoard events go to one run per file name.
+
+    :param logDir: directory of the episode files and TensorBoard events, None keeps rows in memory only
+    :param capacity: ring buffer size in episodes
+    :param flushEvery: pending episodes that wake the writer before `flushInterval`
+    :param flushInterval: seconds between periodic flushes
+    :param fileFormat: 'csv' appends to one file, 'parquet' writes one part file per batch
+    :param isTensorboard: also write scalars to TensorBoard when it is installed
+    :param fileName: base name of the episode file, defaults to one file per process
+    """
+    def __init__(self,
+        logDir: str = None,
+        capacity: int = 4096,
+        flushEvery: int = 256,
+        flushInterval: float = 5.0,
+        fileFormat: str = 'csv',
+        isTensorboard: bool = True,
+        fileName: str = None,
+        ):
+        if fileFormat not in FILE_FORMATS:
+            raise ValueError(f"Unsupported telemetry format {fileFormat}. Available: {FILE_FORMATS}")
+
+        self.logDir = logDir
+        self.capacity = capacity
+        self.flushEvery = flushEvery
+        self.flushInterval = flushInterval
+        self.fileFormat = fileFormat
+        self.isTensorboard = isTensorboard
+        self.fileName = fileName or f"episodes-{os.getpid()}"
+        self.filePath = None
+
+        self.buffer = np.zeros(capacity, dtype=EPISODE_STATS_DTYPE)
+        # Monotonic counters, positions in the buffer are taken modulo capacity
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.writeLock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.writer = None
+        self.partIndex = 0
+        self.thread = None
+
+        if self.logDir is not None:
+            self.filePath = os.path.abspath(os.path.join(self.logDir, self.fileName))
+            with openFilesLock:
+                if self.filePath in openFiles:
+                    raise ValueError(f"Episode file {self.filePath} is already written by another sink, pass a distinct fileName")
+                openFiles.add(self.filePath)
+
+            os.makedirs(self.logDir, exist_ok=True)
+            if self.fileFormat == 'parquet':
+                # Continue after the parts of an earlier process with the same pid
+                self.partIndex = len(glob.glob(os.path.join(self.filePath, 'part-*.parquet')))
+            self.thread = threading.Thread(target=self.run, name='episode-stats-sink', daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def __len__(self):
+        return min(self.head, self.capacity)
+
+    def record(self,
+        envId: int,
+        finalBalance: float,
+        steps: int,
+        trades: int,
+        reward: float,
+        priceChange: float,
+        maxDrawdown: float,
+        ):
+        with self.lock:
+            self.buffer[self.head % self.capacity] = (
+                time.time(), envId, self.head, finalBalance, steps, trades, reward, priceChange, maxDrawdown
+            )
+            self.head += 1
+            if self.thread is None:
+                return
+
+            if self.head - self.tail > self.capacity:
+                self.dropped += self.head - self.tail - self.capacity
+                self.tail = self.head - self.capacity
+            pending = self.head - self.tail
+
+        if pending >= self.flushEvery:
+            self.wakeup.set()
+
+    def latest(self, n: int = None) -> np.ndarray:
+        """
+        Copy of the last `n` recorded episodes still in the buffer, oldest first.
+        """
+        with self.lock:
+            available = min(self.head, self.capacity)
+            n = available if n is None else min(n, available)
+            return self.buffer[np.arange(self.head - n, self.head) % self.capacity]
+
+    def drain(self) -> np.ndarray:
+        with self.lock:
+            rows = self.buffer[np.arange(self.tail, self.head) % self.capacity]
+            self.tail = self.head
+        return rows
+
+    def flush(self):
+        if self.logDir is None:
+            return
+
+        with self.writeLock:
+            rows = self.drain()
+            if len(rows) == 0:
+                return
+
+            self.writeFile(rows)
+            if self.isTensorboard:
+                self.writeTensorboard(rows)
+
+    def writeFile(self, rows: np.ndarray):
+        df = pd.DataFrame(rows)
+
+        if self.fileFormat == 'csv':
+            path = os.path.join(self.logDir, f"{self.fileName}.csv")
+            df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            return
+
+        # Parquet files cannot be appended, each batch is a part of one dataset directory
+        directory = os.path.join(self.logDir, self.fileName)
+        os.makedirs(directory, exist_ok=True)
+        df.to_parquet(os.path.join(directory, f"part-{self.partIndex:05d}.parquet"), index=False)
+        self.partIndex += 1
+
+    def writeTensorboard(self, rows: np.ndarray):
+        if self.writer is None:
+            try:
+                from torch.utils.tensorboard import SummaryWriter
+            except ImportError:
+                print("Warning: TensorBoard is not installed, episode stats are only written to files")
+                self.isTensorboard = False
+                return
+            self.writer = SummaryWriter(os.path.join(self.logDir, TENSORBOARD_DIR, self.fileName))
+
+        for row in rows:
+            for field in TENSORBOARD_FIELDS:
+                self.writer.add_scalar(f"episode/{field}", row[field], int(row['episode']), walltime=row['time'])
+        self.writer.flush()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.flushInterval)
+            self.wakeup.clear()
+            self.flush()
+
+    def close(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.wakeup.set()
+            self.thread.join()
+            self.thread = None
+            atexit.unregister(self.close)
+
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+        if self.filePath is not None:
+            with openFilesLock:
+                openFiles.discard(self.filePath)
+            self.filePath = None
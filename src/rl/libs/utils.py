@@ -3,10 +3,23 @@ import configparser
 import math
 import random
 import numpy as np
+from enum import IntEnum
 from typing import List, TypeVar, Generic, TypedDict
 
 available_strategy = ['DUAL_MA', 'DONCHIAN_CHANNEL']
 
+class OrderType(IntEnum):
+    WAIT = 0
+    BUY = 1
+    SELL = 2
+
+class OrderReason(IntEnum):
+    NONE = 0
+    IDLE = 1
+    MAX_INVENTORY = 2
+
+reason_labels = {OrderReason.NONE: '', OrderReason.IDLE: 'idle', OrderReason.MAX_INVENTORY: 'max inventory reached'}
+
 class OrderInfo(TypedDict):
     order: str
     size: int
@@ -62,6 +75,60 @@ class FixedSizeList(Generic[T]):
 
     def __len__(self):
         return len(self.items)
+
+class RingBuffer:
+    """
+    Fixed-capacity ring buffer of named, typed NumPy columns sharing one cursor.
+
+    Every value is written twice, at i and i + capacity, so the last k values
+    of a column are always one contiguous slice and last() never copies.
+    Views are only valid until the next append.
+
+    :param capacity: number of rows kept
+    :param fields: (name, dtype) of each column
+    """
+    __slots__ = ('columns', 'capacity', 'head', 'count')
+
+    def __init__(self, capacity: int, fields: List[tuple]):
+        self.columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in fields}
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+
+    def advance(self) -> int:
+        """
+        Claim the next row and return its index. Hot paths write the columns
+        at index and index + capacity themselves instead of calling append.
+        """
+        index = self.head
+        self.head = index + 1 if index + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        return index
+
+    def append(self, *values):
+        index = self.advance()
+        for column, value in zip(self.columns.values(), values):
+            column[index] = value
+            column[index + self.capacity] = value
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def last(self, name: str, k: int = None) -> np.ndarray:
+        """
+        View of the last k values of a column, oldest first. All stored values by default.
+        """
+        k = self.count if k is None else min(k, self.count)
+        end = self.head + self.capacity
+        return self.columns[name][end - k:end]
+
+    def lastRows(self, k: int = None) -> dict:
+        return {name: self.last(name, k) for name in self.columns}
+
+    def __len__(self):
+        return self.count
     
 def sigmoid(x: float) -> float:
     """
@@ -150,15 +217,48 @@ def getConfigAtIndex(index: int, dict_obj: dict):
     
     return {key: values[index] for key, values in dict_obj.items()}
 
-class OrderInfo(TypedDict):
-    order: str
-    size: int
-    price: float
-    reason: str
-    profit: float
+class OrderEvent:
+    """
+    Outcome of one broker action, with integer-coded order type and reason.
+
+    The broker refills a single instance every step instead of allocating
+    an OrderInfo dict, so read it before the next action or copy it.
+    """
+    __slots__ = ('order', 'reason', 'size', 'price', 'profit')
+
+    def __init__(self):
+        self.set(OrderType.WAIT)
+
+    def set(self,
+        order: OrderType,
+        reason: OrderReason = OrderReason.NONE,
+        size: int = 0,
+        price: float = 0.0,
+        profit: float = 0.0,
+        ):
+        self.order = order
+        self.reason = reason
+        self.size = size
+        self.price = price
+        self.profit = profit
+        return self
+
+    def isTrade(self) -> bool:
+        return self.order != OrderType.WAIT
+
+    def toInfo(self) -> OrderInfo:
+        return OrderInfo(
+            order=OrderType(self.order).name.lower(),
+            size=self.size,
+            price=self.price,
+            reason=reason_labels[self.reason],
+            profit=self.profit
+        )
 
 
 class PositionStatus:
+    __slots__ = ('position', 'size', 'avgPrice')
+
     def __init__(self, position: str, size: float, avgPrice: float):
         self.position = position
         self.size = size
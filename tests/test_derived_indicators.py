@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.libs.indicator.derived import (
+    getLogSMAIndicator,
+    getPriceChangeIndicator,
+    getV2Indicator,
+    getV3Indicator,
+    getV3StreakIndicator,
+    getV3StreakSignal,
+)
+
+
+# Row-wise implementations the vectorized indicators replaced, kept as the reference
+
+def getDeltaEmaClose(ema: float, close: float):
+    return ((close - ema) / ema) * 100
+
+def legacyLogSMA(result_df: pd.DataFrame):
+    result_df['LOG_SMA'] = result_df.apply(
+        lambda row: np.log10(row['SMA5'] / result_df['SMA5'].shift(1).loc[row.name]) if row.name > 0 else 0,
+        axis=1
+    ).cumsum()
+
+def legacyV2(result_df: pd.DataFrame):
+    result_df['V2'] = result_df.apply(lambda row: getDeltaEmaClose(row['EMA5'], row['close']), axis=1)
+
+def legacyV3(result_df: pd.DataFrame):
+    result_df['V3'] = result_df.apply(lambda row: getDeltaEmaClose(row['SMA60'], row['SMA5']), axis=1)
+
+def legacyPriceChange(result_df: pd.DataFrame):
+    result_df['PRICE_CHANGE'] = result_df.apply(
+        lambda row: np.log10(row['close'] / result_df['close'].shift(1).loc[row.name]) if row.name > 0 else 0,
+        axis=1
+    )
+
+def legacyV3Streak(result_df: pd.DataFrame):
+    result_df['V3_STREAK'] = 0
+    for i in range(1, len(result_df)):
+        curr_v3 = result_df['V3'].iloc[i]
+        prev_v3 = result_df['V3'].iloc[i-1]
+        prev_streak = result_df['V3_STREAK'].iloc[i-1]
+
+        if curr_v3 > 0 and prev_v3 > 0:
+            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = prev_streak + 1
+        elif curr_v3 < 0 and prev_v3 < 0:
+            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = prev_streak - 1
+        else:
+            result_df.iloc[i, result_df.columns.get_loc('V3_STREAK')] = 1 if curr_v3 > 0 else -1
+
+def legacyV3StreakSignal(result_df: pd.DataFrame):
+    result_df['V3_STREAK_SIGNAL'] = result_df['V3_STREAK'].apply(
+        lambda x: 1 if x > 64 else (0 if x < -64 else 0.5)
+    )
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    """
+    Random walk with flat stretches, and moving averages that cross often.
+    """
+    rng = np.random.default_rng(4)
+    n = 600
+    steps = rng.normal(0, 0.01, n)
+    steps[100:130] = 0
+    steps[400:405] = 0
+    close = 100 * np.exp(np.cumsum(steps))
+    df = pd.DataFrame({'close': close})
+    df['SMA5'] = df['close'].rolling(5, min_periods=1).mean()
+    df['EMA5'] = df['close'].ewm(span=5, adjust=False).mean()
+    df['SMA60'] = df['close'].rolling(60, min_periods=1).mean()
+    return df
+
+@pytest.mark.parametrize('name, vectorized, legacy', [
+    ('LOG_SMA', getLogSMAIndicator, legacyLogSMA),
+    ('PRICE_CHANGE', getPriceChangeIndicator, legacyPriceChange),
+    ('V2', getV2Indicator, legacyV2),
+    ('V3', getV3Indicator, legacyV3),
+])
+def test_matches_row_wise(prices, name, vectorized, legacy):
+    expected = prices.copy()
+    legacy(expected)
+    result = prices.copy()
+    vectorized(result, list(result.columns))
+
+    pd.testing.assert_series_equal(result[name], expected[name], check_exact=True)
+
+def test_streak_matches_row_wise(prices):
+    getV3Indicator(prices, list(prices.columns))
+    # Zeros and NaN restart a run like a sign change
+    prices.loc[[50, 51, 300], 'V3'] = 0.0
+    prices.loc[[200, 450], 'V3'] = np.nan
+
+    expected = prices.copy()
+    legacyV3Streak(expected)
+    legacyV3StreakSignal(expected)
+    result = prices.copy()
+    getV3StreakIndicator(result, list(result.columns))
+    getV3StreakSignal(result, list(result.columns))
+
+    pd.testing.assert_series_equal(result['V3_STREAK'], expected['V3_STREAK'], check_exact=True)
+    pd.testing.assert_series_equal(result['V3_STREAK_SIGNAL'], expected['V3_STREAK_SIGNAL'], check_exact=True)
+
+def test_streak_signal_saturates():
+    # Long runs cross the +-64 thresholds of the signal
+    df = pd.DataFrame({'V3': np.r_[np.ones(100), -np.ones(100)]})
+    expected = df.copy()
+    legacyV3Streak(expected)
+    legacyV3StreakSignal(expected)
+    getV3StreakIndicator(df, list(df.columns))
+    getV3StreakSignal(df, list(df.columns))
+
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+    assert set(df['V3_STREAK_SIGNAL']) == {0.0, 0.5, 1.0}
@@ -0,0 +1,74 @@
+import random
+import time
+import numpy as np
+import pytest
+
+from src.rl.environments.components.episode_prefetcher import EpisodePrefetcher
+from src.rl.environments.components.price_provider import PriceSlice
+
+N_ROWS = 1000
+N_STEPS = 50
+
+
+class SlowProvider:
+    """
+    Price provider whose slices take `delay` seconds, like columns paged in from disk.
+    """
+    def __init__(self, delay: float = 0.003, failAfter: int = None):
+        self.columns = {'close': np.arange(N_ROWS, dtype=np.float64)}
+        self.mmapMode = None
+        self.delay = delay
+        self.failAfter = failAfter
+        self.nSlices = 0
+
+    def fetchDataSlice(self, nSteps: int, rng: random.Random = None) -> PriceSlice:
+        if self.failAfter is not None and self.nSlices >= self.failAfter:
+            raise ValueError("Broken price file")
+        self.nSlices += 1
+        time.sleep(self.delay)
+        start = rng.randint(0, N_ROWS - nSteps)
+        return PriceSlice(self.columns, start, start + nSteps)
+
+def createPrefetcher(provider: SlowProvider, depth: int = 2) -> EpisodePrefetcher:
+    return EpisodePrefetcher(provider, np.arange(N_ROWS, dtype=np.float32)[:, None], N_STEPS, depth)
+
+def test_starts_are_reproducible_under_seed():
+    random.seed(0)
+    rng = random.Random(random.getrandbits(64))
+    expected = [rng.randint(0, N_ROWS - N_STEPS) for _ in range(20)]
+
+    for _ in range(10):
+        random.seed(0)
+        prefetcher = createPrefetcher(SlowProvider())
+        windows = [prefetcher.next() for _ in range(20)]
+        prefetcher.close()
+
+        assert [window.priceData.start for window in windows] == expected
+        for window in windows:
+            np.testing.assert_array_equal(window.market[:, 0], window.priceData.column('close'))
+
+def test_worker_errors_are_raised_by_next():
+    prefetcher = createPrefetcher(SlowProvider(failAfter=3), depth=4)
+    for _ in range(3):
+        prefetcher.next()
+
+    with pytest.raises(ValueError, match="Broken price file"):
+        prefetcher.next()
+    with pytest.raises(ValueError):
+        prefetcher.next()
+    prefetcher.close()
+
+def test_close_stops_a_blocked_worker():
+    prefetcher = createPrefetcher(SlowProvider(delay=0), depth=1)
+    thread = prefetcher.thread
+    while not prefetcher.windows.full():
+        time.sleep(0.01)
+
+    prefetcher.close()
+    assert not thread.is_alive()
+    prefetcher.close()
+
+    # Windows prepared before closing are still served, then next fails instead of waiting forever
+    prefetcher.next()
+    with pytest.raises(RuntimeError):
+        prefetcher.next()
@@ -0,0 +1,101 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.environments import TradingEnvironment
+from src.rl.environments.trading_env import get_feature_dtypes
+from src.rl.libs import ConfigManager
+from src.rl.libs.feature_store import (
+    TIME_COLUMN,
+    TIME_DTYPE,
+    buildFeatureStore,
+    getFeatureKey,
+    projectColumns,
+)
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'configs', 'DQN_default.yaml')
+STRATEGIES = {
+    'DUAL_MA': (['SMA60', 'SMA5', 'SMA20'], ['V3']),
+    'DONCHIAN_CHANNEL': (['SMA5'], ['DONCHIAN_CHANNEL_SMA']),
+}
+EXPECTED_COLUMNS = {
+    'DUAL_MA': (['close', 'SMA5', 'V3'], []),
+    'DONCHIAN_CHANNEL': (
+        ['close', 'SMA5', 'DC_UPPER', 'DC_LOWER'],
+        ['DC_LOWER_CHANGES', 'DC_UPPER_CHANGES', 'DC_UPPER_CHANGES_5_ROW', 'DC_LOWER_CHANGES_5_ROW'],
+    ),
+}
+
+
+@pytest.fixture(scope='module')
+def price_dir(tmp_path_factory) -> str:
+    directory = tmp_path_factory.mktemp('prices')
+    rng = np.random.default_rng(2)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 2000)))
+    times = pd.date_range('2024-01-01', periods=len(close), freq='5min')
+    pd.DataFrame({'datetime': times, 'close': close}).to_csv(directory / 'prices.csv', index=False)
+    return str(directory)
+
+def get_env_config(strategy: str, **overrides) -> dict:
+    config = ConfigManager(CONFIG_PATH).config['env_config']
+    indicators, derived = STRATEGIES[strategy]
+    return {
+        **config,
+        'indicators': indicators,
+        'derived_indicators': derived,
+        'strategy_type': strategy,
+        'is_cache_features': False,
+        'is_verbose': False,
+        **overrides,
+    }
+
+@pytest.mark.parametrize('strategy', list(STRATEGIES))
+def test_default_config_projects_strategy_columns_to_float32(price_dir, strategy):
+    values, flags = EXPECTED_COLUMNS[strategy]
+    expected = {TIME_COLUMN: TIME_DTYPE}
+    expected.update({column: np.dtype(np.float32) for column in values})
+    expected.update({column: np.dtype(np.uint8) for column in flags})
+
+    env_config = get_env_config(strategy)
+    assert get_feature_dtypes(env_config) == expected
+
+    env = TradingEnvironment('prices.csv', price_dir, env_config)
+    columns = env.price_provider.columns
+    assert {name: values.dtype for name, values in columns.items()} == expected
+    for column in flags:
+        assert set(np.unique(columns[column])) <= {0, 1}
+
+def test_feature_dtype_overrides_the_value_columns():
+    dtypes = get_feature_dtypes(get_env_config('DONCHIAN_CHANNEL', feature_dtype='float64'))
+    assert dtypes['DC_UPPER'] == np.float64
+    assert dtypes['DC_UPPER_CHANGES'] == np.uint8
+    assert dtypes[TIME_COLUMN] == TIME_DTYPE
+
+@pytest.mark.parametrize('values', [[0, 1, 0.5], [0, 1, np.nan], [0, 1, 256], [0, -1, 1]])
+def test_flags_reject_values_they_cannot_hold(values):
+    with pytest.raises(ValueError):
+        projectColumns({'flag': np.array(values, dtype=np.float64)}, {'flag': np.uint8})
+
+def test_projection_keeps_exact_flags_and_drops_other_columns():
+    columns = {'flag': np.array([0.0, 1.0, 1.0]), 'close': np.array([1.0, 2.0, 3.0]), 'unused': np.zeros(3)}
+    projected = projectColumns(columns, {'flag': np.uint8, 'close': np.float32})
+
+    assert list(projected) == ['flag', 'close']
+    np.testing.assert_array_equal(projected['flag'], np.array([0, 1, 1], dtype=np.uint8))
+    assert projected['close'].dtype == np.float32
+    with pytest.raises(ValueError):
+        projectColumns(columns, {'missing': np.float32})
+
+def test_cache_key_changes_with_dtypes(price_dir, tmp_path):
+    indicators, derived = STRATEGIES['DUAL_MA']
+    float32 = get_feature_dtypes(get_env_config('DUAL_MA'))
+    float64 = get_feature_dtypes(get_env_config('DUAL_MA', feature_dtype='float64'))
+    keys = [getFeatureKey(indicators, derived, dtypes) for dtypes in [None, float32, float64]]
+    assert len(set(keys)) == 3
+
+    paths = [
+        buildFeatureStore(f"{price_dir}/prices.csv", indicators, derived, str(tmp_path), False, dtypes)
+        for dtypes in [float32, float64]
+    ]
+    assert paths[0] != paths[1]
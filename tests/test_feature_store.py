@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pandas as pd
+
+from src.rl.libs.feature_store import (
+    buildCorpusStore,
+    buildFeatureStore,
+    loadCorpusIndex,
+    loadFeatureColumns,
+)
+
+INDICATORS = ['SMA5']
+
+
+def writePrices(path, seed: int, n: int = 500):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    times = pd.date_range('2024-01-01', periods=n, freq='5min')
+    pd.DataFrame({'datetime': times, 'close': close}).to_csv(path, index=False)
+
+def test_same_named_files_of_a_corpus_keep_their_entries(tmp_path):
+    files = [str(tmp_path / 'corpus' / name / 'prices.csv') for name in ['a', 'b']]
+    for seed, path in enumerate(files):
+        writePrices(path, seed, 500 + 100 * seed)
+    cacheDir = str(tmp_path / 'cache')
+
+    path = buildCorpusStore(files, INDICATORS, [], cacheDir, isVerbose=False)
+    columns = loadFeatureColumns(path)
+    _, offsets = loadCorpusIndex(path)
+
+    for i, csvFilePath in enumerate(files):
+        entry = loadFeatureColumns(buildFeatureStore(csvFilePath, INDICATORS, [], cacheDir, isVerbose=False))
+        np.testing.assert_array_equal(columns['close'][offsets[i]:offsets[i + 1]], entry['close'])
+
+def test_edited_file_drops_its_stale_entry(tmp_path):
+    csvFilePath = str(tmp_path / 'prices.csv')
+    cacheDir = str(tmp_path / 'cache')
+    writePrices(csvFilePath, 0)
+    first = buildFeatureStore(csvFilePath, INDICATORS, [], cacheDir, isVerbose=False)
+
+    writePrices(csvFilePath, 1)
+    second = buildFeatureStore(csvFilePath, INDICATORS, [], cacheDir, isVerbose=False)
+    assert second != first
+    assert not os.path.exists(first)
+    assert os.path.exists(os.path.join(second, 'meta.json'))
@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+
+from src.rl.environments.components.inventory_manager import InventoryManager
+from src.rl.libs.utils import OrderType
+
+MAX_ORDERS = 5
+LEVERAGE = 2
+MINIMUM_SIZE = 1.0
+TRADE_COMISSION = 0.003
+FUNDING_FEE = 0.0001
+
+
+class LegacyOrder:
+    """
+    One open order of the list-based bookkeeping, profit and fees kept per order.
+    """
+    def __init__(self, position: OrderType, marginUsed: float, leverage: float, entryPrice: float, comissionSize: float):
+        self.position = position
+        self.size = marginUsed * leverage
+        self.marginUsed = marginUsed
+        self.entryPrice = entryPrice
+        self.comissionTotal = self.size * comissionSize
+        self.profit = 0
+        self.fundingFee = 0
+        self.holdingTime = 0
+
+    def updateProfit(self, price: float):
+        self.holdingTime += 1
+        if self.position == OrderType.BUY:
+            self.profit = (price / self.entryPrice - 1) * self.size
+        else:
+            self.profit = (1 - price / self.entryPrice) * self.size
+
+        self.profit -= self.comissionTotal + self.fundingFee
+
+    def closePosition(self, price: float):
+        self.updateProfit(price)
+        return self.profit, (self.size + self.profit) / self.size
+
+    def addFundingFee(self, fundingFee: float):
+        self.fundingFee += self.size * fundingFee
+
+class LegacyInventory:
+    """
+    List-of-orders bookkeeping the array-backed InventoryManager replaced, kept as the reference.
+    """
+    def __init__(self, balance: float):
+        self.orders = []
+        self.inventory = 0
+        self.initialSize = self.getSize(balance)
+        self.tradeTotal = 0
+        self.totalProfit = 0
+        self.profitability = 0
+        self.ordersProfitable = 0
+        self.nLongs = 0
+        self.nShorts = 0
+        self.sumHoldingTime = 0
+
+    def getSize(self, balance: float):
+        if self.inventory == 0:
+            self.initialSize = round((balance / float(MAX_ORDERS)) * 100) / 100
+        return max(self.initialSize, MINIMUM_SIZE)
+
+    def order(self, position: OrderType, balance: float, mark: dict) -> float:
+        if len(self.orders) >= MAX_ORDERS:
+            return 0.0
+
+        isOpening = self.inventory >= 0 if position == OrderType.BUY else self.inventory <= 0
+        if not isOpening:
+            return self.closeOrder(mark['close'])
+
+        order = LegacyOrder(position, self.getSize(balance), LEVERAGE, mark['close'], TRADE_COMISSION)
+        self.orders.append((order, dict(mark)))
+        self.inventory += 1 if position == OrderType.BUY else -1
+        return 0.0
+
+    def closeOrder(self, price: float) -> float:
+        if not self.orders:
+            return 0.0
+
+        order, _ = self.orders.pop()
+        profit, delta = order.closePosition(price)
+        self.tradeTotal += 1
+        self.totalProfit += profit
+        self.profitability += delta
+        if profit > 0:
+            self.ordersProfitable += 1
+        if order.position == OrderType.BUY:
+            self.inventory -= 1
+            self.nLongs += 1
+        else:
+            self.inventory += 1
+            self.nShorts += 1
+        self.sumHoldingTime += order.holdingTime
+        return profit
+
+    def closeAllOrders(self, price: float) -> float:
+        return sum(self.closeOrder(price) for _ in range(len(self.orders)))
+
+    def applyFundingFee(self):
+        for order, _ in self.orders:
+            order.addFundingFee(FUNDING_FEE)
+
+    def updateMargin(self, price: float):
+        marginUsed = 0.0
+        profits = 0.0
+        for order, _ in self.orders:
+            order.updateProfit(price)
+            marginUsed += order.marginUsed
+            profits += order.profit
+        return marginUsed, profits
+
+    def getAveragePrice(self, key: str):
+        if not self.orders:
+            return 0.0
+        totalPrice = 0.0
+        totalSize = 0.0
+        for order, mark in self.orders:
+            totalPrice += mark[key] * order.size
+            totalSize += order.size
+        return totalPrice / totalSize
+
+    def getLastEntry(self, key: str):
+        lastMark = 0.0
+        for _, mark in self.orders:
+            lastMark = mark[key]
+        return lastMark
+
+    def getInventoryCount(self):
+        if self.inventory == 0:
+            return 0, 0
+        elif self.inventory > 0:
+            return self.inventory, 0
+        return 0, abs(self.inventory)
+
+
+def assertSameState(im: InventoryManager, legacy: LegacyInventory):
+    assert im.inventory == legacy.inventory
+    assert im.getOrderCount() == len(legacy.orders)
+    assert im.getInventoryCount() == legacy.getInventoryCount()
+    for key in ['close', 'SMA5']:
+        assert im.getAveragePrice(key) == legacy.getAveragePrice(key)
+        assert im.getLastEntry(key) == legacy.getLastEntry(key)
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_matches_list_based_inventory(seed):
+    rng = np.random.default_rng(seed)
+    balance = 1000.0
+    im = InventoryManager(MAX_ORDERS, LEVERAGE, MINIMUM_SIZE, TRADE_COMISSION, FUNDING_FEE, False, False, balance)
+    legacy = LegacyInventory(balance)
+    price = 100.0
+
+    for _ in range(3000):
+        price *= np.exp(rng.normal(0, 0.01))
+        mark = {'close': price, 'SMA5': price * (1 + rng.normal(0, 0.002))}
+        balance = float(rng.uniform(500, 1500))
+        action = rng.choice(['buy', 'sell', 'close', 'funding', 'wait'], p=[0.35, 0.35, 0.05, 0.05, 0.2])
+
+        if action == 'buy':
+            event = im.buy(price, balance, mark)
+            assert event.profit == legacy.order(OrderType.BUY, balance, mark)
+        elif action == 'sell':
+            event = im.sell(price, balance, mark)
+            assert event.profit == legacy.order(OrderType.SELL, balance, mark)
+        elif action == 'close':
+            event = im.closeAllOrders(price)
+            assert event.profit == legacy.closeAllOrders(price)
+        elif action == 'funding':
+            im.applyFundingFee()
+            legacy.applyFundingFee()
+
+        # Every step marks the open orders, like Account.updateMargin
+        marginUsed, profit = im.markToMarket(price)
+        expectedMargin, expectedProfit = legacy.updateMargin(price)
+        assert marginUsed == pytest.approx(expectedMargin, rel=1e-12)
+        assert profit == pytest.approx(expectedProfit, rel=1e-9, abs=1e-9)
+        assertSameState(im, legacy)
+
+    assert legacy.tradeTotal > 100
+    assert (im.tradeTotal, im.nLongs, im.nShorts, im.ordersProfitable) == \
+        (legacy.tradeTotal, legacy.nLongs, legacy.nShorts, legacy.ordersProfitable)
+    assert im.totalProfit == legacy.totalProfit
+    assert im.profitability == legacy.profitability
+    assert im.sumHoldingTime == legacy.sumHoldingTime
+
+def test_reset_clears_open_orders():
+    im = InventoryManager(MAX_ORDERS, LEVERAGE, MINIMUM_SIZE, TRADE_COMISSION, FUNDING_FEE, False, False, 1000.0)
+    mark = {'close': 100.0, 'SMA5': 100.0}
+    im.buy(100.0, 1000.0, mark)
+    im.buy(100.0, 1000.0, mark)
+    im.reset(1000.0, mark)
+
+    assert im.getOrderCount() == 0
+    assert im.markToMarket(101.0) == (0.0, 0.0)
+    assert im.getAveragePrice('close') == 0.0
@@ -0,0 +1,121 @@
+import os
+import pytest
+
+from src.libs.binance import FREQ_MINUTES, download_file, download_klines, get_kline_url, hash_file
+from src.libs.kline_server import create_kline_tree, serve_klines
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT']
+FREQS = {'1h': None}
+# Archives are served for three months, the fourth one is missing
+SERVED_END_DATE = '2024-03-31'
+START_DATE = '2024-01-01'
+END_DATE = '2024-04-30'
+
+
+@pytest.fixture
+def served_dir(tmp_path):
+    directory = tmp_path / 'served'
+    create_kline_tree(str(directory), SYMBOLS, FREQS, START_DATE, SERVED_END_DATE)
+    return directory
+
+def startServer(request, directory, max_bytes: int = None) -> str:
+    server = serve_klines(str(directory), max_bytes=max_bytes)
+    request.addfinalizer(server.server_close)
+    request.addfinalizer(server.shutdown)
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def getServedPath(served_dir, url: str, base_url: str) -> str:
+    return os.path.join(served_dir, url[len(base_url) + 1:])
+
+def countStatuses(statuses: dict) -> dict:
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+def assertMatchesServed(statuses: dict, served_dir):
+    for path, status in statuses.items():
+        assert not os.path.exists(f"{path}.part")
+        if status == 'missing':
+            assert not os.path.exists(path)
+            continue
+        name = os.path.basename(path)
+        served = served_dir / 'data' / 'spot' / 'monthly' / 'klines' / name.split('-')[0] / '1h' / name
+        assert hash_file(path) == hash_file(str(served))
+
+def test_concurrent_download_resumes_truncated_responses(request, tmp_path, served_dir, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Every archive is several times max_bytes, each file needs several resumed range requests
+    base_url = startServer(request, served_dir, max_bytes=4096)
+
+    statuses = download_klines(SYMBOLS, FREQS, START_DATE, END_DATE, max_workers=8, base_url=base_url)
+    assert countStatuses(statuses) == {'downloaded': 6, 'missing': 2}
+    assertMatchesServed(statuses, served_dir)
+
+    statuses = download_klines(SYMBOLS, FREQS, START_DATE, END_DATE, max_workers=8, base_url=base_url)
+    assert countStatuses(statuses) == {'skipped': 6, 'missing': 2}
+
+def test_resume_from_a_part_left_by_an_earlier_run(request, tmp_path, served_dir):
+    base_url = startServer(request, served_dir)
+    url = get_kline_url(base_url, 'spot', SYMBOLS[0], '1h', '2024-01')
+    served_path = getServedPath(served_dir, url, base_url)
+    path = str(tmp_path / 'klines' / os.path.basename(url))
+    os.makedirs(os.path.dirname(path))
+    with open(served_path, 'rb') as f, open(f"{path}.part", 'wb') as part:
+        part.write(f.read(1000))
+
+    assert download_file(url, path) == 'downloaded'
+    assert hash_file(path) == hash_file(served_path)
+
+def test_corrupted_files_are_downloaded_again(request, tmp_path, served_dir):
+    base_url = startServer(request, served_dir)
+    url = get_kline_url(base_url, 'spot', SYMBOLS[0], '1h', '2024-02')
+    served_path = getServedPath(served_dir, url, base_url)
+    path = str(tmp_path / 'klines' / os.path.basename(url))
+    os.makedirs(os.path.dirname(path))
+
+    # A part with wrong bytes fails the checksum once resumed and restarts from scratch
+    with open(f"{path}.part", 'wb') as part:
+        part.write(b'\0' * 1000)
+    assert download_file(url, path, retry_wait=0) == 'downloaded'
+    assert hash_file(path) == hash_file(served_path)
+
+    # A finished file that no longer matches its checksum is replaced
+    with open(path, 'r+b') as f:
+        f.write(b'\0' * 16)
+    assert download_file(url, path, retry_wait=0) == 'downloaded'
+    assert hash_file(path) == hash_file(served_path)
+    assert download_file(url, path) == 'skipped'
+
+def test_checksum_mismatch_raises(request, tmp_path, served_dir):
+    base_url = startServer(request, served_dir)
+    url = get_kline_url(base_url, 'spot', SYMBOLS[1], '1h', '2024-03')
+    served_path = getServedPath(served_dir, url, base_url)
+    with open(f"{served_path}.CHECKSUM", 'w') as f:
+        f.write(f"{'0' * 64}  {os.path.basename(served_path)}\n")
+
+    path = str(tmp_path / 'klines' / os.path.basename(url))
+    with pytest.raises(ValueError):
+        download_file(url, path, retries=1, retry_wait=0)
+    assert not os.path.exists(path)
+    assert not os.path.exists(f"{path}.part")
+
+def test_failed_archives_do_not_stop_the_others(request, tmp_path, served_dir, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    base_url = startServer(request, served_dir)
+    url = get_kline_url(base_url, 'spot', SYMBOLS[1], '1h', '2024-03')
+    with open(f"{getServedPath(served_dir, url, base_url)}.CHECKSUM", 'w') as f:
+        f.write(f"{'0' * 64}  {os.path.basename(url)}\n")
+
+    statuses = download_klines(SYMBOLS, FREQS, START_DATE, END_DATE, base_url=base_url)
+    assert countStatuses(statuses) == {'downloaded': 5, 'failed': 1, 'missing': 2}
+    failed = [path for path, status in statuses.items() if status == 'failed']
+    assert [os.path.basename(path) for path in failed] == [os.path.basename(url)]
+
+def test_every_interval_without_freqs(request, tmp_path, served_dir, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    base_url = startServer(request, served_dir)
+
+    statuses = download_klines(SYMBOLS, None, START_DATE, END_DATE, base_url=base_url)
+    assert countStatuses(statuses) == {'downloaded': 6, 'missing': len(statuses) - 6}
+    assert len(statuses) == len(SYMBOLS) * len(FREQ_MINUTES) * 4
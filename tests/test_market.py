@@ -0,0 +1,137 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generate.market import (
+    BOUND_RATIOS,
+    REGIMES,
+    build_synthetic_store,
+    generate_paths,
+    get_reference_volatility,
+    simulate_mean_reversion,
+)
+from src.generate.sideways import generate_sideways_data
+from src.rl.libs.feature_store import CORPUS_DIR, TIME_COLUMN, buildPathStore, loadCorpusIndex, loadFeatureColumns
+
+N_PATHS = 20
+N_STEPS = 400
+
+
+@pytest.fixture(scope='module')
+def reference_df() -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 3000)))
+    return pd.DataFrame({'close': close}, index=pd.date_range('2024-01-01', periods=len(close), freq='5min'))
+
+def legacySideways(df_slice: pd.DataFrame, price_starts: float, seed: int = 42) -> np.ndarray:
+    """
+    Per-step loop of create_sideways_data before it was vectorized.
+    """
+    returns = df_slice['close'].pct_change().dropna()
+    rolling_volatility = returns.rolling(window=40).std().bfill()
+
+    n = len(df_slice)
+    np.random.seed(seed)
+    epsilon = np.random.normal(0, 1, n)
+    sideways_series = np.zeros(n)
+    sideways_series[0] = 1 * price_starts
+    lower_bound = 0.6 * price_starts
+    upper_bound = 1.4 * price_starts
+    mean = 1 * price_starts
+    reversion_strength = 0.05
+
+    for t in range(1, n):
+        current_volatility = rolling_volatility.iloc[t-1]
+        sideways_series[t] = sideways_series[t-1] * (1 + current_volatility * epsilon[t])
+        sideways_series[t] += reversion_strength * (mean - sideways_series[t-1])
+        sideways_series[t] = np.clip(sideways_series[t], lower_bound, upper_bound)
+
+    return sideways_series
+
+@pytest.mark.parametrize('seed', [42, 7])
+def test_sideways_data_matches_legacy_loop(reference_df, seed):
+    df_slice = reference_df.iloc[500:2500]
+    sideways_df = generate_sideways_data(df_slice, 100, seed)
+
+    assert sideways_df.index.equals(df_slice.index)
+    np.testing.assert_array_equal(sideways_df['close'].to_numpy(), legacySideways(df_slice, 100, seed))
+
+@pytest.mark.parametrize('regime', list(REGIMES))
+def test_paths_do_not_depend_on_batch_size(reference_df, regime):
+    volatility = get_reference_volatility(reference_df)
+    runs = [
+        np.concatenate(list(generate_paths(volatility, N_PATHS, N_STEPS, 100, regime, 3, batch_size)), axis=1)
+        for batch_size in [1, 7, 1024]
+    ]
+
+    assert runs[0].shape == (N_STEPS, N_PATHS)
+    for paths in runs[1:]:
+        np.testing.assert_array_equal(paths, runs[0])
+    assert len({tuple(runs[0][:, i]) for i in range(N_PATHS)}) == N_PATHS
+
+@pytest.mark.parametrize('regime', ['sideways', 'high_volatility'])
+def test_prices_stay_within_bounds(reference_df, regime):
+    volatility = get_reference_volatility(reference_df)
+    paths = np.concatenate(list(generate_paths(volatility, N_PATHS, N_STEPS, 100, regime, 5)), axis=1)
+
+    assert (paths[0] == 100).all()
+    assert (paths >= BOUND_RATIOS[0] * 100).all()
+    assert (paths <= BOUND_RATIOS[1] * 100).all()
+
+def test_bounds_follow_moving_means():
+    rng = np.random.default_rng(4)
+    shocks = rng.normal(0, 0.2, (N_STEPS, N_PATHS))
+    means = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (N_STEPS, N_PATHS)), axis=0))
+    prices = simulate_mean_reversion(shocks, np.full(N_PATHS, 100.0), means, 0.05)
+
+    # Large shocks, so both bounds are hit
+    assert (prices[1:] == BOUND_RATIOS[0] * means[1:]).any()
+    assert (prices[1:] == BOUND_RATIOS[1] * means[1:]).any()
+    assert (prices[1:] >= BOUND_RATIOS[0] * means[1:]).all()
+    assert (prices[1:] <= BOUND_RATIOS[1] * means[1:]).all()
+
+def test_synthetic_store_layout(reference_df, tmp_path):
+    csv_path = str(tmp_path / 'reference.csv')
+    reference_df.to_csv(csv_path)
+    n_paths, warm_up = 5, 59
+
+    store_path = build_synthetic_store(
+        csv_path, n_paths, N_STEPS, ['SMA5', 'SMA60'], [], str(tmp_path / 'cache'),
+        regime='trending', seed=2, batch_size=2, is_verbose=False
+    )
+    columns = loadFeatureColumns(store_path)
+    sources, offsets = loadCorpusIndex(store_path)
+
+    length = N_STEPS - warm_up
+    assert sources == [f"path-{i}" for i in range(n_paths)]
+    np.testing.assert_array_equal(offsets, np.arange(n_paths + 1) * length)
+
+    # The store reads the reference back from the CSV
+    volatility = get_reference_volatility(pd.read_csv(csv_path, usecols=['close']))
+    paths = np.concatenate(list(generate_paths(volatility, n_paths, N_STEPS, 100, 'trending', 2)), axis=1)
+    times = pd.date_range('2024-01-01', periods=N_STEPS, freq='5min').to_numpy()
+    for i in range(n_paths):
+        rows = slice(offsets[i], offsets[i + 1])
+        close = pd.Series(paths[:, i])
+        np.testing.assert_array_equal(columns['close'][rows], paths[warm_up:, i])
+        np.testing.assert_allclose(columns['SMA5'][rows], close.rolling(5).mean()[warm_up:], rtol=1e-12)
+        np.testing.assert_allclose(columns['SMA60'][rows], close.rolling(60).mean()[warm_up:], rtol=1e-12)
+        np.testing.assert_array_equal(columns[TIME_COLUMN][rows], times[warm_up:])
+
+    # Same paths whatever the batch size, so the store is reused
+    assert build_synthetic_store(
+        csv_path, n_paths, N_STEPS, ['SMA5', 'SMA60'], [], str(tmp_path / 'cache'),
+        regime='trending', seed=2, batch_size=5, is_verbose=False
+    ) == store_path
+
+def test_failed_batch_leaves_no_partial_store(tmp_path):
+    times = pd.date_range('2024-01-01', periods=N_STEPS, freq='5min').to_numpy()
+
+    def batches():
+        yield times, {'close': np.full((N_STEPS, 2), 100.0, order='F')}
+        raise RuntimeError("Simulation failed")
+
+    with pytest.raises(RuntimeError):
+        buildPathStore(batches(), 4, ['SMA5'], [], str(tmp_path), {'generator': 'test'}, False)
+    assert os.listdir(tmp_path / CORPUS_DIR) == []
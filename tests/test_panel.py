@@ -0,0 +1,93 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.environments.components.price_provider import PriceProvider
+from src.rl.libs.indicator.registry import computeFeatures
+from src.rl.libs.panel import PANEL_FEATURES, buildPanel, loadPanel
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+N_ROWS = 800
+
+CONFIGS = [
+    (['SMA60', 'SMA5', 'SMA20'], ['V3']),
+    (['SMA5'], ['DONCHIAN_CHANNEL_SMA']),
+    (['EMA5', 'EMA20', 'RSI14'], ['LOG_SMA', 'V3_STREAK_SIGNAL']),
+]
+
+
+@pytest.fixture(scope='module')
+def klines() -> pd.DataFrame:
+    """
+    Aligned long frame like read2df, one row per time x symbol.
+    """
+    rng = np.random.default_rng(11)
+    times = np.arange(N_ROWS, dtype=np.int64) * 300_000 + 1_700_000_000_000
+    frames = []
+    for i, symbol in enumerate(SYMBOLS):
+        close = (10 + 90 * i) * np.exp(np.cumsum(rng.normal(0, 0.005, N_ROWS)))
+        # Flat stretches, so streak and Donchian paths see ties
+        close[100:130] = close[100]
+        frames.append(pd.DataFrame({
+            'time': times,
+            'tic': symbol,
+            'open': close * (1 + rng.normal(0, 1e-3, N_ROWS)),
+            'high': close * 1.002,
+            'low': close * 0.998,
+            'close': close,
+            'volume': rng.uniform(0, 100, N_ROWS),
+        }))
+    # Interleaved by time, like the output of align_symbols
+    return pd.concat(frames).sort_values(['time', 'tic'], kind='stable', ignore_index=True)
+
+@pytest.mark.parametrize('indicators, derived', CONFIGS)
+def test_float64_panel_matches_per_symbol_features(klines, indicators, derived):
+    panel = buildPanel(klines, indicators, derived, dtype=np.float64)
+
+    for symbol in SYMBOLS:
+        frame = klines[klines['tic'] == symbol].set_index('time')[PANEL_FEATURES]
+        expected = computeFeatures(frame, indicators, derived)
+        actual = panel.symbolFrame(symbol)
+
+        assert list(actual.columns) == list(expected.columns)
+        np.testing.assert_array_equal(actual.index.to_numpy(), expected.index.to_numpy())
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+
+def test_saved_panel_is_mapped_back(klines, tmp_path):
+    indicators, derived = CONFIGS[0]
+    inMemory = buildPanel(klines, indicators, derived)
+    saved = buildPanel(klines, indicators, derived, path=str(tmp_path / 'panel'))
+    loaded = loadPanel(str(tmp_path / 'panel'))
+
+    for panel in [saved, loaded]:
+        assert isinstance(panel.values, np.memmap)
+        assert panel.symbols == SYMBOLS
+        assert panel.features == inMemory.features
+        np.testing.assert_array_equal(panel.times, inMemory.times)
+        np.testing.assert_array_equal(panel.values, inMemory.values)
+
+def test_episodes_sample_symbols_and_starts(klines, tmp_path):
+    indicators, derived = CONFIGS[0]
+    panelPath = str(tmp_path / 'panel')
+    panel = buildPanel(klines, indicators, derived, path=panelPath)
+    provider = PriceProvider(randomize=True, indicators=indicators, derivedIndicators=derived, isVerbose=False, panelPath=panelPath)
+    assert len(provider) == len(panel)
+
+    nSteps = 200
+    rng = random.Random(3)
+    symbols, starts = set(), set()
+    for _ in range(200):
+        window = provider.fetchDataSlice(nSteps, rng=rng)
+        assert 0 <= window.start <= len(panel) - nSteps
+        assert len(window) == nSteps
+        symbols.add(window.symbol)
+        starts.add(window.start)
+
+        values = panel.values[window.start:window.start + nSteps, window.symbol]
+        for feature in provider.columns:
+            np.testing.assert_array_equal(window.column(feature), values[:, panel.featureIndex[feature]])
+        np.testing.assert_array_equal(window[0]['close'], values[0, panel.featureIndex['close']])
+
+    assert symbols == set(range(len(SYMBOLS)))
+    assert len(starts) > 100
@@ -0,0 +1,95 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.libs import read_df
+from src.libs.kline_server import create_kline_tree
+from src.libs.read_df import date_slice, walk_forward_splits
+
+
+@pytest.fixture
+def frames():
+    times = pd.date_range('2024-01-01', periods=24 * 200, freq='1h')
+    df = pd.DataFrame({'datetime': times, 'close': np.arange(len(times), dtype=np.float64)})
+    # Frames read from CSV hold the dates as text
+    text_df = df.assign(datetime=times.strftime('%Y-%m-%d %H:%M:%S'))
+    return df, text_df
+
+@pytest.mark.parametrize('start_date, end_date, include_start', [
+    ('2024-02-01', '2024-03-01', True),
+    ('2024-02-01', '2024-03-01', False),
+    ('2024-02-01 05:00:00', None, True),
+    (None, '2024-01-10', True),
+    ('2023-01-01', '2030-01-01', True),
+    ('2024-03-01', '2024-02-01', True),
+])
+def test_date_slice_matches_masks(frames, start_date, end_date, include_start):
+    df, text_df = frames
+    mask = np.ones(len(df), dtype=bool)
+    if start_date is not None:
+        mask &= (df['datetime'] >= start_date) if include_start else (df['datetime'] > start_date)
+    if end_date is not None:
+        mask &= df['datetime'] < end_date
+    expected = df['close'][mask].to_numpy()
+
+    for frame in frames:
+        np.testing.assert_array_equal(date_slice(frame, start_date, end_date, include_start)['close'], expected)
+
+def test_walk_forward_splits_on_text_dates(frames):
+    df, text_df = frames
+    folds = walk_forward_splits(df, '2024-01-01', '2024-07-01', '60D', '14D')
+    text_folds = walk_forward_splits(text_df, '2024-01-01', '2024-07-01', '60D', '14D')
+
+    assert len(folds) > 0
+    assert len(text_folds) == len(folds)
+    for (train, test), (text_train, text_test) in zip(folds, text_folds):
+        np.testing.assert_array_equal(text_train['close'], train['close'])
+        np.testing.assert_array_equal(text_test['close'], test['close'])
+        assert (test['datetime'] - train['datetime'].iloc[0] < pd.Timedelta('74D')).all()
+
+def test_text_dates_are_validated(frames):
+    _, text_df = frames
+    bad_df = text_df.assign(datetime='not a date')
+    with pytest.raises(ValueError):
+        date_slice(bad_df, '2024-02-01', '2024-03-01')
+    with pytest.raises(ValueError):
+        walk_forward_splits(bad_df, '2024-01-01', '2024-07-01', '60D', '14D')
+
+def test_resampled_cache_follows_the_base_archives(tmp_path, monkeypatch):
+    monkeypatch.setattr(read_df, 'KLINES_ROOT', str(tmp_path / 'data'))
+    create_kline_tree(str(tmp_path), ['BTCUSDT'], {'5m': None}, '2024-01-01', '2024-03-31')
+    directory = read_df.get_klines_path('spot', 'BTCUSDT', '5m')
+    archive = os.path.join(directory, 'BTCUSDT-5m-2024-02.zip')
+    cache_root = str(tmp_path / 'cache')
+
+    def assertFresh():
+        rawdfs = read_df.read_symbols(['BTCUSDT'], '5m', 'spot', '', cache_root, max_workers=1)
+        resampled = read_df.read_resampled(rawdfs, '5m', '1h', 'spot', '', cache_root)
+        pd.testing.assert_frame_equal(resampled['BTCUSDT'], read_df.resample_klines(rawdfs['BTCUSDT'], '5m', '1h'))
+        assert len(os.listdir(tmp_path / 'cache' / 'BTCUSDT' / '1h_from_5m')) == 1
+        return resampled['BTCUSDT']
+
+    full = assertFresh()
+    backup = str(tmp_path / 'backup.zip')
+    shutil.copy2(archive, backup)
+
+    os.remove(archive)
+    assert len(assertFresh()) < len(full)
+
+    # Copied back with its older modification time
+    shutil.copy2(backup, archive)
+    os.utime(archive, (0, 0))
+    pd.testing.assert_frame_equal(assertFresh(), full)
+
+def test_text_dates_are_not_parsed_as_a_whole(frames, monkeypatch):
+    calls = []
+    parse_date = read_df.parse_date
+    monkeypatch.setattr(read_df, 'parse_date', lambda value: calls.append(value) or parse_date(value))
+
+    trains, tests, combined = read_df.split_into_train_test(list(frames), '2024-01-01', '2024-03-01', '2024-05-01')
+    # Three slices of two bounds, each a binary search over the text frame
+    assert 0 < len(calls) <= 6 * (int(np.log2(len(frames[1]))) + 1)
+    for slices in [trains, tests, combined]:
+        np.testing.assert_array_equal(slices[1]['close'], slices[0]['close'])
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.libs.indicator.registry import computeFeatures, derived_specs
+from src.rl.libs.indicator.streaming import StreamingIndicators, getStreamingFrame, streaming_derived
+
+
+@pytest.fixture(scope='module')
+def prices() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    steps = rng.normal(0, 0.004, 1500)
+    # Flat stretch, so extrema and streaks see ties
+    steps[700:720] = 0
+    return pd.DataFrame({'close': 100 * np.exp(np.cumsum(steps))})
+
+def assertMatchesBatch(df: pd.DataFrame, indicators: list[str], derived: list[str]):
+    expected = computeFeatures(df, indicators, derived)
+    result = getStreamingFrame(df, indicators, derived)
+
+    assert list(result.index) == list(expected.index)
+    assert sorted(result.columns) == sorted(expected.columns)
+    pd.testing.assert_frame_equal(
+        result[expected.columns], expected, check_dtype=False, check_exact=False, rtol=1e-9, atol=1e-9
+    )
+
+@pytest.mark.parametrize('indicator', ['SMA5', 'SMA60', 'EMA5', 'EMA20', 'RSI14'])
+def test_base_matches_batch(prices, indicator):
+    assertMatchesBatch(prices, [indicator], [])
+
+DERIVED_CONFIGS = {
+    'LOG_SMA': ['SMA5'],
+    'V2': ['EMA5'],
+    'V3': ['SMA60', 'SMA5'],
+    'PRICE_CHANGE': [],
+    'RSI_SMA': ['RSI14'],
+    'V3_STREAK': ['SMA60', 'SMA5'],
+    'V3_STREAK_SIGNAL': ['SMA60', 'SMA5'],
+    'VOLATILITY_BAND': ['SMA100', 'SMA5'],
+    'DONCHIAN_CHANNEL': [],
+    'DONCHIAN_CHANNEL_SMA': ['SMA5'],
+}
+
+def test_every_derived_name_is_covered():
+    assert set(DERIVED_CONFIGS) == set(streaming_derived) == set(derived_specs)
+
+@pytest.mark.parametrize('name', list(DERIVED_CONFIGS))
+def test_derived_matches_batch(prices, name):
+    derived = {
+        'V3_STREAK': ['V3', 'V3_STREAK'],
+        'V3_STREAK_SIGNAL': ['V3', 'V3_STREAK', 'V3_STREAK_SIGNAL'],
+    }.get(name, [name])
+    assertMatchesBatch(prices, DERIVED_CONFIGS[name], derived)
+
+def test_seed_returns_last_row(prices):
+    engine = StreamingIndicators(['SMA60', 'SMA5'], ['V3'])
+    row = engine.seed(prices)
+    expected = computeFeatures(prices, ['SMA60', 'SMA5'], ['V3']).iloc[-1]
+
+    assert row['V3'] == pytest.approx(expected['V3'], rel=1e-9)
+
+@pytest.mark.parametrize('indicators, derived', [
+    # SMA60 is only a prerequisite, resolved and dropped like in the batch path
+    (['SMA5', 'SMA20'], ['V3']),
+    # Config order does not matter
+    ([], ['V3_STREAK', 'V3']),
+    ([], ['V3_STREAK_SIGNAL']),
+    ([], ['DONCHIAN_CHANNEL_SMA', 'LOG_SMA']),
+])
+def test_resolved_configs_match_batch(prices, indicators, derived):
+    assertMatchesBatch(prices, indicators, derived)
+
+def test_unknown_derived_name_raises():
+    with pytest.raises(ValueError, match="Unsupported derived indicator"):
+        StreamingIndicators([], ['NOT_AN_INDICATOR'])
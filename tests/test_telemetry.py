@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.environments import TradingEnvironment
+from src.rl.libs.telemetry import EpisodeStatsSink
+
+N_EPISODES = 300
+
+
+def recordEpisodes(sink: EpisodeStatsSink, envId: int, n: int = N_EPISODES):
+    for i in range(n):
+        sink.record(envId, 1000 + i, 100, 3, 0.5, 101.0, 0.1)
+
+def readEpisodes(directory, fileName: str, fileFormat: str) -> pd.DataFrame:
+    if fileFormat == 'csv':
+        return pd.read_csv(directory / f"{fileName}.csv")
+    return pd.read_parquet(directory / fileName)
+
+@pytest.mark.parametrize('fileFormat', ['csv', 'parquet'])
+def test_sinks_of_one_process_keep_every_row(tmp_path, fileFormat):
+    sinks = [
+        EpisodeStatsSink(str(tmp_path), flushEvery=16, fileFormat=fileFormat, isTensorboard=False, fileName=f"episodes-{i}")
+        for i in range(2)
+    ]
+    for envId, sink in enumerate(sinks):
+        recordEpisodes(sink, envId)
+    for sink in sinks:
+        sink.close()
+
+    for envId in range(2):
+        df = readEpisodes(tmp_path, f"episodes-{envId}", fileFormat).sort_values('episode')
+        assert len(df) == N_EPISODES
+        assert (df['env_id'] == envId).all()
+        np.testing.assert_array_equal(df['episode'], np.arange(N_EPISODES))
+
+def test_open_sinks_cannot_share_a_file(tmp_path):
+    sink = EpisodeStatsSink(str(tmp_path), isTensorboard=False, fileName='episodes')
+    with pytest.raises(ValueError):
+        EpisodeStatsSink(str(tmp_path), isTensorboard=False, fileName='episodes')
+
+    sink.close()
+    EpisodeStatsSink(str(tmp_path), isTensorboard=False, fileName='episodes').close()
+
+def test_parquet_parts_are_not_overwritten(tmp_path):
+    for _ in range(2):
+        sink = EpisodeStatsSink(str(tmp_path), fileFormat='parquet', isTensorboard=False, fileName='episodes')
+        recordEpisodes(sink, 0)
+        sink.close()
+
+    assert len(readEpisodes(tmp_path, 'episodes', 'parquet')) == 2 * N_EPISODES
+
+@pytest.fixture
+def env_args(tmp_path):
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 1000)))
+    times = pd.date_range('2024-01-01', periods=len(close), freq='5min')
+    pd.DataFrame({'datetime': times, 'close': close}).to_csv(tmp_path / 'prices.csv', index=False)
+    env_config = {
+        'starting_balance': 1000,
+        'leverage': 1,
+        'comission_trade': 0.001,
+        'comission_funding': 0.0001,
+        'max_order': 5,
+        'is_random_inventory': False,
+        'is_record_history': False,
+        'is_long_only': True,
+        'is_scalping': True,
+        'no_negative_reward': False,
+        'ending_bonus_reward': False,
+        'is_random': False,
+        'action': 'default',
+        'is_cache_features': False,
+        'is_verbose': False,
+        'indicators': ['SMA60', 'SMA5', 'SMA20'],
+        'derived_indicators': ['V3'],
+        'strategy_type': 'DUAL_MA',
+        'telemetry_dir': str(tmp_path / 'telemetry'),
+    }
+    return 'prices.csv', str(tmp_path), env_config
+
+def test_envs_of_one_process_write_their_own_files(env_args):
+    envs = [TradingEnvironment(*env_args, env_id=i) for i in range(2)]
+    assert envs[0].telemetry.fileName != envs[1].telemetry.fileName
+
+    for env in envs:
+        env.close()
+        assert env.telemetry.thread is None
+
+def test_env_does_not_close_an_injected_sink(env_args):
+    sink = EpisodeStatsSink(env_args[2]['telemetry_dir'], isTensorboard=False, fileName='shared')
+    envs = [TradingEnvironment(*env_args, telemetry=sink, env_id=i) for i in range(2)]
+    for env in envs:
+        env.close()
+
+    assert sink.thread is not None
+    sink.close()
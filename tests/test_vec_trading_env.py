@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rl.environments import TradingEnvironment
+from src.rl.environments.vec_trading_env import VecTradingEnvironment
+
+N_ENVS = 4
+N_STEPS = 1500
+
+STRATEGIES = {
+    'DUAL_MA': (['SMA60', 'SMA5', 'SMA20'], ['V3']),
+    'DONCHIAN_CHANNEL': (['SMA5'], ['DONCHIAN_CHANNEL_SMA']),
+}
+
+
+@pytest.fixture(scope='module')
+def price_dir(tmp_path_factory) -> str:
+    directory = tmp_path_factory.mktemp('prices')
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 6000)))
+    times = pd.date_range('2024-01-01', periods=len(close), freq='5min')
+    pd.DataFrame({'datetime': times, 'close': close}).to_csv(directory / 'prices.csv', index=False)
+    return str(directory)
+
+def get_env_config(strategy: str) -> dict:
+    indicators, derived = STRATEGIES[strategy]
+    return {
+        'starting_balance': 1000,
+        'leverage': 1,
+        # High fees, so drawdown terminations and auto-resets happen within the test
+        'comission_trade': 0.03,
+        'comission_funding': 0.001,
+        'max_order': 5,
+        'is_random_inventory': False,
+        'is_record_history': False,
+        'is_long_only': True,
+        'is_scalping': True,
+        'no_negative_reward': False,
+        'ending_bonus_reward': False,
+        # Every episode starts on the first row, so both envs replay the same windows
+        'is_random': False,
+        'action': 'default',
+        'is_cache_features': False,
+        'is_verbose': False,
+        'indicators': indicators,
+        'derived_indicators': derived,
+        'strategy_type': strategy,
+    }
+
+@pytest.mark.parametrize('strategy', list(STRATEGIES))
+def test_matches_scalar_envs(price_dir, strategy):
+    env_config = get_env_config(strategy)
+    actions = np.random.default_rng(7).choice(3, size=(N_STEPS, N_ENVS), p=[0.35, 0.25, 0.4])
+
+    vec_env = VecTradingEnvironment('prices.csv', price_dir, env_config, num_envs=N_ENVS)
+    vec_obs = [vec_env.reset()]
+    vec_rewards, vec_dones, vec_infos = [], [], []
+    for t in range(N_STEPS):
+        obs, rewards, dones, infos = vec_env.step(actions[t])
+        vec_obs.append(obs)
+        vec_rewards.append(rewards)
+        vec_dones.append(dones)
+        vec_infos.append(infos)
+
+    n_done = 0
+    for i in range(N_ENVS):
+        env = TradingEnvironment('prices.csv', price_dir, env_config)
+        obs, _ = env.reset()
+        np.testing.assert_allclose(obs, vec_obs[0][i], rtol=1e-6, atol=1e-6)
+
+        for t in range(N_STEPS):
+            obs, reward, terminated, truncated, _ = env.step(int(actions[t, i]))
+            done = terminated or truncated
+            assert done == vec_dones[t][i], f"env {i} step {t}"
+            assert reward == pytest.approx(vec_rewards[t][i], rel=1e-6, abs=1e-6)
+
+            if done:
+                n_done += 1
+                # The vec env auto-resets, the last observation of the episode is in the info
+                np.testing.assert_allclose(obs, vec_infos[t][i]['terminal_observation'], rtol=1e-6, atol=1e-6)
+                obs, _ = env.reset()
+            np.testing.assert_allclose(obs, vec_obs[t + 1][i], rtol=1e-6, atol=1e-6)
+
+    # Terminations and auto-resets are part of what is compared
+    assert n_done > 0